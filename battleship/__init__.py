@@ -0,0 +1,37 @@
+import importlib
+
+# Module of every public name of the package. Modules are imported when their names are used for the first time,
+# so importing the package doesn't load curses, typer, numpy or asyncio, not even typing.
+EXPORTS = {
+    'Battleship': 'battleship',
+    'Cell': 'field',
+    'Field': 'field',
+    'Table': 'field',
+    'format_point': 'field',
+    'parse_point': 'field',
+    'Player': 'player',
+    'ShotResult': 'player',
+    'Ship': 'ship',
+    'Events': 'metrics',
+    'METRICS': 'metrics',
+    'SHOOTERS': 'shooter',
+    'Strategy': 'strategy',
+    'register': 'strategy',
+    'Engine': 'engine',
+    'simulate': 'simulation',
+}
+
+__all__ = list(EXPORTS)
+
+
+def __getattr__(name: str):
+    module = EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(EXPORTS))
@@ -1,8 +1,15 @@
-from typing import Optional, List
+from typing import Callable, Optional, List, Sequence, Tuple, TYPE_CHECKING
+import random
+import time
 
-from player import MENU_HEIGHT, MENU_WIDTH, Player, ShotResult
-from field import LEGEND_HEIGHT, LEGEND_WIDTH, Field
-from ship import Ship
+from .player import MENU_HEIGHT, MENU_WIDTH, Player, ShotResult, new_player
+from .field import LEGEND_HEIGHT, LEGEND_WIDTH, Field, popcount
+from .ship import Ship
+from .metrics import METRICS, Events
+from .delta import Delta, discovered_points
+
+if TYPE_CHECKING:
+    from .journal import Journal
 
 MESSAGE_HEIGHT = 1
 LEGEND_MENU_HEIGHT = max(LEGEND_HEIGHT, MENU_HEIGHT)
@@ -19,28 +26,45 @@ class Battleship(object):
     messages: List[str]  # list of messages for players
     field_length: int
     field_width: int
+    game_id: int  # random identifier of the game
+    salvo: int  # count of shots in every turn or 0 if player shoots again after every hit
+    shots_left: int  # count of shots left in current turn when salvo rule is used
+    journal: Optional['Journal']  # journal where shots are recorded
+    events: Events  # callbacks for shot, hit, kill, delta, invalid_shot, game_over, save and load events
 
-    def __init__(self, field_length: int, field_width: int, host: int = 0):
+    def __init__(self, field_length: int, field_width: int, host: int = 0, rng: random.Random = random,
+                 players: Optional[List[Player]] = None, salvo: int = 0):
         self.turn = 0
         self.host = host
-        player_field_0 = Field(field_length, field_width)
-        player_field_1 = Field(field_length, field_width)
-        # Create Player objects with empty fields and randomly generated ships
-        self.players = [Player(player_field_0, Ship.generate_ships(player_field_0)),
-                        Player(player_field_1, Ship.generate_ships(player_field_1))]
+        if players is None:
+            start = time.perf_counter() if METRICS.enabled else 0.0
+            player_field_0 = Field(field_length, field_width)
+            player_field_1 = Field(field_length, field_width)
+            # Create Player objects with empty fields and randomly generated ships
+            players = [new_player(player_field_0, Ship.generate_ships(player_field_0, rng)),
+                       new_player(player_field_1, Ship.generate_ships(player_field_1, rng))]
+            if METRICS.enabled:
+                METRICS.increment('games_total')
+                METRICS.observe('generate_ships_seconds', time.perf_counter() - start)
+        self.players = players
         self.messages = ['', '']
         self.field_length = field_length
         self.field_width = field_width
+        self.game_id = rng.getrandbits(64)
+        self.salvo = salvo
+        self.shots_left = salvo
+        self.journal = None
+        self.events = Events()
 
     @property
     def winner(self) -> Optional[int]:
         """
         :return: number of winning player or None if game is not over yet
         """
-        if self.players[0].ships_count == 0:
+        if self.players[0].is_defeated:
             # Player 1 wins
             return 1
-        if self.players[1].ships_count == 0:
+        if self.players[1].is_defeated:
             # Player 0 wins
             return 0
         return None
@@ -66,37 +90,168 @@ class Battleship(object):
         """
         return self.players[self.host]
 
-    def make_shot(self, x: int, y: int):
+    def make_shot(self, x: int, y: int) -> Optional[ShotResult]:
         """
         Make turn between players or doing anything if game is already over
         :param x: x-coordinate of target point on enemy field
         :param y: y-coordinate of target point on enemy field
+        :return: result of the shot or None if shot was not made
         """
+        start = time.perf_counter() if METRICS.enabled else 0.0
         # Check if game is over
         if self.winner is not None:
             # Do nothing
-            return
+            return None
         if not self.current_player.check_point(x, y):
             # Said that coordinates is incorrect
             self.messages[self.turn] = 'Point is not on field or is already discovered. Try again.'
-            return
+            if self.events:
+                self.events.emit('invalid_shot', self, self.turn, x, y)
+            if METRICS.enabled:
+                METRICS.increment('invalid_shots_total')
+            return None
         # Make shot
-        result = self.current_player.mark_shot(x, y, *self.next_player.receive_shot(x, y))
-        # Process result of shot and create appropriate messages
+        shooter = self.turn
+        radar = self.current_player.field.radar
+        result, ship = self.next_player.receive_shot(x, y)
+        # Points discovered by the shot are found only for subscribers of deltas, before the shot is marked on radar
+        discovered = discovered_points(radar, x, y, ship) if 'delta' in self.events else None
+        self.current_player.mark_shot(x, y, result, ship)
+        self.finish_shots(result)
+        if self.journal is not None:
+            self.journal.append(self, shooter, x, y, result)
+        if self.events:
+            self.emit_shot(shooter, x, y, result, ship)
+            if discovered is not None:
+                seq = self.players[0].shots + self.players[1].shots
+                self.events.emit('delta', Delta.of(radar, discovered, seq, shooter, self.turn, self.winner))
+        if METRICS.enabled:
+            METRICS.increment('shots_total')
+            if result != ShotResult.water:
+                METRICS.increment('hits_total')
+            if result == ShotResult.killing:
+                METRICS.increment('kills_total')
+                if self.winner is not None:
+                    METRICS.increment('games_finished_total')
+            METRICS.observe('make_shot_seconds', time.perf_counter() - start)
+        return result
+
+    def make_shots(self, points: Sequence[Tuple[int, int]]) -> List[Optional[ShotResult]]:
+        """
+        Make shots of current player one after another while its turn lasts, doing nothing if game is already over
+        Points which are not on field or are already discovered are skipped
+        :param points: coordinates of target points on enemy field
+        :return: result of every shot or None if shot was not made
+        """
+        results: List[Optional[ShotResult]] = [None] * len(points)
+        if self.winner is not None:
+            return results
+        if self.journal is not None or self.events or METRICS.enabled or self.players[0].field.is_large:
+            # Every shot is recorded separately, large fields are not stored as bitmasks
+            shooter = self.turn
+            for k, (x, y) in enumerate(points):
+                if self.turn != shooter or self.winner is not None:
+                    break
+                results[k] = self.make_shot(x, y)
+            return results
+        player, enemy = self.current_player, self.next_player
+        radar = player.field.radar
+        length, width = self.field_length, self.field_width
+        discovered = radar.water | radar.hit
+        # Misses are marked on radar and map at once after the turn
+        water = 0
+        shots_left = self.shots_left
+        result = None
+        for k, (x, y) in enumerate(points):
+            if not (0 <= x < length and 0 <= y < width):
+                continue
+            bit = 1 << (x * width + y)
+            if discovered & bit:
+                continue
+            if enemy.ships_mask & bit:
+                result, ship = enemy.receive_shot(x, y)
+                player.mark_shot(x, y, result, ship)
+                if result == ShotResult.killing:
+                    # Cells around destroyed ship are discovered
+                    discovered = radar.discovered | water
+            else:
+                result = ShotResult.water
+                water |= bit
+            discovered |= bit
+            results[k] = result
+            shots_left -= 1
+            if shots_left == 0 or (not self.salvo and result == ShotResult.water) or enemy.is_defeated:
+                break
+        if water:
+            radar.set_water_mask(water)
+            enemy.field.map.set_water_mask(water)
+            player.shots += popcount(water)
+        if result is not None:
+            self.finish_shots(result, self.shots_left - shots_left if self.salvo else 1)
+        return results
+
+    def finish_shots(self, result: ShotResult, shots: int = 1):
+        """
+        Create messages and pass turn after shots of current player
+        :param result: result of the last shot
+        :param shots: count of made shots
+        """
+        if self.salvo:
+            self.shots_left -= shots
+            passed = self.shots_left == 0
+        else:
+            passed = result == ShotResult.water
         if result == ShotResult.water:
-            self.messages[self.turn] = 'You missed.'
-            self.turn = 1 - self.turn
-            return
-        if result == ShotResult.hit:
-            self.messages[self.turn] = 'You hit. Shoot again!'
+            message = 'You missed.'
+        elif result == ShotResult.hit:
+            message = 'You hit.'
         elif result == ShotResult.killing:
-            self.messages[self.turn] = 'You destroyed enemy ship. Shoot again!'
+            message = 'You destroyed enemy ship.'
         else:
             assert False, f'Unhandled ShotResult: {result}'
-        if self.next_player.ships_count == 0:
+        if self.next_player.is_defeated:
             self.messages[self.turn] = 'You win!'
             self.messages[1 - self.turn] = 'You lose!'
             self.turn = self.host
+            self.shots_left = self.salvo
+        elif passed:
+            self.messages[self.turn] = message
+            self.turn = 1 - self.turn
+            self.shots_left = self.salvo
+        elif self.salvo:
+            self.messages[self.turn] = f'{message} Shots left: {self.shots_left}.'
+        else:
+            self.messages[self.turn] = f'{message} Shoot again!'
+
+    def subscribe(self, callback: Callable[[Delta], None]):
+        """
+        Register callback which is called with public changes of the game after every shot
+        """
+        self.events.on('delta', callback)
+
+    def unsubscribe(self, callback: Callable[[Delta], None]):
+        """
+        Unregister callback of deltas
+        """
+        self.events.off('delta', callback)
+
+    def emit_shot(self, shooter: int, x: int, y: int, result: ShotResult, ship: Optional[Ship]):
+        """
+        Call callbacks registered for events caused by the shot
+        :param shooter: number of player who made the shot
+        :param x: x-coordinate of the shot
+        :param y: y-coordinate of the shot
+        :param result: result of the shot
+        :param ship: destroyed ship or None if no ship was destroyed
+        """
+        self.events.emit('shot', self, shooter, x, y, result)
+        if result == ShotResult.hit:
+            self.events.emit('hit', self, shooter, x, y)
+        elif result == ShotResult.killing:
+            self.events.emit('hit', self, shooter, x, y)
+            self.events.emit('kill', self, shooter, ship)
+            if self.winner is not None:
+                self.events.emit('game_over', self, self.winner)
 
     @property
     def host_message_width(self) -> int:
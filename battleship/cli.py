@@ -0,0 +1,228 @@
+from typing import List, Optional
+from pathlib import Path
+
+import typer
+
+from .field import MIN_LENGTH, MAX_LENGTH, MIN_WIDTH, MAX_WIDTH, MAX_LARGE_LENGTH, MAX_LARGE_WIDTH
+
+
+def large_length_callback(value: int) -> int:
+    """
+    Check that given field length is within range [MIN_LENGTH; MAX_LARGE_LENGTH] and raise error if it is not
+    :param value: field length
+    :return: given value
+    """
+    if not MIN_LENGTH <= value <= MAX_LARGE_LENGTH:
+        raise typer.BadParameter(f'Field length must be in range [{MIN_LENGTH}; {MAX_LARGE_LENGTH}], '
+                                 f'actually: {value}')
+    return value
+
+
+def large_width_callback(value: int) -> int:
+    """
+    Check that given field width is within range [MIN_WIDTH; MAX_LARGE_WIDTH] and raise error if it is not
+    :param value: field width
+    :return: given value
+    """
+    if not MIN_WIDTH <= value <= MAX_LARGE_WIDTH:
+        raise typer.BadParameter(f'Field width must be in range [{MIN_WIDTH}; {MAX_LARGE_WIDTH}], '
+                                 f'actually: {value}')
+    return value
+
+
+def length_callback(value: int) -> int:
+    """
+    Check that given field length is within range [MIN_LENGTH; MAX_LENGTH] and raise error if it is not
+    :param value: field length
+    :return: given value
+    """
+    if not MIN_LENGTH <= value <= MAX_LENGTH:
+        raise typer.BadParameter(f'Field length must be in range [{MIN_LENGTH}; {MAX_LENGTH}], '
+                                 f'actually: {value}')
+    return value
+
+
+def width_callback(value: int):
+    """
+    Check that given field width is within range [MIN_WIDTH; MAX_WIDTH] and raise error if it is not
+    :param value: field width
+    :return: given value
+    """
+    if not MIN_WIDTH <= value <= MAX_WIDTH:
+        raise typer.BadParameter(f'Field width must be in range [{MIN_WIDTH}; {MAX_WIDTH}], '
+                                 f'actually: {value}')
+    return value
+
+
+def shooter_callback(value: str) -> str:
+    """
+    Check that computer player with given name exists and raise error if it is not
+    :param value: computer player name
+    :return: given value
+    """
+    # Computer players load numpy, so they are imported only by commands which need them
+    from .shooter import SHOOTERS
+    if value not in SHOOTERS:
+        raise typer.BadParameter(f'Shooter must be one of {", ".join(SHOOTERS)}, actually: {value}')
+    return value
+
+
+def cache_callback(value: Optional[Path]) -> Optional[Path]:
+    """
+    Check that existing file is a transposition cache and raise error if it is not
+    :param value: path of cache file
+    :return: given value
+    """
+    if value is not None and value.exists():
+        from .transposition import TranspositionCache
+        try:
+            TranspositionCache().load(value)
+        except (IOError, ValueError) as error:
+            raise typer.BadParameter(f'Cache can not be read: {error}')
+    return value
+
+
+app = typer.Typer()
+
+
+@app.callback(invoke_without_command=True)
+def main(ctx: typer.Context,
+         field_length: int = typer.Option(MIN_LENGTH, callback=large_length_callback),
+         field_width: int = typer.Option(MIN_WIDTH, callback=large_width_callback)):
+    if ctx.invoked_subcommand is None:
+        from curses import wrapper
+        from .ui import start_game
+        wrapper(start_game, field_length, field_width)
+
+
+@app.command('simulate')
+def simulate_command(games: int = typer.Option(1000, min=1),
+                     field_length: int = typer.Option(MIN_LENGTH, callback=length_callback),
+                     field_width: int = typer.Option(MIN_WIDTH, callback=width_callback),
+                     first: str = typer.Option('random', callback=shooter_callback),
+                     second: str = typer.Option('random', callback=shooter_callback),
+                     seed: int = 0,
+                     workers: Optional[int] = typer.Option(None, min=1),
+                     cache: Optional[Path] = typer.Option(None, callback=cache_callback,
+                                                          help='File of transposition cache of computer players'),
+                     log: Optional[Path] = typer.Option(None, help='Directory of shot log to append every shot to')):
+    """
+    Play many games between computer players without user interface and show statistics
+    """
+    from .simulation import simulate
+    report = simulate(games, field_length, field_width, (first, second), seed, workers, cache, log)
+    typer.echo(report.display())
+
+
+@app.command('shotlog')
+def shot_log_command(path: Path = typer.Argument(..., exists=True, file_okay=False),
+                     field_length: int = typer.Option(MIN_LENGTH, callback=large_length_callback),
+                     field_width: int = typer.Option(MIN_WIDTH, callback=large_width_callback)):
+    """
+    Show statistics of logged shots: shots to win and hit rate of every cell of field with given size
+    """
+    from .shotlog import ShotLog
+    from .field import column_name
+    import numpy as np
+    log = ShotLog(path)
+    distribution = log.shots_to_win()
+    games = int(distribution.sum())
+    typer.echo(f'shots:        {len(log)}')
+    typer.echo(f'games:        {games}')
+    if games:
+        shots = np.arange(len(distribution))
+        mean = float((shots * distribution).sum()) / games
+        median = int(np.searchsorted(np.cumsum(distribution), (games + 1) // 2))
+        typer.echo(f'winner shots: mean {mean:.2f}, median {median}, '
+                   f'min {int(shots[distribution > 0].min())}, max {len(distribution) - 1}')
+    rate = log.hit_rate(field_length, field_width)
+    if np.isnan(rate).all():
+        return
+    typer.echo(f'hit rate, % of shots into every cell of {field_length}x{field_width} field:')
+    typer.echo('    ' + ''.join(column_name(x).rjust(4) for x in range(field_length)))
+    for y in range(field_width):
+        typer.echo(str(y + 1).rjust(4) + ''.join('   .' if np.isnan(value) else f'{round(value * 100):4d}'
+                                                   for value in rate[:, y]))
+
+
+def strategies_callback(value: str) -> List[str]:
+    """
+    Check that computer players with given names exist and raise error if they do not
+    :param value: comma-separated computer player names
+    :return: list of names
+    """
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    for name in names:
+        shooter_callback(name)
+    if len(set(names)) < 2:
+        raise typer.BadParameter(f'At least two different strategies are needed, actually: {value}')
+    return names
+
+
+@app.command('tournament')
+def tournament_command(strategies: str = typer.Option('random,hunt,density', callback=strategies_callback,
+                                                      help='Comma-separated names of computer players'),
+                       field_length: int = typer.Option(MIN_LENGTH, callback=length_callback),
+                       field_width: int = typer.Option(MIN_WIDTH, callback=width_callback),
+                       seed: int = 0,
+                       workers: Optional[int] = typer.Option(None, min=1),
+                       delta: float = typer.Option(1.0, min=0.01, help='Difference of mean shots to detect'),
+                       alpha: float = typer.Option(0.05, min=0.0001, max=0.5),
+                       beta: float = typer.Option(0.05, min=0.0001, max=0.5),
+                       max_games: int = typer.Option(2000, min=1, help='Games after which pairing is a draw')):
+    """
+    Compare every two computer players on the same fleets until the difference is statistically significant
+    """
+    from .tournament import tournament
+    report = tournament(strategies, field_length, field_width, seed, workers, delta, alpha, beta, max_games)
+    typer.echo(report.display())
+
+
+@app.command('openings')
+def openings_command(path: Optional[Path] = typer.Option(None, help='File of opening book, '
+                                                                    'battleship/openings.bin by default'),
+                     workers: Optional[int] = typer.Option(None, min=1)):
+    """
+    Compute opening shots and initial probability maps of computer players for every field size
+    """
+    from . import openings
+    if path is None:
+        path = openings.DEFAULT_PATH
+    openings.build(path, workers=workers)
+    typer.echo(f'Opening book is written into {path}')
+
+
+@app.command('serve')
+def serve_command(host: str = '127.0.0.1', port: int = 7777):
+    """
+    Run server hosting many games over TCP
+    """
+    from . import server
+    server.serve(host, port)
+
+
+@app.command('engine')
+def engine_command():
+    """
+    Play games by text commands from standard input, protocol is described in battleship/engine.py
+    """
+    # Normally handled before typer is imported, kept here to appear in help
+    from . import engine
+    engine.main()
+
+
+@app.command('loadtest')
+def load_test_command(host: str = '127.0.0.1', port: int = 7777,
+                      connections: int = typer.Option(1000, min=1),
+                      games: int = typer.Option(1, min=1),
+                      field_length: int = typer.Option(10, callback=length_callback),
+                      field_width: int = typer.Option(10, callback=width_callback),
+                      shooter: str = typer.Option('density', callback=shooter_callback),
+                      seed: int = 0):
+    """
+    Play many simultaneous games against computer on running server and show statistics
+    """
+    from . import loadtest
+    report = loadtest.load_test(host, port, connections, games, field_length, field_width, shooter, seed)
+    typer.echo(report.display())
+
@@ -0,0 +1,76 @@
+from typing import List, Optional, Tuple
+
+from .field import Cell, Table, format_point
+from .ship import Ship
+
+
+class Delta(object):
+    """
+    Change of public state of the game made by one shot: cells discovered on radar of the shooting player,
+    the shot cell and water around destroyed ship, and the next turn
+    """
+    seq: int  # count of shots made in the game including this one
+    shooter: int  # number of player who made the shot
+    turn: int  # number of player who shoots next
+    winner: Optional[int]  # number of winner or None if game is not over
+    cells: List[Tuple[int, int, Cell]]  # coordinates and new state of every changed cell
+
+    def __init__(self, seq: int, shooter: int, turn: int, winner: Optional[int], cells: List[Tuple[int, int, Cell]]):
+        self.seq = seq
+        self.shooter = shooter
+        self.turn = turn
+        self.winner = winner
+        self.cells = cells
+
+    @staticmethod
+    def of(radar: Table, points: List[Tuple[int, int]], seq: int, shooter: int, turn: int,
+           winner: Optional[int]) -> 'Delta':
+        """
+        :param radar: radar of the shooting player after the shot
+        :param points: points discovered by the shot, see discovered_points
+        :return: delta with new state of given points
+        """
+        return Delta(seq, shooter, turn, winner, [(x, y, radar.cell(x, y)) for x, y in points])
+
+    def encode(self) -> str:
+        """
+        :return: line like 'DELTA 12 0 1 - c5X b4O', cells are points followed by symbols
+        """
+        winner = '-' if self.winner is None else str(self.winner)
+        cells = ' '.join(format_point(x, y) + cell.value for x, y, cell in self.cells)
+        return f'DELTA {self.seq} {self.shooter} {self.turn} {winner} {cells}'
+
+
+def discovered_points(radar: Table, x: int, y: int, ship: Optional[Ship]) -> List[Tuple[int, int]]:
+    """
+    Only the shot cell and cells around destroyed ship are looked through, so it doesn't depend on field area
+    :param radar: radar of the shooting player before the shot is marked on it
+    :param x: x-coordinate of the shot
+    :param y: y-coordinate of the shot
+    :param ship: ship destroyed by the shot or None
+    :return: points discovered on radar by the shot in order of x and then y
+    """
+    if ship is None:
+        return [(x, y)]
+    (x0, y0), (x1, y1) = ship.placement.points[0], ship.placement.points[-1]
+    return [(px, py) for px in range(max(0, x0 - 1), min(radar.length, x1 + 2))
+            for py in range(max(0, y0 - 1), min(radar.width, y1 + 2)) if radar.is_empty(px, py)]
+
+
+def encode_radar(radar: Table) -> str:
+    """
+    :return: symbols of all cells of radar in order of x and then y
+    """
+    return ''.join(radar.cell(x, y).value for x in range(radar.length) for y in range(radar.width))
+
+
+def snapshot(game) -> str:
+    """
+    :param game: game object
+    :return: line like 'SNAPSHOT <seq> <turn> <winner or -> <length> <width> <radar 0> <radar 1>' with public state
+             of the game, deltas with greater seq apply to it
+    """
+    seq = game.players[0].shots + game.players[1].shots
+    winner = '-' if game.winner is None else str(game.winner)
+    radars = ' '.join(encode_radar(player.field.radar) for player in game.players)
+    return f'SNAPSHOT {seq} {game.turn} {winner} {game.field_length} {game.field_width} {radars}'
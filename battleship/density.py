@@ -0,0 +1,268 @@
+from typing import Tuple, Dict, List, Optional, Set
+from functools import lru_cache
+import copy
+import random
+
+import numpy as np
+
+from .field import Field, Table, popcount
+from .player import ShotResult
+from .ship import Ship
+from .geometry import get_geometry
+from .openings import get_openings
+from .strategy import register
+
+
+@lru_cache(maxsize=None)
+def placement_arrays(field_length: int, field_width: int, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    :param field_length: length of field
+    :param field_width: width of field
+    :param size: ship size
+    :return: numbers of cells occupied by every placement of ship as array of shape (placements, size) and
+             numbers of placements covering every cell as array of shape (cells, 2 * size) padded with -1
+    """
+    placements = get_geometry(field_length, field_width).placements(size)
+    cells = np.array([placement.cells for placement in placements], dtype=np.intp).reshape(len(placements), size)
+    # Sort placements covering every cell by cell number and pad them to the same count
+    order = np.argsort(cells.ravel(), kind='stable')
+    covered = cells.ravel()[order]
+    starts = np.searchsorted(covered, np.arange(field_length * field_width))
+    cover = np.full((field_length * field_width, 2 * size), -1, dtype=np.intp)
+    cover[covered, np.arange(len(covered)) - starts[covered]] = order // size
+    cells.flags.writeable = False
+    cover.flags.writeable = False
+    return cells, cover
+
+
+def mask_cells(mask: int, count: int) -> np.ndarray:
+    """
+    :param mask: bitmask of cells
+    :param count: count of cells on field
+    :return: sorted numbers of cells in given bitmask
+    """
+    data = np.frombuffer(mask.to_bytes((count + 7) // 8, 'little'), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(data, bitorder='little')[:count])
+
+
+@register('density')
+class DensityShooter(object):
+    """
+    Computer player which shoots into the point covered by the largest count of possible placements of the
+    remaining ships. Count of placements covering every cell is updated incrementally when cells are discovered.
+    While a ship is hit but not destroyed, only placements covering all its hit cells are counted.
+    """
+    field_length: int
+    field_width: int
+    rng: random.Random  # source of randomness
+    counts: Dict[int, int]  # count of not destroyed ships of every size
+    valid: Dict[int, np.ndarray]  # placements of every size not covering blocked cells
+    coverage: Dict[int, np.ndarray]  # count of valid placements of every size covering every cell
+    density: np.ndarray  # count of placements of all remaining ships covering every cell
+    blocked: np.ndarray  # cells which can't contain not destroyed ship
+    hits: Set[int]  # hit cells of not destroyed ships
+    seen_water: int  # bitmask of radar water cells already processed
+    seen_hit: int  # bitmask of radar hit cells already processed
+    opening: Optional[List[Tuple[int, int]]]  # opening shots from book or None when opening is over
+    opening_mask: int  # bitmask of opening shots already made
+    prior: Optional[np.ndarray]  # probability of every cell to be occupied before the first shot from book or None
+
+    def __init__(self, field_length: int, field_width: int, rng: random.Random = random):
+        self.field_length = field_length
+        self.field_width = field_width
+        self.rng = rng
+        cell_count = field_length * field_width
+        self.counts = {}
+        for size in Ship.get_sizes(Field(field_length, field_width)):
+            self.counts[size] = self.counts.get(size, 0) + 1
+        self.valid = {}
+        self.coverage = {}
+        self.density = np.zeros(cell_count, dtype=np.int64)
+        for size, count in self.counts.items():
+            cells, _ = placement_arrays(field_length, field_width, size)
+            self.valid[size] = np.ones(len(cells), dtype=bool)
+            self.coverage[size] = np.bincount(cells.ravel(), minlength=cell_count)
+            self.density += count * self.coverage[size]
+        self.blocked = np.zeros(cell_count, dtype=bool)
+        self.hits = set()
+        self.seen_water = 0
+        self.seen_hit = 0
+        self.opening = None
+        self.opening_mask = 0
+        self.prior = None
+        # Opening is mirrored randomly, so the first shots are not the same in every game. Flips are drawn
+        # even without book, so the following shots of seeded games don't depend on whether book is built.
+        flip_x, flip_y = rng.getrandbits(1), rng.getrandbits(1)
+        book = get_openings()
+        shots = book.shots(field_length, field_width) if book is not None else None
+        if shots is not None:
+            self.opening = []
+            for i in shots.tolist():
+                x, y = divmod(i, field_width)
+                self.opening.append((field_length - 1 - x if flip_x else x, field_width - 1 - y if flip_y else y))
+        probabilities = book.probabilities(field_length, field_width) if book is not None else None
+        if probabilities is not None:
+            # Probabilities are mirrored together with the opening
+            probabilities = probabilities.reshape(field_length, field_width)
+            self.prior = probabilities[::-1 if flip_x else 1, ::-1 if flip_y else 1].ravel()
+
+    def fork(self) -> 'DensityShooter':
+        """
+        :return: independent copy of this shooter with its own source of randomness seeded from this one
+        """
+        other = copy.copy(self)
+        # Copies used in another thread must not share generator with this shooter
+        other.rng = random.Random(self.rng.getrandbits(64))
+        other.counts = dict(self.counts)
+        other.valid = {size: valid.copy() for size, valid in self.valid.items()}
+        other.coverage = {size: coverage.copy() for size, coverage in self.coverage.items()}
+        other.density = self.density.copy()
+        other.blocked = self.blocked.copy()
+        other.hits = set(self.hits)
+        return other
+
+    def block(self, cells: np.ndarray):
+        """
+        Remove placements covering given cells from counting
+        :param cells: numbers of cells
+        """
+        cells = cells[~self.blocked[cells]]
+        if not len(cells):
+            return
+        self.blocked[cells] = True
+        cell_count = len(self.density)
+        for size, count in self.counts.items():
+            placements, cover = placement_arrays(self.field_length, self.field_width, size)
+            valid = self.valid[size]
+            candidates = cover[cells].ravel()
+            candidates = np.unique(candidates[candidates >= 0])
+            candidates = candidates[valid[candidates]]
+            if not len(candidates):
+                continue
+            valid[candidates] = False
+            delta = np.bincount(placements[candidates].ravel(), minlength=cell_count)
+            self.coverage[size] -= delta
+            self.density -= count * delta
+
+    def destroy(self, cells: List[int]):
+        """
+        Remove destroyed ship from the remaining fleet
+        :param cells: numbers of cells occupied by ship
+        """
+        size = len(cells)
+        if self.counts.get(size, 0) > 0:
+            self.density -= self.coverage[size]
+            self.counts[size] -= 1
+        self.hits.difference_update(cells)
+        self.block(np.array(cells, dtype=np.intp))
+
+    def neighbours(self, i: int, diagonal: bool) -> List[int]:
+        """
+        :return: numbers of cells adjacent to cell i by side or by corner
+        """
+        x, y = divmod(i, self.field_width)
+        deltas = ((-1, -1), (-1, 1), (1, -1), (1, 1)) if diagonal else ((-1, 0), (1, 0), (0, -1), (0, 1))
+        return [(x + dx) * self.field_width + y + dy for dx, dy in deltas
+                if 0 <= x + dx < self.field_length and 0 <= y + dy < self.field_width]
+
+    def cluster(self, i: int) -> List[int]:
+        """
+        :return: hit cells of not destroyed ships connected with cell i
+        """
+        result = [i]
+        seen = {i}
+        for j in result:
+            for k in self.neighbours(j, False):
+                if k in self.hits and k not in seen:
+                    seen.add(k)
+                    result.append(k)
+        return result
+
+    def sync(self, radar: Table):
+        """
+        Process cells discovered on radar since the previous call
+        """
+        water = radar.water & ~self.seen_water
+        hit = radar.hit & ~self.seen_hit
+        if not water and not hit:
+            return
+        cell_count = len(self.density)
+        self.seen_water |= water
+        self.seen_hit |= hit
+        if water:
+            self.block(mask_cells(water, cell_count))
+        if hit:
+            new_hits = mask_cells(hit, cell_count).tolist()
+            self.hits.update(new_hits)
+            # Ships are straight and don't touch each other, so cells diagonal to hit contain water
+            self.block(np.array([j for i in new_hits for j in self.neighbours(i, True)], dtype=np.intp))
+        # Ship without undiscovered cells around it is destroyed
+        for i in list(self.hits):
+            if i in self.hits:
+                cells = self.cluster(i)
+                if all(not radar.is_empty(*divmod(k, self.field_width))
+                       for j in cells for k in self.neighbours(j, False)):
+                    self.destroy(cells)
+
+    def opening_shot(self, radar: Table) -> Optional[Tuple[int, int]]:
+        """
+        :param radar: radar of the shooting player
+        :return: next shot from opening book or None if opening is over
+        """
+        if self.opening is None:
+            return None
+        if radar.hit or radar.water != self.opening_mask or len(self.opening) == popcount(self.opening_mask):
+            # Some shot hit a ship or was not made by opening
+            self.opening = None
+            return None
+        x, y = self.opening[popcount(self.opening_mask)]
+        self.opening_mask |= radar.bit(x, y)
+        return x, y
+
+    def next_shot(self, radar: Table) -> Tuple[int, int]:
+        """
+        :param radar: radar of the shooting player
+        :return: coordinates of the next shot
+        """
+        self.sync(radar)
+        shot = self.opening_shot(radar)
+        if shot is not None:
+            return shot
+        undiscovered = np.ones(len(self.density), dtype=bool)
+        undiscovered[mask_cells(radar.discovered, len(self.density))] = False
+        score = self.target_score(self.cluster(min(self.hits))) if self.hits else self.density
+        score = np.where(undiscovered & ~self.blocked, score, -1)
+        if score.max() <= 0:
+            # Remaining ships don't fit anywhere, so at least try undiscovered cells
+            score = np.where(undiscovered, 0, -1)
+        best = np.flatnonzero(score == score.max())
+        return divmod(int(best[self.rng.randrange(len(best))]), self.field_width)
+
+    def target_score(self, cluster: List[int]) -> np.ndarray:
+        """
+        :param cluster: hit cells of not destroyed ship
+        :return: count of placements of remaining ships covering all cells of cluster for every cell
+        """
+        cell_count = len(self.density)
+        score = np.zeros(cell_count, dtype=np.int64)
+        for size, count in self.counts.items():
+            if count == 0 or size < len(cluster):
+                continue
+            placements, cover = placement_arrays(self.field_length, self.field_width, size)
+            candidates = cover[cluster[0]]
+            candidates = candidates[candidates >= 0]
+            candidates = candidates[self.valid[size][candidates]]
+            chosen = placements[candidates]
+            chosen = chosen[np.isin(chosen, cluster).sum(axis=1) == len(cluster)]
+            score += count * np.bincount(chosen.ravel(), minlength=cell_count)
+        return score
+
+    def update(self, x: int, y: int, result: ShotResult, radar: Table):
+        """
+        Process result of the shot made by this shooter
+        :param x: x-coordinate of the shot
+        :param y: y-coordinate of the shot
+        :param result: result of the shot
+        :param radar: radar of the shooting player after the shot
+        """
+        self.sync(radar)
@@ -0,0 +1,163 @@
+from typing import Dict, FrozenSet, List, Optional, Tuple
+import random
+import time
+
+from .field import Table
+from .metrics import METRICS
+from .solver import Layouts, SolverShooter, Timeout
+from .strategy import register
+from .transposition import CACHE, TranspositionCache
+
+# Layout of not destroyed ships: sorted bitmasks of their cells
+Layout = Tuple[int, ...]
+# Position of endgame: layouts consistent with radar and bitmask of hit cells of not destroyed ships
+Position = Tuple[FrozenSet[Layout], int]
+
+# Count of search nodes between checks of time budget
+CHECK_PERIOD = 256
+# Relative tolerance within which expected counts of shots are equal
+TOLERANCE = 1e-9
+# Count of memoized positions after which memo is cleared
+MEMO_SIZE = 1 << 14
+
+
+def enumerate_layouts(layouts: Layouts, limit: int, deadline: float) -> Optional[FrozenSet[Layout]]:
+    """
+    :param layouts: consistent layouts
+    :param limit: maximal count of layouts
+    :param deadline: value of time.perf_counter() after which search is abandoned with Timeout
+    :return: all different layouts or None if there are more than limit of them
+    """
+    result = set()
+    nodes = 0
+
+    def search(sizes: Tuple[int, ...], blocked: int, uncovered: int, masks: Tuple[int, ...]) -> bool:
+        nonlocal nodes
+        nodes += 1
+        if nodes % CHECK_PERIOD == 0 and time.perf_counter() > deadline:
+            raise Timeout()
+        if not sizes:
+            if not uncovered:
+                result.add(tuple(sorted(masks)))
+            return len(result) <= limit
+        for _, placement, rest in layouts.branches(sizes, blocked, uncovered):
+            if not search(rest, blocked | placement.halo, uncovered & ~placement.mask, masks + (placement.mask,)):
+                return False
+        return True
+
+    return frozenset(result) if search(layouts.sizes, layouts.forbidden, layouts.hits, ()) else None
+
+
+@register('endgame')
+class EndgameShooter(SolverShooter):
+    """
+    Computer player which plays as solver until few ships with few consistent layouts remain and then follows
+    the policy with the smallest expected count of shots to destroy them. Every layout is equally likely; a shot
+    misses, hits or destroys a ship whose cells are then known, which splits layouts into smaller positions.
+    Expected counts of shots are memoized by position, so the policy is computed once and followed afterwards.
+    Policy and solver share time budget of one shot: solver gets the time left after policy search.
+    """
+    threshold: int  # maximal count of layouts for which policy is computed
+    max_ships: int  # maximal count of not destroyed ships for which policy is computed
+    endgame_budget: float  # time for computing policy for one shot in seconds, at most budget
+    memo: Dict[Position, Tuple[float, Optional[int]]]  # expected count of shots and the best shot by position
+
+    def __init__(self, field_length: int, field_width: int, rng: random.Random = random, budget: float = 0.05,
+                 workers: int = 1, cache: Optional[TranspositionCache] = CACHE, threshold: int = 256,
+                 max_ships: int = 2, endgame_budget: float = 0.025):
+        super().__init__(field_length, field_width, rng, budget, workers, cache)
+        self.threshold = threshold
+        self.max_ships = max_ships
+        self.endgame_budget = endgame_budget
+        self.memo = {}
+
+    def expected(self, layouts: FrozenSet[Layout], hits: int, deadline: float) -> Tuple[float, Optional[int]]:
+        """
+        Expected count of shots to destroy remaining ships when the best policy is followed
+        :param layouts: different layouts consistent with radar
+        :param hits: bitmask of hit cells of not destroyed ships
+        :param deadline: value of time.perf_counter() after which search is abandoned with Timeout
+        :return: expected count of shots and number of cell to shoot, None if all ships are destroyed
+        """
+        key = (layouts, hits)
+        result = self.memo.get(key)
+        if result is not None:
+            return result
+        if time.perf_counter() > deadline:
+            raise Timeout()
+        if not next(iter(layouts)):
+            self.memo[key] = result = (0.0, None)
+            return result
+        # Cells occupied by more layouts are tried first, so the bound cuts more of other cells
+        frequency: Dict[int, int] = {}
+        for layout in layouts:
+            unhit = 0
+            for mask in layout:
+                unhit |= mask
+            unhit &= ~hits
+            while unhit:
+                low = unhit & -unhit
+                unhit ^= low
+                frequency[low] = frequency.get(low, 0) + 1
+        best, best_cell = float('inf'), None
+        total = len(layouts)
+        for bit in sorted(frequency, key=lambda bit: (-frequency[bit], bit)):
+            outcomes: Dict[Tuple[int, int], List[Layout]] = {}
+            for layout in layouts:
+                ship = next((mask for mask in layout if mask & bit), 0)
+                if not ship:
+                    outcome = (0, hits)
+                elif not ship & ~(hits | bit):
+                    # Destroyed ship is removed together with its hit cells, its cells tell it from other layouts
+                    outcome = (ship, (hits | bit) & ~ship)
+                    layout = tuple(mask for mask in layout if mask != ship)
+                else:
+                    outcome = (-1, hits | bit)
+                outcomes.setdefault(outcome, []).append(layout)
+            value = 1.0
+            for (_, child_hits), child in outcomes.items():
+                value += len(child) / total * self.expected(frozenset(child), child_hits, deadline)[0]
+                if value > best * (1 + TOLERANCE):
+                    break
+            if value < best * (1 - TOLERANCE):
+                best, best_cell = value, bit.bit_length() - 1
+        self.memo[key] = result = (best, best_cell)
+        return result
+
+    def endgame_shot(self, deadline: float) -> Optional[Tuple[int, int]]:
+        """
+        :param deadline: value of time.perf_counter() after which search is abandoned
+        :return: the best shot by policy or None if position is not endgame or policy isn't computed in time
+        """
+        if len(self.fleet) > self.max_ships:
+            return None
+        if len(self.memo) > MEMO_SIZE:
+            # Positions of former games and abandoned lines of play
+            self.memo.clear()
+        hits = 0
+        for i in self.hits:
+            hits |= 1 << i
+        try:
+            layouts = enumerate_layouts(self.layouts(), self.threshold, deadline)
+            if not layouts:
+                return None
+            _, cell = self.expected(layouts, hits, deadline)
+        except Timeout:
+            return None
+        if cell is None:
+            return None
+        if METRICS.enabled:
+            METRICS.increment('endgame_moves_total')
+        return divmod(cell, self.field_width)
+
+    def next_shot(self, radar: Table) -> Tuple[int, int]:
+        """
+        :param radar: radar of the shooting player
+        :return: coordinates of the next shot
+        """
+        start = time.perf_counter()
+        self.sync(radar)
+        shot = self.endgame_shot(start + min(self.endgame_budget, self.budget))
+        if shot is not None and radar.is_empty(*shot):
+            return shot
+        return self.solve(radar, self.budget - (time.perf_counter() - start))
@@ -0,0 +1,186 @@
+from typing import BinaryIO, List, Optional
+import random
+import sys
+
+from .battleship import Battleship
+from .field import MIN_LENGTH, MAX_LENGTH, MIN_WIDTH, MAX_WIDTH, Cell, format_point, parse_number, parse_point
+from .player import ShotResult
+
+# Protocol: newline-terminated ASCII lines, words separated by spaces, one or more response lines per command.
+# Commands may be pipelined, responses are written when all commands read at once are processed.
+# Commands:
+#   new <length> <width> [seed] [opponent] [salvo]
+#                                            start game, opponent is computer player name or 'none' (default),
+#                                            salvo is count of shots in every turn, by default player shoots
+#                                            again after every hit
+#   shoot <point>                            shoot for player whose turn it is, point is like 'a5'
+#   batch <point> <point> ...                shoot into points one after another while it is the same player turn
+#   state                                    ask for state of the game
+#   quit                                     stop engine
+# Responses:
+#   game <length> <width>                                new game is started
+#   shot <player> <point> <result> [<first> <last>]      result of shot, first and last points of sunk ship
+#   batch <player> <results>                             one result letter for every shot, '-' if shot is skipped
+#   winner <player>                                      game is over after previous shot
+#   state <turn> <winner or -> <shots> <hits> <enemy shots> <enemy hits> <radar>
+#   error <message>
+# Results are 'w' for water, 'h' for hit and 'k' for killing. Radar of player whose turn it is consists of
+# rows of '.' for unknown cells, 'o' for water and 'x' for hits, one row for every letter, separated by '/'.
+# When game is played against computer, its shots are answered right after the shot which passed the turn to it.
+RESULTS = {ShotResult.water: 'w', ShotResult.hit: 'h', ShotResult.killing: 'k'}
+RADAR = {Cell.empty: '.', Cell.water: 'o', Cell.hit: 'x'}
+
+
+class Engine(object):
+    """
+    Plays games by text commands of external programs
+    """
+    game: Optional[Battleship]
+    opponent: Optional[object]  # computer player which plays for player 1 or None if both players are external
+    done: bool  # True when engine must stop
+
+    def __init__(self):
+        self.game = None
+        self.opponent = None
+        self.done = False
+
+    def execute(self, line: str, out: List[str]):
+        """
+        Process one command and append its responses
+        :param line: command
+        :param out: response lines
+        """
+        words = line.split()
+        if not words:
+            return
+        command, args = words[0].lower(), words[1:]
+        if command == 'shoot':
+            self.shoot(args, out)
+        elif command == 'batch':
+            self.batch(args, out)
+        elif command == 'new':
+            self.new_game(args, out)
+        elif command == 'state':
+            self.state(out)
+        elif command == 'quit':
+            self.done = True
+        else:
+            out.append(f'error unknown command {command}')
+
+    def new_game(self, args: List[str], out: List[str]):
+        numbers = [parse_number(arg) for arg in args[:3] + args[4:5]]
+        if len(args) < 2 or None in numbers:
+            out.append('error usage: new <length> <width> [seed] [opponent] [salvo]')
+            return
+        length, width = numbers[0], numbers[1]
+        if not MIN_LENGTH <= length <= MAX_LENGTH or not MIN_WIDTH <= width <= MAX_WIDTH:
+            out.append(f'error field must be from {MIN_LENGTH}x{MIN_WIDTH} to {MAX_LENGTH}x{MAX_WIDTH}')
+            return
+        rng = random.Random(numbers[2]) if len(args) > 2 else random.Random()
+        opponent = None
+        name = args[3] if len(args) > 3 else 'none'
+        if name != 'none':
+            # Computer players are imported only when needed, because some of them load numpy
+            from .shooter import SHOOTERS
+            if name not in SHOOTERS:
+                out.append(f'error opponent must be one of none, {", ".join(SHOOTERS)}')
+                return
+            opponent = SHOOTERS[name](length, width, rng)
+        salvo = numbers[3] if len(args) > 4 else 0
+        self.game = Battleship(length, width, rng=rng, salvo=salvo)
+        self.opponent = opponent
+        out.append(f'game {length} {width}')
+
+    def sunk(self, player: int, x: int, y: int) -> str:
+        """
+        :return: first and last points of ship destroyed by the shot of given player into (x, y)
+        """
+        ship = self.game.players[1 - player].ships_index[x * self.game.field_width + y]
+        (first_x, first_y), (last_x, last_y) = min(ship.occupied_cells), max(ship.occupied_cells)
+        return f' {format_point(first_x, first_y)} {format_point(last_x, last_y)}'
+
+    def shot_line(self, player: int, x: int, y: int, result: ShotResult) -> str:
+        line = f'shot {player} {format_point(x, y)} {RESULTS[result]}'
+        if result == ShotResult.killing:
+            line += self.sunk(player, x, y)
+        return line
+
+    def finish_turn(self, out: List[str]):
+        """
+        Make shots of computer player while it is its turn and report game over
+        """
+        game = self.game
+        while self.opponent is not None and game.winner is None and game.turn == 1:
+            radar = game.current_player.field.radar
+            x, y = self.opponent.next_shot(radar)
+            result = game.make_shot(x, y)
+            self.opponent.update(x, y, result, radar)
+            out.append(self.shot_line(1, x, y, result))
+        if game.winner is not None:
+            out.append(f'winner {game.winner}')
+
+    def shoot(self, args: List[str], out: List[str]):
+        game = self.game
+        if game is None or game.winner is not None:
+            out.append('error no game')
+            return
+        x, y = parse_point(args[0]) if args else (-1, -1)
+        player = game.turn
+        result = game.make_shot(x, y)
+        if result is None:
+            out.append('error point is not on field or is already discovered')
+            return
+        out.append(self.shot_line(player, x, y, result))
+        self.finish_turn(out)
+
+    def batch(self, args: List[str], out: List[str]):
+        game = self.game
+        if game is None or game.winner is not None:
+            out.append('error no game')
+            return
+        player = game.turn
+        results = game.make_shots([parse_point(arg) for arg in args])
+        out.append(f'batch {player} {"".join("-" if result is None else RESULTS[result] for result in results)}')
+        self.finish_turn(out)
+
+    def state(self, out: List[str]):
+        game = self.game
+        if game is None:
+            out.append('error no game')
+            return
+        me, enemy = game.current_player, game.next_player
+        winner = '-' if game.winner is None else str(game.winner)
+        radar = '/'.join(''.join(RADAR[cell] for cell in row) for row in me.field.radar.content)
+        out.append(f'state {game.turn} {winner} {me.shots} {me.hits} {enemy.shots} {enemy.hits} {radar}')
+
+
+def run(source: BinaryIO, sink: BinaryIO):
+    """
+    Execute commands from source until 'quit' or end of input
+    :param source: stream of commands
+    :param sink: stream of responses
+    """
+    engine = Engine()
+    pending = b''
+    while not engine.done:
+        # Everything available is read at once, so pipelined commands are answered with one write
+        chunk = source.read1(1 << 16)
+        if not chunk:
+            # Last command may be not terminated by newline
+            lines, pending = [pending], b''
+        else:
+            *lines, pending = (pending + chunk).split(b'\n')
+        out = []
+        for line in lines:
+            engine.execute(line.decode(errors='replace'), out)
+            if engine.done:
+                break
+        if out:
+            sink.write(('\n'.join(out) + '\n').encode())
+            sink.flush()
+        if not chunk:
+            break
+
+
+def main():
+    run(sys.stdin.buffer, sys.stdout.buffer)
@@ -0,0 +1,134 @@
+from typing import Callable, Optional, Set, Tuple
+import asyncio
+
+# Count of lines queued for one subscriber, subscriber which falls further behind is resynchronized by snapshot
+QUEUE_SIZE = 64
+# Line after which subscriber stops
+END = 'END'
+
+
+class Subscriber(object):
+    """
+    Connection which receives lines of one game through a bounded queue
+    """
+    writer: asyncio.StreamWriter
+    queue: asyncio.Queue  # lines waiting to be sent
+    lagging: bool  # queue overflowed, queued lines are dropped and snapshot is sent instead
+    task: Optional[asyncio.Task]  # task sending lines
+
+    def __init__(self, writer: asyncio.StreamWriter, queue_size: int = QUEUE_SIZE):
+        self.writer = writer
+        self.queue = asyncio.Queue(queue_size)
+        # The first line is snapshot
+        self.lagging = True
+        self.task = None
+
+    def put(self, line: str):
+        """
+        Queue line or mark subscriber lagging if queue is full
+        """
+        if self.lagging:
+            return
+        try:
+            self.queue.put_nowait(line)
+        except asyncio.QueueFull:
+            self.lagging = True
+
+    async def run(self, snapshot: Callable[[], str]):
+        """
+        Send queued lines until END, lagging subscriber gets current snapshot instead of dropped lines
+        :param snapshot: function returning line with the current state
+        """
+        while True:
+            if self.lagging:
+                ended = False
+                while not self.queue.empty():
+                    ended |= self.queue.get_nowait() == END
+                self.lagging = False
+                self.send(snapshot())
+                if ended:
+                    self.send(END)
+                    return
+            else:
+                line = await self.queue.get()
+                self.send(line)
+                if line == END:
+                    return
+            await self.writer.drain()
+
+    def send(self, line: str):
+        self.writer.write(line.encode() + b'\n')
+
+
+class Fanout(object):
+    """
+    Sends lines of one game to many subscribers, slow subscribers never delay the game or each other
+    """
+    snapshot: Callable[[], str]  # function returning line with the current state of the game
+    subscribers: Set[Subscriber]
+    cached: Optional[Tuple[int, str]]  # count of published lines when snapshot was made and snapshot line
+    version: int  # count of published lines
+    dropped: int  # count of resynchronizations of lagging subscribers
+
+    def __init__(self, snapshot: Callable[[], str]):
+        self.snapshot = snapshot
+        self.subscribers = set()
+        self.cached = None
+        self.version = 0
+        self.dropped = 0
+
+    def current(self) -> str:
+        """
+        :return: snapshot of the current state, computed once for all subscribers resynchronized at the same time
+        """
+        if self.cached is None or self.cached[0] != self.version:
+            self.cached = (self.version, self.snapshot())
+        return self.cached[1]
+
+    def subscribe(self, writer: asyncio.StreamWriter, queue_size: int = QUEUE_SIZE) -> Subscriber:
+        """
+        Start sending snapshot and then published lines to given connection
+        """
+        subscriber = Subscriber(writer, queue_size)
+        self.subscribers.add(subscriber)
+        subscriber.task = asyncio.get_running_loop().create_task(self.serve(subscriber))
+        return subscriber
+
+    async def serve(self, subscriber: Subscriber):
+        try:
+            await subscriber.run(self.current)
+        except ConnectionError:
+            pass
+        finally:
+            self.subscribers.discard(subscriber)
+
+    def unsubscribe(self, subscriber: Subscriber):
+        """
+        Stop sending lines to subscriber
+        """
+        self.subscribers.discard(subscriber)
+        if subscriber.task is not None:
+            subscriber.task.cancel()
+
+    def publish(self, line: str):
+        """
+        Queue line for every subscriber
+        """
+        self.version += 1
+        for subscriber in self.subscribers:
+            lagging = subscriber.lagging
+            subscriber.put(line)
+            if subscriber.lagging and not lagging:
+                self.dropped += 1
+
+    def close(self):
+        """
+        Send END to all subscribers after lines queued for them
+        """
+        for subscriber in self.subscribers:
+            try:
+                subscriber.queue.put_nowait(END)
+            except asyncio.QueueFull:
+                subscriber.lagging = True
+                subscriber.queue.get_nowait()
+                subscriber.queue.put_nowait(END)
@@ -1,6 +1,9 @@
 from enum import Enum
-from string import ascii_uppercase
-from typing import List
+from functools import lru_cache
+from string import ascii_lowercase, ascii_uppercase
+from typing import Dict, Iterable, List, Optional, Tuple
+import random
+import re
 
 MIN_LENGTH = 5
 MAX_LENGTH = 26
@@ -8,6 +11,15 @@ MAX_LENGTH = 26
 MIN_WIDTH = 5
 MAX_WIDTH = 26
 
+# Fields larger than MAX_LENGTH x MAX_WIDTH store only discovered cells and ships and are shown through viewport
+MAX_LARGE_LENGTH = 1000
+MAX_LARGE_WIDTH = 1000
+
+# Point like 'a5' or 'ab120': column letters and row number
+POINT = re.compile(r'([a-zA-Z]{1,3})(\d{1,4})')
+
+MASK64 = (1 << 64) - 1
+
 LEGEND_WIDTH = 14
 LEGEND_HEIGHT = 5
 
@@ -25,27 +37,117 @@ class Cell(Enum):
 class Table(object):
     """
     Describes a table of map or radar
+    Cells are stored as bitmasks where bit number x * width + y describes cell (x, y)
     """
     length: int
     width: int
-    content: List[List[Cell]]
+    water: int  # bitmask of cells with water
+    hit: int  # bitmask of cells with hit ship
+    ship: int  # bitmask of cells with ship
+    keys: Tuple[Tuple[int, ...], Tuple[int, ...], Tuple[int, ...]]  # Zobrist keys of water, hit and ship cells
+    zobrist: int  # Zobrist hash of cells, updated by set methods
 
     def __init__(self, length: int, width: int):
         self.length = length
         self.width = width
-        self.content = [[Cell.empty] * width for _ in range(length)]
+        self.water = 0
+        self.hit = 0
+        self.ship = 0
+        self.keys = zobrist_keys(length, width)
+        self.zobrist = 0
+
+    def bit(self, x: int, y: int) -> int:
+        """
+        :return: bitmask of cell (x, y)
+        """
+        return 1 << (x * self.width + y)
+
+    @property
+    def discovered(self) -> int:
+        """
+        :return: bitmask of not empty cells
+        """
+        return self.water | self.hit | self.ship
 
     def is_empty(self, x: int, y: int) -> bool:
-        return self.content[x][y] == Cell.empty
+        return not (self.water | self.hit | self.ship) >> (x * self.width + y) & 1
 
     def set_water(self, x: int, y: int):
-        self.content[x][y] = Cell.water
+        i = x * self.width + y
+        bit = 1 << i
+        if not self.water & bit:
+            water_keys, hit_keys, ship_keys = self.keys
+            self.zobrist ^= water_keys[i] ^ (hit_keys[i] if self.hit & bit else
+                                             ship_keys[i] if self.ship & bit else 0)
+            self.water |= bit
+            self.hit &= ~bit
+            self.ship &= ~bit
 
     def set_hit(self, x: int, y: int):
-        self.content[x][y] = Cell.hit
+        i = x * self.width + y
+        bit = 1 << i
+        if not self.hit & bit:
+            water_keys, hit_keys, ship_keys = self.keys
+            self.zobrist ^= hit_keys[i] ^ (water_keys[i] if self.water & bit else
+                                           ship_keys[i] if self.ship & bit else 0)
+            self.water &= ~bit
+            self.hit |= bit
+            self.ship &= ~bit
 
     def set_ship(self, x: int, y: int):
-        self.content[x][y] = Cell.ship
+        i = x * self.width + y
+        bit = 1 << i
+        if not self.ship & bit:
+            water_keys, hit_keys, ship_keys = self.keys
+            self.zobrist ^= ship_keys[i] ^ (water_keys[i] if self.water & bit else
+                                            hit_keys[i] if self.hit & bit else 0)
+            self.water &= ~bit
+            self.hit &= ~bit
+            self.ship |= bit
+
+    def set_water_mask(self, mask: int):
+        """
+        Mark all cells of given bitmask as water
+        """
+        changed = mask & ~self.water
+        if changed:
+            water_keys, hit_keys, ship_keys = self.keys
+            zobrist = self.zobrist ^ xor_keys(changed, water_keys)
+            if changed & self.hit:
+                zobrist ^= xor_keys(changed & self.hit, hit_keys)
+            if changed & self.ship:
+                zobrist ^= xor_keys(changed & self.ship, ship_keys)
+            self.zobrist = zobrist
+            self.water |= mask
+            self.hit &= ~mask
+            self.ship &= ~mask
+
+    def rehash(self):
+        """
+        Compute Zobrist hash again after bitmasks are assigned directly
+        """
+        water_keys, hit_keys, ship_keys = self.keys
+        self.zobrist = xor_keys(self.water, water_keys) ^ xor_keys(self.hit, hit_keys) ^ xor_keys(self.ship, ship_keys)
+
+    def cell(self, x: int, y: int) -> Cell:
+        """
+        :return: symbol in cell (x, y)
+        """
+        i = x * self.width + y
+        if self.water >> i & 1:
+            return Cell.water
+        if self.hit >> i & 1:
+            return Cell.hit
+        if self.ship >> i & 1:
+            return Cell.ship
+        return Cell.empty
+
+    @property
+    def content(self) -> List[List[Cell]]:
+        """
+        :return: matrix of symbols in cells
+        """
+        return [[self.cell(x, y) for y in range(self.width)] for x in range(self.length)]
 
     @property
     def height_on_screen(self) -> int:
@@ -56,6 +158,13 @@ class Table(object):
         num_len = 1 if self.width < 10 else 2
         return num_len + 2 * self.length
 
+    def set_water_around(self, placement):
+        """
+        Mark undiscovered cells around destroyed ship as water
+        :param placement: position of the ship
+        """
+        self.set_water_mask(placement.halo & ~self.discovered)
+
     @property
     def rows(self) -> List[str]:
         """
@@ -65,10 +174,136 @@ class Table(object):
         num_len = 1 if self.width < 10 else 2
         result = [padding + ' '.join(ascii_uppercase[:self.length])]
         for i in range(self.width):
-            result.append(str(i + 1).rjust(num_len) + ' ' + ' '.join(col[i].value for col in self.content))
+            result.append(str(i + 1).rjust(num_len) + ' ' + ' '.join(self.cell(x, i).value for x in range(self.length)))
+        return result
+
+    def window_rows(self, left: int, top: int, columns: int, lines: int) -> List[str]:
+        """
+        :param left: x-coordinate of the first shown column
+        :param top: y-coordinate of the first shown row
+        :param columns: count of shown columns
+        :param lines: count of shown rows
+        :return: representation of part of this table with coordinates by sides, every fifth column is labeled
+        """
+        num_len = len(str(self.width))
+        header = [' '] * (num_len + 2 * columns)
+        for x in range(left, left + columns):
+            if x % 5 == 0:
+                name = column_name(x)
+                start = num_len + 1 + 2 * (x - left)
+                header[start:start + len(name)] = name.upper()
+        result = [''.join(header[:num_len + 2 * columns])]
+        for y in range(top, top + lines):
+            result.append(str(y + 1).rjust(num_len) + ' '
+                          + ' '.join(self.cell(x, y).value for x in range(left, left + columns)))
         return result
 
 
+class SparseTable(Table):
+    """
+    Table of large field which stores only not empty cells, so its size depends on count of shots and ships
+    rather than on field area. Bitmasks are built on demand for code which needs the whole table.
+    """
+    cells: Dict[int, Cell]  # symbol of every not empty cell by its number x * width + y
+
+    def __init__(self, length: int, width: int):
+        self.length = length
+        self.width = width
+        self.cells = {}
+        self.zobrist = 0
+
+    def __copy__(self) -> 'SparseTable':
+        other = SparseTable(self.length, self.width)
+        other.cells = dict(self.cells)
+        other.zobrist = self.zobrist
+        return other
+
+    def cells_of(self, symbol: Cell) -> int:
+        """
+        :return: bitmask of cells with given symbol
+        """
+        return cells_mask((i for i, cell in self.cells.items() if cell == symbol), self.length * self.width)
+
+    def assign(self, symbol: Cell, mask: int):
+        """
+        Replace cells with given symbol by cells of given bitmask, hash is computed again by rehash
+        """
+        self.cells = {i: cell for i, cell in self.cells.items() if cell != symbol}
+        for i in mask_indices(mask):
+            self.cells[i] = symbol
+
+    @property
+    def water(self) -> int:
+        return self.cells_of(Cell.water)
+
+    @water.setter
+    def water(self, mask: int):
+        self.assign(Cell.water, mask)
+
+    @property
+    def hit(self) -> int:
+        return self.cells_of(Cell.hit)
+
+    @hit.setter
+    def hit(self, mask: int):
+        self.assign(Cell.hit, mask)
+
+    @property
+    def ship(self) -> int:
+        return self.cells_of(Cell.ship)
+
+    @ship.setter
+    def ship(self, mask: int):
+        self.assign(Cell.ship, mask)
+
+    @property
+    def discovered(self) -> int:
+        return cells_mask(self.cells, self.length * self.width)
+
+    def bit(self, x: int, y: int) -> int:
+        return 1 << (x * self.width + y)
+
+    def is_empty(self, x: int, y: int) -> bool:
+        return x * self.width + y not in self.cells
+
+    def set_cell(self, i: int, symbol: Cell):
+        """
+        Put symbol into cell number i and update hash
+        """
+        old = self.cells.get(i)
+        if old != symbol:
+            self.zobrist ^= cell_key(SYMBOL_KEYS[symbol], i)
+            if old is not None:
+                self.zobrist ^= cell_key(SYMBOL_KEYS[old], i)
+            self.cells[i] = symbol
+
+    def set_water(self, x: int, y: int):
+        self.set_cell(x * self.width + y, Cell.water)
+
+    def set_hit(self, x: int, y: int):
+        self.set_cell(x * self.width + y, Cell.hit)
+
+    def set_ship(self, x: int, y: int):
+        self.set_cell(x * self.width + y, Cell.ship)
+
+    def set_water_mask(self, mask: int):
+        for i in mask_indices(mask):
+            self.set_cell(i, Cell.water)
+
+    def set_water_around(self, placement):
+        for i in placement.halo_cells():
+            if i not in self.cells:
+                self.set_cell(i, Cell.water)
+
+    def rehash(self):
+        self.zobrist = 0
+        for i, symbol in self.cells.items():
+            self.zobrist ^= cell_key(SYMBOL_KEYS[symbol], i)
+
+    def cell(self, x: int, y: int) -> Cell:
+        return self.cells.get(x * self.width + y, Cell.empty)
+
+
 class Field(object):
     """
     Describes player field: map and radar
@@ -81,8 +316,16 @@ class Field(object):
     def __init__(self, length: int, width: int):
         self.length = length
         self.width = width
-        self.map = Table(length, width)
-        self.radar = Table(length, width)
+        table = SparseTable if is_large(length, width) else Table
+        self.map = table(length, width)
+        self.radar = table(length, width)
+
+    @property
+    def is_large(self) -> bool:
+        """
+        :return: True if tables of this field store only not empty cells
+        """
+        return isinstance(self.map, SparseTable)
 
     def on_field(self, x: int, y: int) -> bool:
         """
@@ -90,6 +333,23 @@ class Field(object):
         """
         return 0 <= x < self.length and 0 <= y < self.width
 
+    def bit(self, x: int, y: int) -> int:
+        """
+        :return: bitmask of point (x, y)
+        """
+        return 1 << (x * self.width + y)
+
+    def mask(self, cells) -> int:
+        """
+        :param cells: points (x, y), points outside the field are ignored
+        :return: bitmask of given points on the field
+        """
+        result = 0
+        for x, y in cells:
+            if self.on_field(x, y):
+                result |= 1 << (x * self.width + y)
+        return result
+
     @property
     def height_on_screen(self) -> int:
         return max(self.map.height_on_screen, self.radar.height_on_screen)
@@ -114,3 +374,120 @@ class Field(object):
                 f'|    hit: {str(Cell.hit.value)}  |',
                 f'|  water: {str(Cell.water.value)}  |',
                 f'+------------+']
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(length: int, width: int) -> Tuple[Tuple[int, ...], Tuple[int, ...], Tuple[int, ...]]:
+    """
+    :return: random 64-bit keys of water, hit and ship in every cell, the same in every run
+    """
+    rng = random.Random(f'zobrist {length}x{width}')
+    return tuple(tuple(rng.getrandbits(64) for _ in range(length * width)) for _ in range(3))
+
+
+def xor_keys(mask: int, keys: Tuple[int, ...]) -> int:
+    """
+    :return: XOR of keys of cells in bitmask
+    """
+    result = 0
+    while mask:
+        low = mask & -mask
+        result ^= keys[low.bit_length() - 1]
+        mask ^= low
+    return result
+
+
+# Number of symbol in keys of sparse tables
+SYMBOL_KEYS = {Cell.water: 0, Cell.hit: 1, Cell.ship: 2}
+
+
+def cell_key(symbol: int, i: int) -> int:
+    """
+    Zobrist key of symbol in cell of sparse table, computed by SplitMix64 instead of being stored for every cell
+    :param symbol: 0 for water, 1 for hit and 2 for ship
+    :param i: cell number
+    :return: random 64-bit key, the same in every run
+    """
+    z = (3 * i + symbol + 1) * 0x9E3779B97F4A7C15 & MASK64
+    z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9 & MASK64
+    z = (z ^ (z >> 27)) * 0x94D049BB133111EB & MASK64
+    return z ^ (z >> 31)
+
+
+def is_large(length: int, width: int) -> bool:
+    """
+    :return: True if field with given sizes is larger than fields which are stored as bitmasks
+    """
+    return length > MAX_LENGTH or width > MAX_WIDTH
+
+
+def cells_mask(cells: Iterable[int], count: int) -> int:
+    """
+    :param cells: cell numbers
+    :param count: count of cells on field
+    :return: bitmask of given cells
+    """
+    data = bytearray((count + 7) // 8)
+    for i in cells:
+        data[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(data, 'little')
+
+
+def mask_indices(mask: int) -> List[int]:
+    """
+    :return: numbers of cells in bitmask
+    """
+    digits = bin(mask)
+    last = len(digits) - 1
+    return [last - match.start() for match in re.finditer('1', digits)]
+
+
+def popcount(mask: int) -> int:
+    """
+    :return: count of cells in bitmask
+    """
+    return bin(mask).count('1')
+
+
+def column_name(x: int) -> str:
+    """
+    :return: letters of column like in spreadsheets: 'a' to 'z', then 'aa' to 'az', 'ba' and so on
+    """
+    name = ''
+    x += 1
+    while x:
+        x, letter = divmod(x - 1, 26)
+        name = ascii_lowercase[letter] + name
+    return name
+
+
+def parse_point(s: str) -> Tuple[int, int]:
+    """
+    Check that string has form '1-3 letters and 1-4 digits' and
+    parse it as coordinates on battleship field.
+    :param s: user input like 'a5', 'B10' or 'ab120'
+    :return: coordinates greater 0 on success or (-1, -1) on failure
+    """
+    match = POINT.fullmatch(s)
+    if match is None:
+        return -1, -1
+    x = 0
+    for letter in match.group(1).lower():
+        x = x * 26 + ascii_lowercase.index(letter) + 1
+    return x - 1, int(match.group(2)) - 1
+
+
+def parse_number(s: str) -> Optional[int]:
+    """
+    :param s: word of protocol command
+    :return: value of number written with ASCII digits or None if word is not such number
+    """
+    # str.isdigit accepts digits like '²' which int() doesn't parse
+    return int(s) if s.isascii() and s.isdigit() else None
+
+
+def format_point(x: int, y: int) -> str:
+    """
+    :return: representation of coordinates on battleship field like 'a5', inverse of parse_point
+    """
+    return column_name(x) + str(y + 1)
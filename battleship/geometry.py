@@ -0,0 +1,188 @@
+from typing import Tuple, Dict, List
+from functools import lru_cache
+
+from .field import is_large
+
+
+class Placement(object):
+    """
+    Describes position of ship on field
+    """
+    __slots__ = ('size', 'x', 'y', 'rotation', 'index', 'points', 'cells', 'mask', 'halo')
+    size: int
+    x: int  # x-coordinate of starting point
+    y: int  # y-coordinate of starting point
+    rotation: int  # 0 for east or 1 for south
+    index: int  # number of placement among placements of ships with the same size
+    points: Tuple[Tuple[int, int], ...]  # points (x, y) occupied by ship
+    cells: Tuple[int, ...]  # numbers x * width + y of occupied cells
+    mask: int  # bitmask of occupied cells
+    halo: int  # bitmask of occupied cells and cells adjacent to them
+
+    def __init__(self, size: int, x: int, y: int, rotation: int, index: int, field_length: int, field_width: int):
+        self.size = size
+        self.x = x
+        self.y = y
+        self.rotation = rotation
+        self.index = index
+        dx, dy = (1, 0) if rotation == 0 else (0, 1)
+        self.points = tuple((x + dx * k, y + dy * k) for k in range(size))
+        self.cells = tuple(px * field_width + py for px, py in self.points)
+        self.mask = 0
+        for i in self.cells:
+            self.mask |= 1 << i
+        x1, y1 = self.points[-1]
+        self.halo = 0
+        for px in range(max(0, x - 1), min(field_length, x1 + 2)):
+            for py in range(max(0, y - 1), min(field_width, y1 + 2)):
+                self.halo |= 1 << (px * field_width + py)
+
+
+class SparsePlacement(Placement):
+    """
+    Position of ship on large field, bitmasks have a bit for every cell of the field,
+    so they are computed only when they are needed
+    """
+    __slots__ = ('field_length', 'field_width')
+    field_length: int
+    field_width: int
+
+    def __init__(self, size: int, x: int, y: int, rotation: int, index: int, field_length: int, field_width: int):
+        self.size = size
+        self.x = x
+        self.y = y
+        self.rotation = rotation
+        self.index = index
+        self.field_length = field_length
+        self.field_width = field_width
+        dx, dy = (1, 0) if rotation == 0 else (0, 1)
+        self.points = tuple((x + dx * k, y + dy * k) for k in range(size))
+        self.cells = tuple(px * field_width + py for px, py in self.points)
+
+    def halo_cells(self) -> List[int]:
+        """
+        :return: numbers of occupied cells and cells adjacent to them
+        """
+        x1, y1 = self.points[-1]
+        return [px * self.field_width + py
+                for px in range(max(0, self.x - 1), min(self.field_length, x1 + 2))
+                for py in range(max(0, self.y - 1), min(self.field_width, y1 + 2))]
+
+    @property
+    def mask(self) -> int:
+        result = 0
+        for i in self.cells:
+            result |= 1 << i
+        return result
+
+    @property
+    def halo(self) -> int:
+        result = 0
+        for i in self.halo_cells():
+            result |= 1 << i
+        return result
+
+
+class Geometry(object):
+    """
+    Describes all placements of ships on field of given sizes, shared by all games on such fields
+    """
+    length: int
+    width: int
+    large: bool  # placements of large field are not enumerated, they are created when they are needed
+    by_size: Dict[int, List[Placement]]  # different placements of ships of every size
+    cover_by_size: Dict[int, List[List[Placement]]]  # placements of every size covering every cell
+
+    def __init__(self, length: int, width: int):
+        self.length = length
+        self.width = width
+        self.large = is_large(length, width)
+        self.by_size = {}
+        self.cover_by_size = {}
+
+    def placements(self, size: int) -> List[Placement]:
+        """
+        :return: all different placements of ship with given size
+        """
+        assert not self.large, 'Placements of large field are not enumerated'
+        result = self.by_size.get(size)
+        if result is None:
+            result = []
+            # Ships directed to west and north are the same as directed to east and south
+            for rotation in range(1 if size == 1 else 2):
+                dx, dy = (size - 1, 0) if rotation == 0 else (0, size - 1)
+                for x in range(self.length - dx):
+                    for y in range(self.width - dy):
+                        result.append(Placement(size, x, y, rotation, len(result), self.length, self.width))
+            self.by_size[size] = result
+        return result
+
+    def covering(self, size: int) -> List[List[Placement]]:
+        """
+        :return: placements of ship with given size covering every cell
+        """
+        result = self.cover_by_size.get(size)
+        if result is None:
+            result = [[] for _ in range(self.length * self.width)]
+            for placement in self.placements(size):
+                for i in placement.cells:
+                    result[i].append(placement)
+            self.cover_by_size[size] = result
+        return result
+
+    def placement(self, size: int, x: int, y: int, rotation: int) -> Placement:
+        """
+        :param size: ship size
+        :param x: x-coordinate of starting point
+        :param y: y-coordinate of starting point
+        :param rotation: ship rotation: 0 - east, 1 - south, 2 - west, 3 - north
+        :return: placement of ship with given starting point and rotation
+        :raise ValueError: if rotation is invalid or ship is not on field
+        """
+        if size < 1 or not 0 <= rotation < 4:
+            raise ValueError(f'Invalid ship: {(size, rotation)}')
+        if rotation == 2:
+            x, rotation = x - size + 1, 0
+        elif rotation == 3:
+            y, rotation = y - size + 1, 1
+        if size == 1:
+            rotation = 0
+        dx, dy = (size - 1, 0) if rotation == 0 else (0, size - 1)
+        if not (0 <= x < self.length - dx and 0 <= y < self.width - dy):
+            raise ValueError(f'Ship is not on field: {(x, y)}')
+        index = x * (self.width - dy) + y
+        if rotation == 1:
+            index += (self.length - size + 1) * self.width
+        if self.large:
+            return SparsePlacement(size, x, y, rotation, index, self.length, self.width)
+        return self.placements(size)[index]
+
+    def count(self, size: int) -> int:
+        """
+        :return: count of different placements of ship with given size
+        """
+        count = (self.length - size + 1) * self.width
+        if size > 1:
+            count += self.length * (self.width - size + 1)
+        return count
+
+    def placement_at(self, size: int, index: int) -> Placement:
+        """
+        :param size: ship size
+        :param index: number of placement among placements of ships with given size, see Placement.index
+        :return: placement with given number
+        """
+        east = (self.length - size + 1) * self.width
+        if index < east:
+            x, y = divmod(index, self.width)
+            return self.placement(size, x, y, 0)
+        x, y = divmod(index - east, self.width - size + 1)
+        return self.placement(size, x, y, 1)
+
+
+@lru_cache(maxsize=None)
+def get_geometry(length: int, width: int) -> Geometry:
+    """
+    :return: shared placements of ships on field with given sizes
+    """
+    return Geometry(length, width)
@@ -0,0 +1,190 @@
+from typing import Optional, Tuple, Iterator
+from pathlib import Path
+import mmap
+import os
+import struct
+
+from .battleship import Battleship
+from .player import ShotResult
+from . import savefile
+
+# Journal file layout (little-endian):
+#   header: magic, format version, size of initial save
+#   initial state of the game in save format
+#   fixed-size record for every made shot
+MAGIC = b'BSHJ'
+VERSION = 1
+HEADER = struct.Struct('<4sBI')  # magic, version, size of initial save
+RECORD = struct.Struct('<BHHB')  # player, x, y, result
+
+# Count of shots between snapshots
+SNAPSHOT_INTERVAL = 32
+
+
+class Journal(object):
+    """
+    Append-only journal of shots of one game with periodic snapshots of the game
+    """
+    path: Path
+    snapshot_path: Path
+    game_id: int
+    records: int  # count of records in journal
+    sync: bool  # flush records to disk on every shot
+
+    def __init__(self, path: Path, snapshot_path: Path, game: Battleship, sync: bool = False):
+        """
+        Continue journal of given game or start new one if journal belongs to another game or state
+        :param path: path of journal file
+        :param snapshot_path: path of file where game is saved periodically
+        :param game: game object
+        :param sync: flush records to disk on every shot and not only to operating system
+        """
+        self.path = path
+        self.snapshot_path = snapshot_path
+        self.game_id = game.game_id
+        self.sync = sync
+        try:
+            initial, records = read(path)
+            # Records are numbered from the initial state, which may already have shots
+            start = shots_made(game) - shots_made(initial)
+            if initial.game_id != game.game_id or not 0 <= start <= records:
+                raise ValueError('Journal belongs to another game')
+            with open(path, 'r+b') as file:
+                # Drop records which are not applied to given game
+                file.truncate(record_offset(file) + start * RECORD.size)
+            self.file = open(path, 'ab')
+        except (IOError, ValueError):
+            data = savefile.dumps(game)
+            self.file = open(path, 'wb')
+            self.file.write(HEADER.pack(MAGIC, VERSION, len(data)) + data)
+            self.file.flush()
+            start = 0
+        self.records = start
+
+    def append(self, game: Battleship, player: int, x: int, y: int, result: ShotResult):
+        """
+        Record shot which was made in given game and save snapshot of game if it is time
+        :param game: game object after the shot
+        :param player: number of player who made the shot
+        :param x: x-coordinate of the shot
+        :param y: y-coordinate of the shot
+        :param result: result of the shot
+        """
+        self.file.write(RECORD.pack(player, x, y, result.value))
+        self.file.flush()
+        if self.sync:
+            os.fsync(self.file.fileno())
+        self.records += 1
+        if self.records % SNAPSHOT_INTERVAL == 0:
+            self.snapshot(game)
+
+    def snapshot(self, game: Battleship):
+        """
+        Save given game, journal records after it are replayed on restore
+        """
+        savefile.save(game, self.snapshot_path)
+
+    def close(self):
+        self.file.close()
+
+
+def shots_made(game: Battleship) -> int:
+    """
+    :return: count of shots made in given game by both players
+    """
+    return game.players[0].shots + game.players[1].shots
+
+
+def record_offset(file) -> int:
+    """
+    :param file: journal file
+    :return: position of the first record in journal
+    """
+    file.seek(0)
+    header = file.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError('Journal is truncated')
+    magic, version, size = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError('Not a battleship journal')
+    if version != VERSION:
+        raise ValueError(f'Unsupported journal version: {version}')
+    return HEADER.size + size
+
+
+def read(path: Path) -> Tuple[Battleship, int]:
+    """
+    :param path: path of journal file
+    :return: initial state of the game and count of complete records in journal
+    """
+    with open(path, 'rb') as file:
+        offset = record_offset(file)
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            with memoryview(data) as view:
+                if len(view) < offset:
+                    raise ValueError('Journal is truncated')
+                # Snapshot is copied, so the view is released even if loads raises with the slice in traceback
+                snapshot = bytes(view[HEADER.size:offset])
+                return savefile.loads(snapshot), (len(view) - offset) // RECORD.size
+
+
+def records(path: Path, start: int = 0) -> Iterator[Tuple[int, int, int, ShotResult]]:
+    """
+    :param path: path of journal file
+    :param start: number of the first record
+    :return: player, x, y and result of every recorded shot beginning with given one
+    """
+    with open(path, 'rb') as file:
+        offset = record_offset(file)
+        file.seek(offset + start * RECORD.size)
+        data = file.read()
+    # Ignore incomplete record written at the moment of crash
+    data = data[:len(data) - len(data) % RECORD.size]
+    for player, x, y, result in RECORD.iter_unpack(data):
+        yield player, x, y, ShotResult(result)
+
+
+def apply(game: Battleship, record: Tuple[int, int, int, ShotResult]):
+    """
+    Repeat recorded shot in given game
+    """
+    player, x, y, result = record
+    if game.turn != player or game.make_shot(x, y) != result:
+        raise ValueError(f'Journal does not match the game: {record}')
+
+
+def replay(path: Path) -> Iterator[Tuple[Battleship, Tuple[int, int, int, ShotResult]]]:
+    """
+    Replay whole recorded game from the beginning
+    :param path: path of journal file
+    :return: game object after every recorded shot and the shot itself, the same game object is yielded every time
+    """
+    game, _ = read(path)
+    for record in records(path):
+        apply(game, record)
+        yield game, record
+
+
+def restore(path: Path, snapshot_path: Path) -> Battleship:
+    """
+    Restore the latest state of the game from snapshot and journal records made after it
+    :param path: path of journal file
+    :param snapshot_path: path of file where game is saved periodically
+    :return: game object
+    """
+    game: Optional[Battleship] = None
+    try:
+        initial, _ = read(path)
+    except IOError:
+        # Snapshot without journal
+        return savefile.load(snapshot_path)
+    try:
+        game = savefile.load(snapshot_path)
+    except (IOError, ValueError):
+        pass
+    # Snapshot older than initial state of journal is left from former journal of the game
+    if game is None or game.game_id != initial.game_id or shots_made(game) < shots_made(initial):
+        game = initial
+    for record in records(path, shots_made(game) - shots_made(initial)):
+        apply(game, record)
+    return game
@@ -0,0 +1,80 @@
+from typing import List, Tuple
+import pickle
+
+from .battleship import Battleship
+from .field import Cell
+from .geometry import get_geometry
+from .player import ShotResult
+from .savefile import restore
+from .ship import Ship
+
+
+class LegacyObject(object):
+    """
+    Attributes of object from former pickle save
+    """
+
+
+class LegacyUnpickler(pickle.Unpickler):
+    """
+    Unpickler which creates only plain attribute holders and symbols instead of arbitrary objects
+    """
+    CLASSES = {('battleship', 'Battleship'), ('player', 'Player'), ('field', 'Field'), ('field', 'Table'),
+               ('ship', 'Ship')}
+
+    def find_class(self, module: str, name: str):
+        if (module, name) in self.CLASSES:
+            return LegacyObject
+        if (module, name) == ('field', 'Cell'):
+            return Cell
+        if (module, name) == ('player', 'ShotResult'):
+            return ShotResult
+        raise pickle.UnpicklingError(f'Forbidden class in save: {module}.{name}')
+
+
+def legacy_ships(field_length: int, field_width: int, content: List[List[Cell]]) -> Tuple[List[Ship], int]:
+    """
+    Find ships on map of former save
+    :param content: matrix of symbols on map
+    :return: ships and bitmask of cells shot by enemy
+    """
+    geometry = get_geometry(field_length, field_width)
+    ships = []
+    received = 0
+    seen = set()
+    for x in range(field_length):
+        for y in range(field_width):
+            cell = content[x][y]
+            if cell in (Cell.water, Cell.hit):
+                received |= 1 << (x * field_width + y)
+            if cell in (Cell.ship, Cell.hit) and (x, y) not in seen:
+                # Ships are straight, so (x, y) is the most western and northern point of ship
+                size = 1
+                rotation = 0
+                while x + size < field_length and content[x + size][y] in (Cell.ship, Cell.hit):
+                    size += 1
+                if size == 1:
+                    while y + size < field_width and content[x][y + size] in (Cell.ship, Cell.hit):
+                        size += 1
+                    rotation = 1
+                ship = Ship(geometry.placement(size, x, y, rotation))
+                seen.update(ship.placement.points)
+                ships.append(ship)
+    return ships, received
+
+
+def load_legacy(file) -> Battleship:
+    """
+    Read game from a file in former pickle format
+    """
+    try:
+        game = LegacyUnpickler(file).load()
+        fleets = []
+        received = []
+        for player in game.players:
+            ships, shots = legacy_ships(game.field_length, game.field_width, player.field.map.content)
+            fleets.append(ships)
+            received.append(shots)
+        return restore(game.field_length, game.field_width, game.turn, game.host, fleets, received, game.messages)
+    except (pickle.UnpicklingError, AttributeError, AssertionError, EOFError, TypeError, IndexError) as e:
+        raise ValueError(f'Cannot read former save: {e}')
@@ -0,0 +1,107 @@
+from typing import List
+import asyncio
+import random
+import statistics
+import time
+
+from .field import format_point
+
+
+class LoadReport(object):
+    """
+    Describes results of load test
+    """
+    games: int  # count of finished games
+    shots: int  # count of shots made by clients
+    errors: int  # count of rejected shots
+    latencies: List[float]  # time between sending shot and receiving its result in seconds
+    seconds: float  # elapsed wall time
+
+    def __init__(self):
+        self.games = 0
+        self.shots = 0
+        self.errors = 0
+        self.latencies = []
+        self.seconds = 0.0
+
+    def display(self) -> str:
+        """
+        :return: representation of report
+        """
+        latencies = sorted(self.latencies) or [0.0]
+
+        def percentile(p: float) -> float:
+            return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1e3
+
+        rows = [f'games:      {self.games}',
+                f'time:       {self.seconds:.3f} s',
+                f'games/sec:  {self.games / self.seconds:.1f}',
+                f'shots/sec:  {self.shots / self.seconds:.1f}',
+                f'errors:     {self.errors}',
+                f'latency:    mean {statistics.fmean(latencies) * 1e3:.3f} ms, '
+                f'p50 {percentile(50):.3f} ms, p99 {percentile(99):.3f} ms, max {latencies[-1] * 1e3:.3f} ms']
+        return '\n'.join(rows)
+
+
+async def play(host: str, port: int, games: int, field_length: int, field_width: int, shooter: str,
+               rng: random.Random, report: LoadReport):
+    """
+    Play given count of games against computer with random shots over one connection
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(games):
+            writer.write(f'NEW {field_length} {field_width} AI {shooter}\n'.encode())
+            points = [(x, y) for x in range(field_length) for y in range(field_width)]
+            rng.shuffle(points)
+            sent = 0.0
+            while True:
+                words = (await reader.readline()).decode().split()
+                if not words:
+                    raise ConnectionError('Server closed connection')
+                if words[0] == 'SHOT' or (words[0] == 'ERR' and sent):
+                    report.latencies.append(time.perf_counter() - sent)
+                    sent = 0.0
+                if words[0] == 'ERR':
+                    report.errors += 1
+                if words[0] == 'SHOT':
+                    report.shots += 1
+                if words[-1] in ('WIN', 'LOSE'):
+                    report.games += 1
+                    break
+                if words[0] in ('TURN', 'ERR') or words[-1] in ('TURN', 'AGAIN'):
+                    # Cells around destroyed ships are rejected by server with ERR and the next point is tried
+                    writer.write(f'SHOT {format_point(*points.pop())}\n'.encode())
+                    sent = time.perf_counter()
+        writer.write(b'QUIT\n')
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+async def run(host: str, port: int, connections: int, games: int, field_length: int, field_width: int,
+              shooter: str, seed: int) -> LoadReport:
+    report = LoadReport()
+    start = time.perf_counter()
+    await asyncio.gather(*(play(host, port, games, field_length, field_width, shooter,
+                                random.Random(f'{seed} {i}'), report)
+                           for i in range(connections)))
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def load_test(host: str = '127.0.0.1', port: int = 7777, connections: int = 1000, games: int = 1,
+              field_length: int = 10, field_width: int = 10, shooter: str = 'density', seed: int = 0) -> LoadReport:
+    """
+    Play many simultaneous games against computer players on server
+    :param host: host of server
+    :param port: port of server
+    :param connections: count of simultaneous connections
+    :param games: count of games played over every connection one after another
+    :param field_length: length of game field
+    :param field_width: width of game field
+    :param shooter: name of computer player on server
+    :param seed: seed of random shots
+    :return: report about played games
+    """
+    return asyncio.run(run(host, port, connections, games, field_length, field_width, shooter, seed))
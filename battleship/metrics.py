@@ -0,0 +1,114 @@
+from typing import Callable, Dict, List
+import bisect
+
+# Upper bounds of histogram buckets in seconds
+BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2,
+           0.1, 0.25, 0.5, 1.0, float('inf'))
+
+
+class Events(dict):
+    """
+    Callbacks registered for events by event name
+    Empty object is false, so emitting can be skipped with a single check when nothing is registered
+    """
+
+    def on(self, event: str, callback: Callable):
+        """
+        Register callback which is called with arguments of every emitted event with given name
+        """
+        self.setdefault(event, []).append(callback)
+
+    def off(self, event: str, callback: Callable):
+        """
+        Unregister callback
+        """
+        callbacks = self.get(event, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+        if not callbacks:
+            self.pop(event, None)
+
+    def emit(self, event: str, *args):
+        for callback in self.get(event, ()):
+            callback(*args)
+
+
+class Histogram(object):
+    """
+    Count of observed values in every bucket
+    """
+    counts: List[int]  # count of values in every bucket
+    sum: float  # sum of observed values
+    count: int  # count of observed values
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics(object):
+    """
+    Counters and latency histograms of the game engine, collected only when enabled
+    """
+    enabled: bool
+    counters: Dict[str, int]
+    histograms: Dict[str, Histogram]
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.counters = {}
+        self.histograms = {}
+
+    def increment(self, name: str, value: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.observe(seconds)
+
+    def reset(self):
+        self.counters.clear()
+        self.histograms.clear()
+
+    def snapshot(self) -> dict:
+        """
+        :return: values of counters and histograms
+        """
+        return {
+            'counters': dict(self.counters),
+            'histograms': {name: {'buckets': dict(zip(map(str, BUCKETS), histogram.counts)),
+                                  'sum': histogram.sum,
+                                  'count': histogram.count}
+                           for name, histogram in self.histograms.items()},
+        }
+
+    def prometheus(self, prefix: str = 'battleship_') -> str:
+        """
+        :return: values of counters and histograms in Prometheus text format
+        """
+        lines = []
+        for name, value in sorted(self.counters.items()):
+            lines.append(f'# TYPE {prefix}{name} counter')
+            lines.append(f'{prefix}{name} {value}')
+        for name, histogram in sorted(self.histograms.items()):
+            lines.append(f'# TYPE {prefix}{name} histogram')
+            cumulative = 0
+            for bound, count in zip(BUCKETS, histogram.counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{prefix}{name}_bucket{{le="{le}"}} {cumulative}')
+            lines.append(f'{prefix}{name}_sum {histogram.sum!r}')
+            lines.append(f'{prefix}{name}_count {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+# Metrics of all games in this process
+METRICS = Metrics()
@@ -0,0 +1,165 @@
+from typing import Optional, List, Tuple
+from functools import lru_cache
+from itertools import starmap
+from multiprocessing import Pool
+from pathlib import Path
+import mmap
+import os
+import random
+import struct
+
+import numpy as np
+
+from .field import MIN_LENGTH, MAX_LENGTH, MIN_WIDTH, MAX_WIDTH
+
+# Opening book layout (little-endian):
+#   header: magic, format version, length range, width range, maximal count of opening shots
+#   index: one record for every field size in order of length and then width
+#   float32 probability of every cell to be occupied by ship before the first shot for every field size
+#           (version 1 had density of placements instead, version 2 had no probabilities)
+#   uint16 numbers x * width + y of opening shots for every field size
+MAGIC = b'BSHO'
+VERSION = 3
+HEADER = struct.Struct('<4sBHHHHH')  # magic, version, min length, max length, min width, max width, shots
+INDEX = np.dtype([('length', '<u2'), ('width', '<u2'), ('probabilities', '<u4'), ('shots', '<u4'),
+                  ('count', '<u2')])  # offsets of probabilities and shots in file and count of shots
+
+# Count of shots in every opening
+OPENING_SHOTS = 16
+# Count of sampled layouts of the whole fleet by which probability of every cell is estimated
+MAP_SAMPLES = 4096
+
+DEFAULT_PATH = Path(__file__).resolve().parent / 'openings.bin'
+
+
+def opening(field_length: int, field_width: int, shots: int = OPENING_SHOTS) -> Tuple[np.ndarray, List[int]]:
+    """
+    Compute opening for field with given sizes
+    Shots are chosen by density of placements of the whole fleet assuming that all previous shots missed,
+    ties are broken by the smallest cell number. Probabilities are estimated by layouts sampled from fixed seed,
+    so the same book is built every time, and averaged over mirrored fields, which are equally likely.
+    :return: probability of every cell to be occupied by ship and numbers of cells of opening shots
+    """
+    # Shooters read openings, so they are imported only when book is built
+    from .density import DensityShooter
+    from .solver import Layouts
+    shooter = DensityShooter(field_length, field_width)
+    sizes = tuple(size for size, count in shooter.counts.items() for _ in range(count))
+    layouts = Layouts(field_length, field_width, sizes, 0, 0)
+    samples, weights = layouts.sample(random.Random(f'{field_length} {field_width}'), float('inf'), MAP_SAMPLES)
+    probabilities = (weights / samples).reshape(field_length, field_width)
+    probabilities = (probabilities + probabilities[::-1] + probabilities[:, ::-1] + probabilities[::-1, ::-1]) / 4
+    sequence = []
+    for _ in range(shots):
+        score = np.where(shooter.blocked, -1, shooter.density)
+        if score.max() <= 0:
+            break
+        i = int(np.argmax(score))
+        sequence.append(i)
+        shooter.block(np.array([i], dtype=np.intp))
+    return probabilities.ravel().astype(np.float32), sequence
+
+
+def build(path: Path = DEFAULT_PATH, shots: int = OPENING_SHOTS, workers: Optional[int] = None):
+    """
+    Compute openings for every field size and write them into a file, previous content is replaced atomically
+    :param workers: count of processes computing openings, count of processors by default
+    """
+    sizes = [(length, width) for length in range(MIN_LENGTH, MAX_LENGTH + 1)
+             for width in range(MIN_WIDTH, MAX_WIDTH + 1)]
+    index = np.zeros(len(sizes), dtype=INDEX)
+    maps = []
+    sequences = []
+    offset = HEADER.size + index.nbytes
+    tasks = [(length, width, shots) for length, width in sizes]
+    if workers == 1:
+        openings = list(starmap(opening, tasks))
+    else:
+        with Pool(workers) as pool:
+            openings = pool.starmap(opening, tasks)
+    for k, ((length, width), (probabilities, sequence)) in enumerate(zip(sizes, openings)):
+        maps.append(probabilities.astype('<f4').tobytes())
+        sequences.append(np.array(sequence, dtype='<u2').tobytes())
+        index[k] = (length, width, offset, 0, len(sequence))
+        offset += len(maps[-1])
+    for k, sequence in enumerate(sequences):
+        index[k]['shots'] = offset
+        offset += len(sequence)
+    temp_path = path.with_name(path.name + '.tmp')
+    with open(temp_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, MIN_LENGTH, MAX_LENGTH, MIN_WIDTH, MAX_WIDTH, shots))
+        file.write(index.tobytes())
+        file.write(b''.join(maps))
+        file.write(b''.join(sequences))
+    os.replace(temp_path, path)
+    get_openings.cache_clear()
+
+
+class Openings(object):
+    """
+    Opening book mapped into memory, arrays are read from the file without copying
+    """
+    data: mmap.mmap
+    index: np.ndarray  # record of every field size
+    min_length: int
+    max_length: int
+    min_width: int
+    max_width: int
+
+    def __init__(self, path: Path = DEFAULT_PATH):
+        with open(path, 'rb') as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.data) < HEADER.size:
+            raise ValueError('Opening book is truncated')
+        magic, version, self.min_length, self.max_length, self.min_width, self.max_width, _ = \
+            HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError('Not an opening book')
+        if version != VERSION:
+            raise ValueError(f'Unsupported opening book version: {version}')
+        count = (self.max_length - self.min_length + 1) * (self.max_width - self.min_width + 1)
+        if len(self.data) < HEADER.size + count * INDEX.itemsize:
+            raise ValueError('Opening book is truncated')
+        self.index = np.frombuffer(self.data, dtype=INDEX, count=count, offset=HEADER.size)
+
+    def record(self, field_length: int, field_width: int) -> Optional[np.void]:
+        """
+        :return: index record for field with given sizes or None if book doesn't contain it
+        """
+        if not (self.min_length <= field_length <= self.max_length and self.min_width <= field_width <= self.max_width):
+            return None
+        record = self.index[(field_length - self.min_length) * (self.max_width - self.min_width + 1)
+                            + field_width - self.min_width]
+        if record['length'] != field_length or record['width'] != field_width:
+            raise ValueError('Opening book is corrupted')
+        return record
+
+    def probabilities(self, field_length: int, field_width: int) -> Optional[np.ndarray]:
+        """
+        :return: probability of every cell to be occupied by ship before the first shot or None if it is unknown
+        """
+        record = self.record(field_length, field_width)
+        if record is None:
+            return None
+        return np.frombuffer(self.data, dtype='<f4', count=field_length * field_width,
+                             offset=int(record['probabilities']))
+
+    def shots(self, field_length: int, field_width: int) -> Optional[np.ndarray]:
+        """
+        :return: numbers of cells of opening shots or None if they are unknown
+        """
+        record = self.record(field_length, field_width)
+        if record is None:
+            return None
+        return np.frombuffer(self.data, dtype='<u2', count=int(record['count']), offset=int(record['shots']))
+
+
+@lru_cache(maxsize=None)
+def get_openings(path: Path = DEFAULT_PATH) -> Optional[Openings]:
+    """
+    :return: opening book shared by all computer players or None if it is not built
+    """
+    try:
+        return Openings(path)
+    except (OSError, ValueError):
+        return None
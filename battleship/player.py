@@ -1,8 +1,9 @@
-from typing import Optional, Tuple, List
+from typing import Optional, Tuple, List, Dict
 from enum import Enum
 
-from ship import Ship
-from field import LEGEND_WIDTH, LEGEND_HEIGHT, Field
+from .ship import Ship
+from .field import LEGEND_WIDTH, LEGEND_HEIGHT, Field, popcount
+from .metrics import Events
 
 MENU_WIDTH = 14
 MENU_HEIGHT = 5
@@ -22,23 +23,38 @@ class Player(object):
     Describes battleship player
     """
     field: Field  # field with map and radar
+    ships: List[Ship]  # all ships of this player
     ships_count: int  # count of alive ships
-    ship_matrix: List[List[Optional[Ship]]]  # ship layout matrix
+    ships_mask: int  # bitmask of not hit ship cells
+    ships_index: Dict[int, Ship]  # ship by number of occupied cell bit
     shots: int  # count of made shots
     hits: int  # count of hits
+    events: Events  # callbacks for shot, hit and kill events of shots made by this player
 
     def __init__(self, field: Field, ships: List[Ship]):
         self.field = field
+        self.ships = ships
         self.ships_count = len(ships)
-        # Initialize ships_matrix
-        self.ships_matrix = [[None] * field.width for _ in range(field.length)]
+        # Initialize ships occupancy
+        self.ships_mask = 0
+        self.ships_index = {}
         for ship in ships:
-            for x, y in ship.occupied_cells:
-                # Cell (x, y) contains a ship
-                self.ships_matrix[x][y] = ship
-                self.field.map.set_ship(x, y)
+            for i in ship.placement.cells:
+                # Cell number i contains a ship
+                self.ships_index[i] = ship
+            self.ships_mask |= ship.placement.mask
+        self.field.map.ship = self.ships_mask
+        self.field.map.rehash()
         self.shots = 0
         self.hits = 0
+        self.events = Events()
+
+    @property
+    def is_defeated(self) -> bool:
+        """
+        :return: True if all ships of this player are destroyed
+        """
+        return self.ships_mask == 0
 
     def check_point(self, x: int, y: int) -> bool:
         """
@@ -58,19 +74,24 @@ class Player(object):
         """
         assert self.check_point(x, y), "Incorrect coordinates"
         self.shots += 1
+        radar = self.field.radar
         if result == ShotResult.water:
             # Mark a miss shot on radar
-            self.field.radar.set_water(x, y)
+            radar.set_water(x, y)
         else:
             # Mark a hit on radar
-            self.field.radar.set_hit(x, y)
+            radar.set_hit(x, y)
             self.hits += 1
             if result == ShotResult.killing:
                 assert target_ship is not None
-                for x, y in target_ship.occupied_and_nearby_cells:
-                    # Mark cells around destroyed ships on radar
-                    if self.check_point(x, y):
-                        self.field.radar.set_water(x, y)
+                # Mark cells around destroyed ships on radar
+                radar.set_water_around(target_ship.placement)
+        if self.events:
+            self.events.emit('shot', self, x, y, result)
+            if result != ShotResult.water:
+                self.events.emit('hit', self, x, y)
+            if result == ShotResult.killing:
+                self.events.emit('kill', self, target_ship)
         return result
 
     def receive_shot(self, x: int, y: int) -> Tuple[ShotResult, Optional[Ship]]:
@@ -81,14 +102,16 @@ class Player(object):
         :param y: y-coordinate of target point on self field
         :return: result of the shot and killed ship or None if no ship was destroyed
         """
-        ship = self.ships_matrix[x][y]
-        if ship is None:
+        i = x * self.field.width + y
+        bit = 1 << i
+        if not self.ships_mask & bit:
             # Mark a miss on map
             self.field.map.set_water(x, y)
             return ShotResult.water, None
         # Mark a hit on map
         self.field.map.set_hit(x, y)
-        self.ships_matrix[x][y] = None
+        self.ships_mask &= ~bit
+        ship = self.ships_index[i]
         ship.receive_shot()
         if ship.is_destroyed():
             # Ship is destroyed
@@ -116,3 +139,60 @@ class Player(object):
         rows = list(map(lambda r1, r2: r1 + ' ' * 6 + r2, Field.legend(), self.menu))
         padding = ' ' * max(0, (screen_width - LEGEND_WIDTH - MENU_WIDTH - 6) // 2)
         return padding + ('\n' + padding).join(rows)
+
+
+class SparsePlayer(Player):
+    """
+    Player on large field, not hit ship cells are counted instead of being kept in bitmask
+    """
+    alive_cells: int  # count of not hit ship cells
+
+    def __init__(self, field: Field, ships: List[Ship]):
+        self.field = field
+        self.ships = ships
+        self.ships_count = len(ships)
+        self.ships_index = {}
+        for ship in ships:
+            for x, y in ship.placement.points:
+                self.ships_index[x * field.width + y] = ship
+                field.map.set_ship(x, y)
+        self.alive_cells = len(self.ships_index)
+        self.shots = 0
+        self.hits = 0
+        self.events = Events()
+
+    @property
+    def ships_mask(self) -> int:
+        """
+        :return: bitmask of not hit ship cells
+        """
+        return self.field.map.ship
+
+    @ships_mask.setter
+    def ships_mask(self, mask: int):
+        # Not hit ship cells are marked on map separately
+        self.alive_cells = popcount(mask)
+
+    @property
+    def is_defeated(self) -> bool:
+        return self.alive_cells == 0
+
+    def receive_shot(self, x: int, y: int) -> Tuple[ShotResult, Optional[Ship]]:
+        ship = self.ships_index.get(x * self.field.width + y)
+        if ship is None:
+            self.field.map.set_water(x, y)
+            return ShotResult.water, None
+        self.field.map.set_hit(x, y)
+        self.alive_cells -= 1
+        ship.receive_shot()
+        if ship.is_destroyed():
+            self.ships_count -= 1
+            return ShotResult.killing, ship
+        return ShotResult.hit, None
+
+
+def new_player(field: Field, ships: List[Ship]) -> Player:
+    """
+    :return: player with given field and ships, stored sparsely if field is large
+    """
+    return SparsePlayer(field, ships) if field.is_large else Player(field, ships)
@@ -0,0 +1,119 @@
+from typing import Dict, Optional, Tuple
+import copy
+import threading
+
+from .field import Cell, Table
+from .geometry import Placement, get_geometry
+from .player import ShotResult
+
+
+class Ponderer(object):
+    """
+    Computer player which thinks in background thread while the human player chooses a shot
+    Computer radar doesn't change during human turn, so the next computer shot and the shots after its miss, hit
+    and destroying hit are computed in advance by copies of the shooter. The copy which chose the shot is taken over when radar
+    turns out to be the same as it expected, otherwise the shot is computed as usual.
+    """
+    shooter: object  # computer player with next_shot, update, sync and fork methods
+    moves: Dict[int, Tuple[object, Tuple[int, int]]]  # shooter after choosing shot and the shot by radar hash
+    thread: Optional[threading.Thread]  # thread computing shots in advance
+    pondered: Optional[int]  # hash of radar for which shots were computed last
+    reused: int  # count of shots computed in advance
+    computed: int  # count of shots computed when they were needed
+
+    def __init__(self, shooter):
+        self.shooter = shooter
+        self.moves = {}
+        self.thread = None
+        self.pondered = None
+        self.reused = 0
+        self.computed = 0
+
+    def ponder(self, radar: Table):
+        """
+        Start computing shots for given radar in background unless it is already done
+        :param radar: radar of the computer player
+        """
+        if self.pondered == radar.zobrist:
+            return
+        self.wait()
+        self.pondered = radar.zobrist
+        self.thread = threading.Thread(target=self.speculate, args=(copy.copy(radar),), daemon=True)
+        self.thread.start()
+
+    def speculate(self, radar: Table):
+        """
+        Compute shot for given radar and shots after every result of it
+        """
+        entry = self.moves.get(radar.zobrist)
+        if entry is None:
+            shooter = self.shooter.fork()
+            entry = (shooter, shooter.next_shot(radar))
+        moves = {radar.zobrist: entry}
+        shooter, (x, y) = entry
+        for result in (ShotResult.hit, ShotResult.killing, ShotResult.water):
+            after = copy.copy(radar)
+            if result == ShotResult.water:
+                after.set_water(x, y)
+            else:
+                after.set_hit(x, y)
+            if result == ShotResult.killing:
+                after.set_water_around(hit_ship(after, x, y))
+            child = shooter.fork()
+            child.update(x, y, result, after)
+            moves[after.zobrist] = (child, child.next_shot(after))
+        self.moves = moves
+
+    def wait(self):
+        """
+        Wait until shots computed in background are ready
+        """
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def next_shot(self, radar: Table) -> Tuple[int, int]:
+        """
+        :param radar: radar of the computer player
+        :return: coordinates of the next shot
+        """
+        self.wait()
+        entry = self.moves.pop(radar.zobrist, None)
+        if entry is not None:
+            self.reused += 1
+            self.shooter, move = entry
+            return move
+        self.computed += 1
+        return self.shooter.next_shot(radar)
+
+    def update(self, x: int, y: int, result: ShotResult, radar: Table):
+        """
+        Process result of the shot made by this shooter
+        """
+        self.shooter.update(x, y, result, radar)
+
+    def sync(self, radar: Table):
+        """
+        Restore state of the shooter from radar of a game in progress
+        """
+        self.wait()
+        self.shooter.sync(radar)
+
+
+def hit_ship(radar: Table, x: int, y: int) -> Placement:
+    """
+    :param radar: radar with hit in (x, y)
+    :return: placement of ship made of hits in line with (x, y), which is destroyed if the hit in (x, y) kills it
+    """
+    x0, x1, y0, y1 = x, x, y, y
+    while x0 > 0 and radar.cell(x0 - 1, y) == Cell.hit:
+        x0 -= 1
+    while x1 < radar.length - 1 and radar.cell(x1 + 1, y) == Cell.hit:
+        x1 += 1
+    while y0 > 0 and radar.cell(x, y0 - 1) == Cell.hit:
+        y0 -= 1
+    while y1 < radar.width - 1 and radar.cell(x, y1 + 1) == Cell.hit:
+        y1 += 1
+    if x1 > x0:
+        return get_geometry(radar.length, radar.width).placement(x1 - x0 + 1, x0, y, 0)
+    return get_geometry(radar.length, radar.width).placement(y1 - y0 + 1, x, y0, 1)
@@ -0,0 +1,239 @@
+from typing import Optional, Tuple, List
+import curses
+
+from .battleship import MESSAGE_HEIGHT, LEGEND_MENU_HEIGHT, LEGEND_MENU_WIDTH, Battleship
+from .field import Table
+
+INPUT_MESSAGE = 'Enter command: '
+INPUT_HEIGHT = 1
+INPUT_LENGTH = 3
+INPUT_WIDTH = len(INPUT_MESSAGE) + INPUT_LENGTH
+
+# Commands and points on large fields are longer, like ':all1000'
+VIEWPORT_INPUT_LENGTH = 8
+VIEWPORT_INPUT_WIDTH = len(INPUT_MESSAGE) + VIEWPORT_INPUT_LENGTH
+# The smallest count of columns and rows of viewport
+MIN_VIEWPORT = 5
+# Commands moving viewport by half of its size: left, down, up and right
+SCROLLS = {':h': (-1, 0), ':j': (0, 1), ':k': (0, -1), ':l': (1, 0)}
+
+
+class Renderer(object):
+    """
+    Draws game on curses screen. The whole screen is repainted only after resize,
+    otherwise only cells, menu rows and message changed since the previous frame are drawn.
+    """
+    input_length: int = INPUT_LENGTH  # count of characters in command
+    screen: curses.window
+    screen_size: Optional[Tuple[int, int]]  # size of screen at the last full repaint
+    tables: List[Tuple[int, int, int]]  # water, hit and ship bitmasks of map and radar on screen
+    legend_menu: List[str]  # rows of legend and menu on screen
+    message: str  # message on screen
+
+    def __init__(self, screen: curses.window):
+        self.screen = screen
+        self.screen_size = None
+        self.tables = []
+        self.legend_menu = []
+        self.message = ''
+
+    def invalidate(self):
+        """
+        Repaint the whole screen on the next frame
+        """
+        self.screen_size = None
+
+    @staticmethod
+    def layout(game: Battleship) -> Tuple[int, int, int]:
+        """
+        :return: y-values of legend with menu, message and input strings
+        """
+        # We want 1 newline between each of the strings
+        legend_menu_y = game.host_field_height + 1
+        message_y = legend_menu_y + LEGEND_MENU_HEIGHT + 1
+        input_y = message_y + MESSAGE_HEIGHT + 1
+        return legend_menu_y, message_y, input_y
+
+    def input_position(self, game: Battleship) -> Tuple[int, int]:
+        """
+        :return: y-value and x-value of the input string
+        """
+        _, screen_width = self.screen.getmaxyx()
+        return self.layout(game)[2], (screen_width - INPUT_WIDTH) // 2
+
+    def draw(self, game: Battleship) -> bool:
+        """
+        Draw the current state of the game
+        :return: False if screen is too small to play the game and True otherwise
+        """
+        # Required height and width of the screen
+        required_height = game.host_field_height + 1 + LEGEND_MENU_HEIGHT + 1 + MESSAGE_HEIGHT + 1 + INPUT_HEIGHT
+        required_width = max(game.width_on_screen, INPUT_WIDTH) + 2
+
+        # Check if screen is large enough to play game
+        screen_size = self.screen.getmaxyx()
+        screen_height, screen_width = screen_size
+        if screen_height < required_height or screen_width < required_width:
+            self.screen.clear()
+            self.screen.addstr(0, 0, 'Please make your terminal screen larger.\n')
+            self.invalidate()
+            return False
+
+        if screen_size != self.screen_size:
+            self.repaint(game)
+            self.screen_size = screen_size
+            return True
+
+        field = game.host_player.field
+        for i, table in enumerate((field.map, field.radar)):
+            self.draw_cells(table, i, screen_width)
+        legend_menu_y, message_y, _ = self.layout(game)
+        legend_menu = game.display_host_legend_menu(screen_width).split('\n')
+        for i, (old, new) in enumerate(zip(self.legend_menu, legend_menu)):
+            if old != new:
+                self.screen.addstr(legend_menu_y + i, 0, new)
+        self.legend_menu = legend_menu
+        message = game.messages[game.host]
+        if message != self.message:
+            self.screen.move(message_y, 0)
+            self.screen.clrtoeol()
+            self.screen.addstr(message_y, 0, game.display_host_message(screen_width).rstrip('\n'))
+            self.message = message
+        return True
+
+    def repaint(self, game: Battleship):
+        """
+        Clear screen and draw everything
+        """
+        _, screen_width = self.screen.getmaxyx()
+        legend_menu_y, message_y, input_y = self.layout(game)
+        input_x = (screen_width - INPUT_WIDTH) // 2
+
+        self.screen.clear()
+        # Display information strings on screen
+        self.screen.addstr(0, 0, game.display_host_field(screen_width))
+        self.screen.addstr(legend_menu_y, 0, game.display_host_legend_menu(screen_width))
+        self.screen.addstr(message_y, 0, game.display_host_message(screen_width))
+        self.screen.addstr(input_y, input_x, INPUT_MESSAGE)
+
+        field = game.host_player.field
+        self.tables = [(table.water, table.hit, table.ship) for table in (field.map, field.radar)]
+        self.legend_menu = game.display_host_legend_menu(screen_width).split('\n')
+        self.message = game.messages[game.host]
+
+    def draw_cells(self, table: Table, number: int, screen_width: int):
+        """
+        Draw cells of map or radar changed since the previous frame
+        :param table: map or radar of the host player
+        :param number: 0 for map and 1 for radar
+        :param screen_width: width of screen
+        """
+        water, hit, ship = self.tables[number]
+        changed = (water ^ table.water) | (hit ^ table.hit) | (ship ^ table.ship)
+        if not changed:
+            return
+        self.tables[number] = (table.water, table.hit, table.ship)
+        # Tables are drawn side by side in the middle of screen, see Field.display
+        num_len = 1 if table.width < 10 else 2
+        left = max(0, (screen_width - 2 * table.width_on_screen - 6) // 2) + num_len + 1
+        left += number * (table.width_on_screen + 6)
+        while changed:
+            bit = changed & -changed
+            changed ^= bit
+            x, y = divmod(bit.bit_length() - 1, table.width)
+            self.screen.addch(1 + y, left + 2 * x, table.cell(x, y).value)
+
+    def clear_input(self, game: Battleship):
+        """
+        Remove entered command from screen
+        """
+        input_y, input_x = self.input_position(game)
+        self.screen.move(input_y, input_x + len(INPUT_MESSAGE))
+        self.screen.clrtoeol()
+
+
+class ViewportRenderer(Renderer):
+    """
+    Draws game on large field: only the window of map and radar which fits the screen is shown,
+    the window is moved by scroll commands. Visible part is drawn on every frame, curses sends only changes
+    to the terminal, so cost of frame depends on screen size and not on field size.
+    """
+    input_length: int = VIEWPORT_INPUT_LENGTH  # count of characters in command
+    left: int  # x-coordinate of the first shown column
+    top: int  # y-coordinate of the first shown row
+    columns: int  # count of shown columns
+    lines: int  # count of shown rows
+
+    def __init__(self, screen: curses.window):
+        super().__init__(screen)
+        self.left = 0
+        self.top = 0
+        self.columns = MIN_VIEWPORT
+        self.lines = MIN_VIEWPORT
+
+    def layout(self, game: Battleship) -> Tuple[int, int, int]:
+        legend_menu_y = 1 + self.lines + 1
+        message_y = legend_menu_y + LEGEND_MENU_HEIGHT + 1
+        input_y = message_y + MESSAGE_HEIGHT + 1
+        return legend_menu_y, message_y, input_y
+
+    def input_position(self, game: Battleship) -> Tuple[int, int]:
+        _, screen_width = self.screen.getmaxyx()
+        return self.layout(game)[2], (screen_width - VIEWPORT_INPUT_WIDTH) // 2
+
+    def fit(self, game: Battleship, screen_height: int, screen_width: int) -> bool:
+        """
+        Choose size of viewport for screen and keep it inside the field
+        :return: False if screen can't show the smallest viewport
+        """
+        num_len = len(str(game.field_width))
+        self.lines = min(game.field_width, screen_height - (2 + LEGEND_MENU_HEIGHT + 1 + MESSAGE_HEIGHT + 1
+                                                            + INPUT_HEIGHT))
+        # Map and radar are shown side by side, 2 characters for every cell
+        self.columns = min(game.field_length, (screen_width - 2 - 6 - 2 * num_len) // 4)
+        if self.lines < MIN_VIEWPORT or self.columns < MIN_VIEWPORT or \
+                screen_width < max(LEGEND_MENU_WIDTH, VIEWPORT_INPUT_WIDTH, game.host_message_width) + 2:
+            return False
+        self.left = max(0, min(self.left, game.field_length - self.columns))
+        self.top = max(0, min(self.top, game.field_width - self.lines))
+        return True
+
+    def scroll(self, dx: int, dy: int):
+        """
+        Move viewport by half of its size in given direction, it is kept inside the field on the next frame
+        """
+        self.left = max(0, self.left + dx * max(1, self.columns // 2))
+        self.top = max(0, self.top + dy * max(1, self.lines // 2))
+
+    def center(self, x: int, y: int):
+        """
+        Move viewport so that point (x, y) is in its middle
+        """
+        self.left = max(0, x - self.columns // 2)
+        self.top = max(0, y - self.lines // 2)
+
+    def draw(self, game: Battleship) -> bool:
+        screen_size = self.screen.getmaxyx()
+        screen_height, screen_width = screen_size
+        if not self.fit(game, screen_height, screen_width):
+            self.screen.clear()
+            self.screen.addstr(0, 0, 'Please make your terminal screen larger.\n')
+            self.invalidate()
+            return False
+        if screen_size != self.screen_size:
+            self.screen.clear()
+            self.screen_size = screen_size
+        field = game.host_player.field
+        rows = list(map(lambda r1, r2: r1 + ' ' * 6 + r2,
+                        field.map.window_rows(self.left, self.top, self.columns, self.lines),
+                        field.radar.window_rows(self.left, self.top, self.columns, self.lines)))
+        padding = ' ' * max(0, (screen_width - len(rows[0])) // 2)
+        for y, row in enumerate(rows):
+            self.screen.addstr(y, 0, padding + row)
+        legend_menu_y, message_y, input_y = self.layout(game)
+        self.screen.addstr(legend_menu_y, 0, game.display_host_legend_menu(screen_width))
+        self.screen.move(message_y, 0)
+        self.screen.clrtoeol()
+        self.screen.addstr(message_y, 0, game.display_host_message(screen_width).rstrip('\n'))
+        self.screen.addstr(input_y, (screen_width - VIEWPORT_INPUT_WIDTH) // 2, INPUT_MESSAGE)
+        return True
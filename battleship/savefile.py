@@ -0,0 +1,203 @@
+from typing import Optional, List
+from pathlib import Path
+import mmap
+import os
+import struct
+
+from .battleship import Battleship
+from .field import MIN_LENGTH, MIN_WIDTH, MAX_LARGE_LENGTH, MAX_LARGE_WIDTH, Field, popcount
+from .geometry import get_geometry
+from .metrics import METRICS, Events
+from .player import new_player
+from .ship import Ship
+
+# Save file layout (little-endian):
+#   header: magic, format version, field length, field width, turn, host, game identifier (since version 2),
+#           shots in every turn and shots left in current turn under salvo rule (since version 3)
+#   for every player: counters, ship records and bitmask of cells shot by the enemy
+# Everything else (map, radar, hit points of ships) is derived from ships and shots on load.
+MAGIC = b'BSHP'
+VERSION = 3
+HEADER_V1 = struct.Struct('<4sBHHBB')  # magic, version, length, width, turn, host
+HEADER_V2 = struct.Struct('<4sBHHBBQ')  # magic, version, length, width, turn, host, game identifier
+HEADER = struct.Struct('<4sBHHBBQHH')  # magic, version, length, width, turn, host, game identifier, salvo, shots left
+PLAYER = struct.Struct('<HHHH')  # shots, hits, alive ships, ships
+SHIP = struct.Struct('<BHHB')  # size, x, y, rotation
+
+
+def dumps(game: Battleship) -> bytes:
+    """
+    :param game: game object
+    :return: binary representation of the game
+    """
+    mask_size = (game.field_length * game.field_width + 7) // 8
+    parts = [HEADER.pack(MAGIC, VERSION, game.field_length, game.field_width, game.turn, game.host, game.game_id,
+                         game.salvo, game.shots_left)]
+    for player in game.players:
+        parts.append(PLAYER.pack(player.shots, player.hits, player.ships_count, len(player.ships)))
+        parts.extend(SHIP.pack(ship.size, ship.x, ship.y, ship.rotation) for ship in player.ships)
+        received = player.field.map.water | player.field.map.hit
+        parts.append(received.to_bytes(mask_size, 'little'))
+    return b''.join(parts)
+
+
+def restore(field_length: int, field_width: int, turn: int, host: int, fleets: List[List[Ship]],
+            received: List[int], messages: Optional[List[str]] = None, game_id: int = 0, salvo: int = 0,
+            shots_left: int = 0) -> Battleship:
+    """
+    Create game object with given ships after given shots
+    :param field_length: length of game field
+    :param field_width: width of game field
+    :param turn: number of current player
+    :param host: number of player who plays on this machine
+    :param fleets: ships of every player
+    :param received: bitmask of cells shot by the enemy for every player
+    :param messages: messages for players
+    :param game_id: identifier of the game
+    :param salvo: count of shots in every turn or 0 if player shoots again after every hit
+    :param shots_left: count of shots left in current turn under salvo rule
+    :return: game object
+    """
+    players = [new_player(Field(field_length, field_width), ships) for ships in fleets]
+    for player, opponent, shots in ((players[0], players[1], received[0]), (players[1], players[0], received[1])):
+        ships = player.ships_mask
+        hit = ships & shots
+        player.field.map.water = shots & ~ships
+        player.field.map.hit = hit
+        player.field.map.ship = ships & ~shots
+        player.ships_mask = ships & ~shots
+        halo = 0
+        for ship in player.ships:
+            ship.hp = ship.size - popcount(ship.placement.mask & shots)
+            if ship.is_destroyed():
+                halo |= ship.placement.halo
+        player.ships_count = sum(not ship.is_destroyed() for ship in player.ships)
+        # Cells around destroyed ships are marked as water on enemy radar
+        opponent.field.radar.water = (shots | halo) & ~ships
+        opponent.field.radar.hit = hit
+        player.field.map.rehash()
+        opponent.field.radar.rehash()
+        opponent.shots = popcount(shots)
+        opponent.hits = popcount(hit)
+    game = Battleship(field_length, field_width, host, players=players, salvo=salvo)
+    game.turn = turn
+    game.game_id = game_id
+    game.shots_left = shots_left
+    if messages is not None:
+        game.messages = messages
+    return game
+
+
+def loads(data) -> Battleship:
+    """
+    :param data: bytes-like object with binary representation of the game
+    :return: game object
+    :raise ValueError: if data is not a valid save
+    """
+    try:
+        return parse(data)
+    except struct.error:
+        raise ValueError('Save is truncated')
+
+
+def parse(data) -> Battleship:
+    """
+    :param data: bytes-like object with binary representation of the game
+    :return: game object, struct.error is raised if data is truncated
+    """
+    magic, version, field_length, field_width, turn, host = HEADER_V1.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError('Not a battleship save')
+    salvo = shots_left = 0
+    if version == 1:
+        game_id = 0
+        offset = HEADER_V1.size
+    elif version == 2:
+        game_id = HEADER_V2.unpack_from(data, 0)[-1]
+        offset = HEADER_V2.size
+    elif version == VERSION:
+        game_id, salvo, shots_left = HEADER.unpack_from(data, 0)[-3:]
+        offset = HEADER.size
+        if shots_left > salvo or (salvo and not shots_left):
+            raise ValueError('Save is corrupted')
+    else:
+        raise ValueError(f'Unsupported save version: {version}')
+    if not (MIN_LENGTH <= field_length <= MAX_LARGE_LENGTH and MIN_WIDTH <= field_width <= MAX_LARGE_WIDTH):
+        raise ValueError(f'Invalid field size in save: {field_length}x{field_width}')
+    if turn not in (0, 1) or host not in (0, 1):
+        raise ValueError('Save is corrupted')
+    geometry = get_geometry(field_length, field_width)
+    sizes = sorted(Ship.get_sizes(Field(field_length, field_width)))
+    mask_size = (field_length * field_width + 7) // 8
+    counters = []
+    fleets = []
+    received = []
+    for _ in range(2):
+        shots, hits, ships_count, count = PLAYER.unpack_from(data, offset)
+        offset += PLAYER.size
+        ships = []
+        for _ in range(count):
+            size, x, y, rotation = SHIP.unpack_from(data, offset)
+            offset += SHIP.size
+            ships.append(Ship(geometry.placement(size, x, y, rotation)))
+        if sorted(ship.size for ship in ships) != sizes:
+            raise ValueError('Fleet in save differs from fleet of the field')
+        blocked = 0
+        for ship in ships:
+            if ship.placement.mask & blocked:
+                raise ValueError(f'Ship in save touches another ship: {(ship.size, ship.x, ship.y, ship.rotation)}')
+            blocked |= ship.placement.halo
+        if offset + mask_size > len(data):
+            raise ValueError('Save is truncated')
+        counters.append((shots, hits, ships_count))
+        fleets.append(ships)
+        shots_mask = int.from_bytes(data[offset:offset + mask_size], 'little')
+        if shots_mask >> (field_length * field_width):
+            raise ValueError('Save is corrupted')
+        received.append(shots_mask)
+        offset += mask_size
+    game = restore(field_length, field_width, turn, host, fleets, received, game_id=game_id, salvo=salvo,
+                   shots_left=shots_left)
+    if [(player.shots, player.hits, game.players[1 - i].ships_count)
+            for i, player in enumerate(game.players)] != [(counters[i][0], counters[i][1], counters[1 - i][2])
+                                                           for i in range(2)]:
+        raise ValueError('Save is corrupted')
+    return game
+
+
+def save(game: Battleship, path: Path):
+    """
+    Write given game into a file, previous content of the file is replaced atomically
+    """
+    temp_path = path.with_name(path.name + '.tmp')
+    with open(temp_path, 'wb') as file:
+        file.write(dumps(game))
+    os.replace(temp_path, path)
+    if game.events:
+        game.events.emit('save', game, path)
+    if METRICS.enabled:
+        METRICS.increment('saves_total')
+
+
+def load(path: Path, events: Optional[Events] = None) -> Battleship:
+    """
+    Read game from a file in binary format or in former pickle format
+    :param path: path of the file
+    :param events: callbacks for events of loaded game
+    """
+    with open(path, 'rb') as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            file.seek(0)
+            # Former saves are rare, so pickle is imported only for them
+            from .legacy import load_legacy
+            game = load_legacy(file)
+        else:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                with memoryview(data) as view:
+                    game = loads(view)
+    if events is not None:
+        game.events = events
+        events.emit('load', game, path)
+    if METRICS.enabled:
+        METRICS.increment('loads_total')
+    return game
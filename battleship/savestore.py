@@ -0,0 +1,248 @@
+from typing import Dict, List, Optional
+from pathlib import Path
+import json
+import os
+import random
+import re
+import time
+
+from .battleship import Battleship
+from . import journal
+from . import savefile
+
+# Store layout: directory with index file and save file '<id>.save' with journal '<id>.journal' for every game,
+# identifier is 16 hexadecimal digits of game identifier. Index lists all saves, so they are listed without
+# reading save files. Index and saves are replaced atomically.
+INDEX_NAME = 'index.json'
+INDEX_VERSION = 1
+SAVE_SUFFIX = '.save'
+JOURNAL_SUFFIX = '.journal'
+
+# Name of save or journal of former layout with one save for every field size
+LEGACY_NAME = re.compile(r'(\d+_\d+)(\.journal)?')
+
+
+class SaveEntry(object):
+    """
+    Describes saved game in index
+    """
+    game_id: int  # identifier of the game
+    field_length: int
+    field_width: int
+    saved: float  # time of the last save in seconds since epoch
+    shots: List[int]  # count of shots made by every player
+    ships: List[int]  # count of not destroyed ships of every player
+    finished: bool  # whether the game is over
+    clean: bool  # whether entry describes the latest state, it doesn't while journal of the game is recorded
+
+    def __init__(self, game_id: int, field_length: int, field_width: int, saved: float, shots: List[int],
+                 ships: List[int], finished: bool, clean: bool = True):
+        self.game_id = game_id
+        self.field_length = field_length
+        self.field_width = field_width
+        self.saved = saved
+        self.shots = shots
+        self.ships = ships
+        self.finished = finished
+        self.clean = clean
+
+    @staticmethod
+    def of(game: Battleship, saved: float, clean: bool = True) -> 'SaveEntry':
+        """
+        :return: entry describing given game saved at given time
+        """
+        return SaveEntry(game.game_id, game.field_length, game.field_width, saved,
+                         [player.shots for player in game.players], [player.ships_count for player in game.players],
+                         game.winner is not None, clean)
+
+    @property
+    def name(self) -> str:
+        return f'{self.game_id:016x}'
+
+    def to_dict(self) -> Dict:
+        return {'id': self.name, 'length': self.field_length, 'width': self.field_width, 'saved': self.saved,
+                'shots': self.shots, 'ships': self.ships, 'finished': self.finished, 'clean': self.clean}
+
+    @staticmethod
+    def from_dict(data: Dict) -> 'SaveEntry':
+        return SaveEntry(int(data['id'], 16), data['length'], data['width'], data['saved'], data['shots'],
+                         data['ships'], data['finished'], data.get('clean', True))
+
+    def display(self) -> str:
+        """
+        :return: representation of entry for list of saves
+        """
+        saved = time.strftime('%Y-%m-%d %H:%M', time.localtime(self.saved))
+        state = 'finished' if self.finished else f'shots {self.shots[0]}/{self.shots[1]}, ' \
+                                                 f'ships {self.ships[0]}/{self.ships[1]}'
+        return f'{self.field_length}x{self.field_width}  {saved}  {state}'
+
+
+class SaveStore(object):
+    """
+    Any number of saved games in one directory with index of them
+    """
+    directory: Path
+    entries: Dict[int, SaveEntry]  # saved games by identifier
+
+    def __init__(self, directory: Path):
+        """
+        Open store in given directory, saves of former layout are moved into the store
+        """
+        self.directory = directory
+        self.entries = {}
+        try:
+            self.read_index()
+        except (IOError, ValueError, KeyError, TypeError):
+            self.rebuild()
+        else:
+            self.refresh()
+        self.migrate()
+
+    def save_path(self, game_id: int) -> Path:
+        return self.directory / f'{game_id:016x}{SAVE_SUFFIX}'
+
+    def journal_path(self, game_id: int) -> Path:
+        return self.directory / f'{game_id:016x}{JOURNAL_SUFFIX}'
+
+    def modified(self, game_id: int) -> Optional[float]:
+        """
+        :return: the latest modification time of save and journal of given game or None if there are no files
+        """
+        return max((path.stat().st_mtime for path in (self.save_path(game_id), self.journal_path(game_id))
+                    if path.exists()), default=None)
+
+    def read_index(self):
+        """
+        Read entries from index file
+        """
+        with open(self.directory / INDEX_NAME, encoding='utf-8') as file:
+            data = json.load(file)
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError('Unknown index version')
+        self.entries = {}
+        for item in data['saves']:
+            entry = SaveEntry.from_dict(item)
+            self.entries[entry.game_id] = entry
+
+    def write_index(self):
+        """
+        Write entries into index file, previous content of the file is replaced atomically
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / INDEX_NAME
+        temp_path = path.with_name(path.name + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump({'version': INDEX_VERSION, 'saves': [entry.to_dict() for entry in self.list()]}, file,
+                      indent=1)
+        os.replace(temp_path, path)
+
+    def rebuild(self):
+        """
+        Create index by reading every save of the store, used when index is missing or corrupted
+        """
+        self.entries = {}
+        if not self.directory.is_dir():
+            return
+        names = {path.stem for suffix in (SAVE_SUFFIX, JOURNAL_SUFFIX)
+                 for path in self.directory.glob(f'*{suffix}')}
+        for name in names:
+            try:
+                game_id = int(name, 16)
+                game = journal.restore(self.journal_path(game_id), self.save_path(game_id))
+            except (IOError, ValueError):
+                continue
+            self.entries[game.game_id] = SaveEntry.of(game, self.modified(game_id))
+        self.write_index()
+
+    def refresh(self):
+        """
+        Update entries which are not clean: games interrupted by crash are listed with the progress restored
+        from their journals, other entries are taken from index as they are
+        """
+        changed = False
+        for entry in list(self.entries.values()):
+            if entry.clean:
+                continue
+            try:
+                game = journal.restore(self.journal_path(entry.game_id), self.save_path(entry.game_id))
+            except (IOError, ValueError):
+                continue
+            self.entries[entry.game_id] = SaveEntry.of(game, self.modified(entry.game_id) or entry.saved)
+            changed = True
+        if changed:
+            self.write_index()
+
+    def migrate(self):
+        """
+        Move saves of former layout 'length_width' with their journals into the store
+        """
+        if not self.directory.is_dir():
+            return
+        # Game interrupted before its first snapshot has journal only
+        names = {match.group(1) for match in map(LEGACY_NAME.fullmatch, os.listdir(self.directory))
+                 if match is not None}
+        for name in sorted(names):
+            path = self.directory / name
+            journal_path = path.with_name(name + '.journal')
+            try:
+                game = journal.restore(journal_path, path)
+            except (IOError, ValueError):
+                continue
+            saved = max(file.stat().st_mtime for file in (path, journal_path) if file.exists())
+            former_id = game.game_id
+            # Former saves may have no identifier, every game needs its own slot
+            while game.game_id == 0 or game.game_id in self.entries or self.save_path(game.game_id).exists():
+                game.game_id = random.getrandbits(64)
+            self.save(game, saved)
+            # Former files are removed only after the game is written into its slot. Journal is kept while its
+            # initial state belongs to the game, otherwise the whole game is already in the slot.
+            if journal_path.exists():
+                if game.game_id == former_id:
+                    os.replace(journal_path, self.journal_path(game.game_id))
+                else:
+                    journal_path.unlink()
+            if path.exists():
+                path.unlink()
+
+    def list(self) -> List[SaveEntry]:
+        """
+        :return: saved games from the most recent one
+        """
+        return sorted(self.entries.values(), key=lambda entry: entry.saved, reverse=True)
+
+    def register(self, game: Battleship, saved: Optional[float] = None, clean: bool = True):
+        """
+        Add or update entry of given game in index without writing the game
+        :param saved: time of save, the current time by default
+        :param clean: whether the game is not changed after that, False when its journal is going to be recorded
+        """
+        self.entries[game.game_id] = SaveEntry.of(game, time.time() if saved is None else saved, clean)
+        self.write_index()
+
+    def save(self, game: Battleship, saved: Optional[float] = None):
+        """
+        Write given game into its slot and update index
+        :param saved: time of save, the current time by default
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        savefile.save(game, self.save_path(game.game_id))
+        self.register(game, saved)
+
+    def load(self, game_id: int) -> Battleship:
+        """
+        Restore the latest state of saved game from its save and journal
+        """
+        if game_id not in self.entries:
+            raise ValueError(f'No saved game: {game_id:016x}')
+        return journal.restore(self.journal_path(game_id), self.save_path(game_id))
+
+    def remove(self, game_id: int):
+        """
+        Delete saved game with its journal
+        """
+        self.entries.pop(game_id, None)
+        for path in (self.save_path(game_id), self.journal_path(game_id)):
+            if path.exists():
+                path.unlink()
+        self.write_index()
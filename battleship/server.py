@@ -0,0 +1,380 @@
+from typing import Optional, Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import itertools
+import time
+
+from .battleship import Battleship
+from .delta import snapshot
+from .fanout import Fanout, Subscriber
+from .field import MIN_LENGTH, MAX_LENGTH, MIN_WIDTH, MAX_WIDTH, format_point, parse_number, parse_point
+from .player import ShotResult
+from .shooter import SHOOTERS
+from .session import CompactSession
+
+# Protocol: newline-terminated ASCII lines, words separated by spaces.
+# Client commands:
+#   NEW <length> <width> AI [shooter]   play against computer
+#   NEW <length> <width> PVP            create game and wait for opponent
+#   JOIN <game>                         join game created with NEW ... PVP
+#   SHOT <point>                        shoot, point is like 'a5'
+#   STATE                               ask for state of the game
+#   WATCH <game>                        watch game as spectator
+#   QUIT                                close connection
+# Server messages:
+#   GAME <game> <player> <length> <width>       game is created or joined
+#   JOINED                                      opponent joined the game
+#   TURN                                        it's your turn to shoot
+#   SHOT <point> <result> AGAIN|WAIT|WIN        result of your shot
+#   ENEMY <point> <result> WAIT|TURN|LOSE       result of opponent shot
+#   STATE <turn> <shots> <hits> <enemy shots> <enemy hits> <winner or ->
+#   LEFT                                        opponent disconnected
+#   SNAPSHOT <seq> <turn> <winner or -> <length> <width> <radar 0> <radar 1>
+#                                               state of watched game, radars are symbols of cells by x and then y,
+#                                               sent first and again instead of deltas spectator fell behind on
+#   DELTA <seq> <shooter> <turn> <winner or -> <point><symbol>...
+#                                               cells discovered by shot in watched game, seq counts shots
+#   END                                         watched game is closed
+#   ERR <message>
+RESULTS = {ShotResult.water: 'water', ShotResult.hit: 'hit', ShotResult.killing: 'killing'}
+
+
+class Client(object):
+    """
+    Describes connection of a human player
+    """
+    writer: asyncio.StreamWriter
+    session: Optional['Session']  # current game
+    player: int  # number of player in current game
+    watching: Optional[Tuple[Fanout, Subscriber]]  # spectators of watched game and subscription to it
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.session = None
+        self.player = 0
+        self.watching = None
+
+    def send(self, line: str):
+        self.writer.write(line.encode() + b'\n')
+
+
+class Session(object):
+    """
+    Describes game hosted by server
+    """
+    game_id: int
+    state: CompactSession  # game which is compacted while it is idle
+    clients: List[Optional[Client]]  # connection of every player or None for computer and not joined player
+    shooter_name: Optional[str]  # name of computer player which plays for player 1
+    computer: Optional[object]  # computer player, created again from radar after compaction
+    computer_task: Optional[asyncio.Task]  # task making shots of computer player
+    fanout: Optional[Fanout]  # spectators of the game
+    last_active: float  # time of the last use of the game
+
+    def __init__(self, game_id: int, game: Battleship, shooter_name: Optional[str] = None):
+        self.game_id = game_id
+        self.state = CompactSession(game)
+        self.clients = [None, None]
+        self.shooter_name = shooter_name
+        self.computer = None
+        self.computer_task = None
+        self.fanout = None
+        self.last_active = time.monotonic()
+
+    @property
+    def game(self) -> Battleship:
+        self.last_active = time.monotonic()
+        return self.state.game
+
+    @property
+    def shooter(self):
+        """
+        :return: computer player
+        """
+        if self.computer is None:
+            game = self.game
+            self.computer = SHOOTERS[self.shooter_name](game.field_length, game.field_width)
+            # Game may be in progress after compaction, so target of computer player is restored from its radar
+            self.computer.sync(game.players[1].field.radar)
+        return self.computer
+
+    @property
+    def ready(self) -> bool:
+        """
+        :return: True if both players are present
+        """
+        return self.shooter_name is not None or all(client is not None for client in self.clients)
+
+    def watch(self, writer: asyncio.StreamWriter) -> Subscriber:
+        """
+        Start sending snapshot and deltas of the game to spectator
+        """
+        if self.fanout is None:
+            fanout = self.fanout = Fanout(lambda: snapshot(self.game))
+            self.game.subscribe(lambda delta: fanout.publish(delta.encode()))
+        return self.fanout.subscribe(writer)
+
+    def compact(self):
+        """
+        Keep only binary representation of the game until it is used again
+        Watched games are not compacted, because events of the game object are lost
+        """
+        if self.fanout is not None and self.fanout.subscribers:
+            return
+        if self.computer_task is None or self.computer_task.done():
+            self.state.compact()
+            self.computer = None
+            self.fanout = None
+
+
+class Server(object):
+    """
+    Hosts many games in one event loop
+    """
+    sessions: Dict[int, Session]
+    ids: itertools.count  # generator of game identifiers
+    connections: int  # count of open connections
+    idle_seconds: float  # games not used for this time are compacted
+    thinker: ThreadPoolExecutor  # thread computing shots of computer players which think for a time budget
+
+    def __init__(self, idle_seconds: float = 30.0):
+        self.sessions = {}
+        self.ids = itertools.count(1)
+        self.connections = 0
+        self.idle_seconds = idle_seconds
+        # One thread, so transposition cache shared by computer players is never used concurrently
+        self.thinker = ThreadPoolExecutor(1, thread_name_prefix='thinker')
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Serve one connection until it is closed
+        """
+        client = Client(writer)
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Line is longer than limit of the stream
+                    break
+                if not line:
+                    break
+                words = line.decode(errors='replace').split()
+                if not words:
+                    continue
+                if words[0].upper() == 'QUIT':
+                    break
+                self.dispatch(client, words)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            self.unwatch(client)
+            self.leave(client)
+            writer.close()
+
+    def dispatch(self, client: Client, words: List[str]):
+        """
+        Process command of client
+        :param client: connection of player
+        :param words: command and its arguments
+        """
+        command, args = words[0].upper(), words[1:]
+        if command == 'NEW':
+            self.new_game(client, args)
+        elif command == 'JOIN':
+            self.join_game(client, args)
+        elif command == 'SHOT':
+            self.shot(client, args)
+        elif command == 'STATE':
+            self.state(client)
+        elif command == 'WATCH':
+            self.watch(client, args)
+        else:
+            client.send(f'ERR unknown command {command}')
+
+    def new_game(self, client: Client, args: List[str]):
+        length, width = (parse_number(args[0]), parse_number(args[1])) if len(args) >= 3 else (None, None)
+        if length is None or width is None or args[2].upper() not in ('AI', 'PVP'):
+            client.send('ERR usage: NEW <length> <width> AI [shooter] | NEW <length> <width> PVP')
+            return
+        if not MIN_LENGTH <= length <= MAX_LENGTH or not MIN_WIDTH <= width <= MAX_WIDTH:
+            client.send(f'ERR field must be from {MIN_LENGTH}x{MIN_WIDTH} to {MAX_LENGTH}x{MAX_WIDTH}')
+            return
+        shooter = None
+        if args[2].upper() == 'AI':
+            name = args[3] if len(args) > 3 else 'density'
+            if name not in SHOOTERS:
+                client.send(f'ERR shooter must be one of {", ".join(SHOOTERS)}')
+                return
+            shooter = name
+        self.leave(client)
+        session = Session(next(self.ids), Battleship(length, width), shooter)
+        self.sessions[session.game_id] = session
+        session.clients[0] = client
+        client.session = session
+        client.player = 0
+        client.send(f'GAME {session.game_id} 0 {length} {width}')
+        if session.ready:
+            client.send('TURN')
+
+    def join_game(self, client: Client, args: List[str]):
+        session = self.sessions.get(parse_number(args[0])) if args else None
+        # Only the second place of PVP game can be taken and only while its creator is connected
+        if session is None or session.shooter_name is not None or session.clients[0] is None \
+                or session.clients[1] is not None:
+            client.send('ERR no such game waiting for opponent')
+            return
+        self.leave(client)
+        session.clients[1] = client
+        client.session = session
+        client.player = 1
+        client.send(f'GAME {session.game_id} 1 {session.game.field_length} {session.game.field_width}')
+        session.clients[0].send('JOINED')
+        session.clients[session.game.turn].send('TURN')
+
+    def shot(self, client: Client, args: List[str]):
+        session = client.session
+        if session is None:
+            client.send('ERR no game')
+            return
+        game = session.game
+        if not session.ready:
+            client.send('ERR waiting for opponent')
+            return
+        if game.winner is not None:
+            client.send('ERR game is over')
+            return
+        if game.turn != client.player:
+            client.send('ERR not your turn')
+            return
+        x, y = parse_point(args[0]) if args else (-1, -1)
+        result = game.make_shot(x, y)
+        if result is None:
+            client.send('ERR point is not on field or is already discovered')
+            return
+        self.notify(session, client.player, x, y, result)
+        if game.winner is None and game.turn != client.player and session.shooter_name is not None:
+            session.computer_task = asyncio.get_running_loop().create_task(self.computer_turn(session))
+
+    def notify(self, session: Session, player: int, x: int, y: int, result: ShotResult):
+        """
+        Send result of the shot to both players
+        :param session: game where shot was made
+        :param player: number of player who made the shot
+        :param x: x-coordinate of the shot
+        :param y: y-coordinate of the shot
+        :param result: result of the shot
+        """
+        game = session.game
+        point = format_point(x, y)
+        if game.winner is not None:
+            own, enemy = 'WIN', 'LOSE'
+        elif game.turn == player:
+            own, enemy = 'AGAIN', 'WAIT'
+        else:
+            own, enemy = 'WAIT', 'TURN'
+        shooter, target = session.clients[player], session.clients[1 - player]
+        if shooter is not None:
+            shooter.send(f'SHOT {point} {RESULTS[result]} {own}')
+        if target is not None:
+            target.send(f'ENEMY {point} {RESULTS[result]} {enemy}')
+
+    async def computer_turn(self, session: Session):
+        """
+        Make shots of computer player until its turn is over, yielding to other connections between shots
+        """
+        game = session.game
+        while game.winner is None and game.turn == 1:
+            radar = game.current_player.field.radar
+            shooter = session.shooter
+            if getattr(shooter, 'budget', None):
+                # Shot which takes time budget is computed in thread, so other connections are served meanwhile
+                x, y = await asyncio.get_running_loop().run_in_executor(self.thinker, shooter.next_shot, radar)
+            else:
+                x, y = shooter.next_shot(radar)
+            result = game.make_shot(x, y)
+            session.shooter.update(x, y, result, radar)
+            self.notify(session, 1, x, y, result)
+            await asyncio.sleep(0)
+        client = session.clients[0]
+        if client is not None:
+            await client.writer.drain()
+
+    def state(self, client: Client):
+        session = client.session
+        if session is None:
+            client.send('ERR no game')
+            return
+        game = session.game
+        me, enemy = game.players[client.player], game.players[1 - client.player]
+        winner = '-' if game.winner is None else str(game.winner)
+        client.send(f'STATE {game.turn} {me.shots} {me.hits} {enemy.shots} {enemy.hits} {winner}')
+
+    def watch(self, client: Client, args: List[str]):
+        session = self.sessions.get(parse_number(args[0])) if args else None
+        if session is None:
+            client.send('ERR no such game')
+            return
+        self.unwatch(client)
+        subscriber = session.watch(client.writer)
+        client.watching = (session.fanout, subscriber)
+
+    def unwatch(self, client: Client):
+        """
+        Stop sending watched game to client
+        """
+        if client.watching is None:
+            return
+        fanout, subscriber = client.watching
+        client.watching = None
+        fanout.unsubscribe(subscriber)
+
+    def leave(self, client: Client):
+        """
+        Remove client from its game and drop the game if nobody plays it
+        """
+        session = client.session
+        if session is None:
+            return
+        client.session = None
+        session.clients[client.player] = None
+        opponent = session.clients[1 - client.player]
+        if opponent is not None:
+            opponent.send('LEFT')
+        else:
+            if session.computer_task is not None:
+                session.computer_task.cancel()
+            if session.fanout is not None:
+                session.fanout.close()
+            self.sessions.pop(session.game_id, None)
+
+    async def compact_idle(self):
+        """
+        Periodically compact games which are not used for a while
+        """
+        while True:
+            await asyncio.sleep(self.idle_seconds / 2)
+            deadline = time.monotonic() - self.idle_seconds
+            for session in list(self.sessions.values()):
+                if session.last_active < deadline and not session.state.is_compact:
+                    session.compact()
+
+    async def serve(self, host: str, port: int):
+        server = await asyncio.start_server(self.handle, host, port, backlog=4096)
+        compactor = asyncio.get_running_loop().create_task(self.compact_idle())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            compactor.cancel()
+            self.thinker.shutdown(wait=False, cancel_futures=True)
+
+
+def serve(host: str = '127.0.0.1', port: int = 7777):
+    """
+    Run server until interrupted
+    """
+    asyncio.run(Server().serve(host, port))
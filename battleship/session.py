@@ -0,0 +1,40 @@
+from typing import Optional
+
+from .battleship import Battleship
+from . import savefile
+
+
+class CompactSession(object):
+    """
+    Game which is kept in save format while it is idle and is materialized only when it is used
+    Messages, journal and events of the game are not kept while the game is compact
+    """
+    __slots__ = ('data', 'materialized')
+    data: Optional[bytes]  # binary representation of compact game
+    materialized: Optional[Battleship]  # game object while it is used
+
+    def __init__(self, game: Battleship):
+        self.data = None
+        self.materialized = game
+
+    @property
+    def game(self) -> Battleship:
+        """
+        :return: game object, created from binary representation if session is compact
+        """
+        if self.materialized is None:
+            self.materialized = savefile.loads(self.data)
+            self.data = None
+        return self.materialized
+
+    @property
+    def is_compact(self) -> bool:
+        return self.materialized is None
+
+    def compact(self):
+        """
+        Replace game object with its binary representation
+        """
+        if self.materialized is not None:
+            self.data = savefile.dumps(self.materialized)
+            self.materialized = None
@@ -1,44 +1,47 @@
 from typing import Set, Tuple, List
 import random
 
-from field import Field
+from .field import MAX_LENGTH, MAX_WIDTH, Field
+from .geometry import Placement, get_geometry
+
+# Count of random placements drawn for one ship on large field before generation is abandoned
+MAX_REJECTIONS = 100000
 
 
 class Ship(object):
     """
     Describes ship
     """
+    __slots__ = ('hp', 'placement')
     hp: int  # count of not destroyed 'ship pipes'
-    size: int
-    x: int  # x-coordinate of starting point
-    y: int  # y-coordinate of starting point
-    rotation: int  # ship rotation
-
-    def __init__(self, size: int, x: int, y: int, rotation: int):
-        self.hp = size
-        self.size = size
-        self.x = x
-        self.y = y
-        self.rotation = rotation
+    placement: Placement  # shared position of ship on field
+
+    def __init__(self, placement: Placement):
+        self.hp = placement.size
+        self.placement = placement
+
+    @property
+    def size(self) -> int:
+        return self.placement.size
+
+    @property
+    def x(self) -> int:
+        return self.placement.x
+
+    @property
+    def y(self) -> int:
+        return self.placement.y
+
+    @property
+    def rotation(self) -> int:
+        return self.placement.rotation
 
     @property
     def occupied_cells(self) -> Set[Tuple[int, int]]:
         """
         :return: list of points occupied by ship
         """
-        if self.rotation == 0:
-            # East
-            return set((self.x + dx, self.y) for dx in range(self.size))
-        if self.rotation == 1:
-            # South
-            return set((self.x, self.y + dy) for dy in range(self.size))
-        if self.rotation == 2:
-            # West
-            return set((self.x - dx, self.y) for dx in range(self.size))
-        if self.rotation == 3:
-            # North
-            return set((self.x, self.y - dy) for dy in range(self.size))
-        assert False, f'Invalid rotation: {self.rotation}'
+        return set(self.placement.points)
 
     @property
     def occupied_and_nearby_cells(self) -> Set[Tuple[int, int]]:
@@ -46,7 +49,7 @@ class Ship(object):
         :return: list of points occupied by the ship and all adjacent to them
         """
         return set((x + dx, y + dy)
-                   for (x, y) in self.occupied_cells
+                   for (x, y) in self.placement.points
                    for dx in range(-1, 2)
                    for dy in range(-1, 2))
 
@@ -63,13 +66,8 @@ class Ship(object):
         :param existed_ships: ships that are already placed on field
         :return: True if we can place this ship on given field with others or False otherwise
         """
-        for x, y in self.occupied_cells:
-            # Check that ship is on field
-            if not field.on_field(x, y):
-                return False
-        # Checks that ships are not touching
-        return not any(not ship.occupied_and_nearby_cells.isdisjoint(self.occupied_cells)
-                       for ship in existed_ships)
+        # Placements are always on field, so check that ships are not touching
+        return not any(self.placement.mask & ship.placement.halo for ship in existed_ships)
 
     @staticmethod
     def get_sizes(field: Field) -> List[int]:
@@ -77,47 +75,87 @@ class Ship(object):
         :param field: field where ships will be placed
         :return: list of ships sizes for this field
         """
-        m = 3 + 2 * (min(field.length, field.width) // 10)
+        # Fleet of large field is the same as of the largest field stored as bitmasks
+        m = 3 + 2 * (min(field.length, field.width, MAX_LENGTH, MAX_WIDTH) // 10)
         return [k for k in range(1, m) for _ in range(m - k)]
 
     @staticmethod
-    def generate_ships(field: Field):
+    def generate_ships(field: Field, rng: random.Random = random):
         """
         Generate random correct ships for given field
+        Ships are placed from the largest to the smallest, every size takes placements from its own lazily
+        shuffled list, ships of the same size take them in increasing order. When next ship doesn't fit
+        anywhere, previous ships are moved to their next fitting placements.
         :param field: field where ships will be placed
+        :param rng: source of randomness
         :return: list of ships
+        :raise ValueError: if ships don't fit on the field
         """
         # Ship sizes
-        sizes = Ship.get_sizes(field)
-        positions = Ship.generate_positions(field)
-        # Already created ships
-        ships = []
-        # Index of current random position
-        i = 0
-        for size in reversed(sizes):
-            created = False
-            while i < len(positions):
-                x, y, rotation = positions[i]
-                i += 1
-                new_ship = Ship(size, x, y, rotation)
-                if new_ship.fits(field, ships):
-                    ships.append(new_ship)
-                    created = True
-                    break
-            if not created:
-                assert False, f'Cannot generate ships with sizes {sizes} on the field {field.length}x{field.width}'
-        return ships
+        sizes = sorted(Ship.get_sizes(field), reverse=True)
+        geometry = get_geometry(field.length, field.width)
+        if geometry.large:
+            return Ship.sample_ships(field, sizes, rng)
+        # Shuffled placements of every size and count of already shuffled ones
+        orders = {size: list(geometry.placements(size)) for size in set(sizes)}
+        shuffled = dict.fromkeys(orders, 0)
+
+        def placement(size: int, k: int) -> Placement:
+            order = orders[size]
+            while shuffled[size] <= k:
+                i = shuffled[size]
+                j = rng.randrange(i, len(order))
+                order[i], order[j] = order[j], order[i]
+                shuffled[size] += 1
+            return order[k]
+
+        # Index of chosen placement for every placed ship
+        chosen = []
+        # Bitmask of cells occupied by placed ships or adjacent to them for every count of placed ships
+        blocked = [0]
+        # Index of next placement to try
+        k = 0
+        while len(chosen) < len(sizes):
+            size = sizes[len(chosen)]
+            while k < len(orders[size]) and placement(size, k).mask & blocked[-1]:
+                k += 1
+            if k < len(orders[size]):
+                # Place ship
+                chosen.append(k)
+                blocked.append(blocked[-1] | placement(size, k).halo)
+                k = k + 1 if len(chosen) < len(sizes) and sizes[len(chosen)] == size else 0
+                continue
+            if not chosen:
+                raise ValueError(f'Cannot generate ships with sizes {sizes} on the field {field.length}x{field.width}')
+            # Move previous ship to its next placement
+            k = chosen.pop() + 1
+            blocked.pop()
+        return [Ship(placement(size, k)) for size, k in zip(sizes, chosen)]
 
     @staticmethod
-    def generate_positions(field: Field) -> List[Tuple[int, int, int]]:
+    def sample_ships(field: Field, sizes: List[int], rng: random.Random = random):
         """
-        Generate all positions and rotations of ships in random order
+        Generate random correct ships for large field by rejection sampling: random placement is drawn again
+        while it touches already placed ships. Fleet takes a small part of large field, so few draws are rejected
+        and only cells of placed ships and around them are remembered.
         :param field: field where ships will be placed
-        :return: list of positions and rotations
+        :param sizes: ship sizes in decreasing order
+        :param rng: source of randomness
+        :return: list of ships
+        :raise ValueError: if some ship is not placed in MAX_REJECTIONS draws
         """
-        positions = [(x, y, rotation)
-                     for x in range(field.length)
-                     for y in range(field.width)
-                     for rotation in range(4)]
-        random.shuffle(positions)
-        return positions
+        geometry = get_geometry(field.length, field.width)
+        # Cells occupied by placed ships or adjacent to them
+        blocked = set()
+        ships = []
+        for size in sizes:
+            count = geometry.count(size)
+            for _ in range(MAX_REJECTIONS):
+                placement = geometry.placement_at(size, rng.randrange(count))
+                if blocked.isdisjoint(placement.cells):
+                    break
+            else:
+                raise ValueError(f'Cannot generate ships with sizes {sizes} on the field {field.length}x{field.width}')
+            blocked.update(placement.halo_cells())
+            ships.append(Ship(placement))
+        return ships
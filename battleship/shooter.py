@@ -0,0 +1,171 @@
+from typing import Tuple, List
+import copy
+import random
+
+from .field import Cell, Table, mask_indices
+from .player import ShotResult
+from .strategy import SHOOTERS, register
+
+# Count of random cells tried by hunting shooter before it looks through all cells
+HUNT_ATTEMPTS = 64
+
+
+@register('random')
+class RandomShooter(object):
+    """
+    Computer player which shoots into random undiscovered points
+    """
+    field_length: int
+    field_width: int
+    points: list  # not yet tried points in random order
+
+    def __init__(self, field_length: int, field_width: int, rng: random.Random = random):
+        self.field_length = field_length
+        self.field_width = field_width
+        self.points = [(x, y) for x in range(field_length) for y in range(field_width)]
+        rng.shuffle(self.points)
+
+    def fork(self) -> 'RandomShooter':
+        """
+        :return: independent copy of this shooter
+        """
+        other = copy.copy(self)
+        other.points = list(self.points)
+        return other
+
+    def sync(self, radar: Table):
+        """
+        Forget points discovered on radar, used when shooter is created for a game in progress
+        """
+        self.points = [(x, y) for x, y in self.points if radar.is_empty(x, y)]
+
+    def next_shot(self, radar: Table) -> Tuple[int, int]:
+        """
+        :param radar: radar of the shooting player
+        :return: coordinates of the next shot
+        """
+        while True:
+            x, y = self.points[-1]
+            if radar.is_empty(x, y):
+                return x, y
+            # Point was discovered as water around destroyed ship
+            self.points.pop()
+
+    def update(self, x: int, y: int, result: ShotResult, radar: Table):
+        """
+        Process result of the shot made by this shooter
+        :param x: x-coordinate of the shot
+        :param y: y-coordinate of the shot
+        :param result: result of the shot
+        :param radar: radar of the shooting player after the shot
+        """
+        if self.points and self.points[-1] == (x, y):
+            self.points.pop()
+        else:
+            self.points.remove((x, y))
+
+
+@register('hunt')
+class HuntShooter(object):
+    """
+    Computer player which shoots into random cells until it hits a ship and then next to the hits until the ship
+    is destroyed. Only hits of the ship being finished are remembered, so it fits fields of any size.
+    """
+    field_length: int
+    field_width: int
+    rng: random.Random
+    hits: List[Tuple[int, int]]  # hit points of not destroyed ship
+
+    def __init__(self, field_length: int, field_width: int, rng: random.Random = random):
+        self.field_length = field_length
+        self.field_width = field_width
+        self.rng = rng
+        self.hits = []
+
+    def fork(self) -> 'HuntShooter':
+        """
+        :return: independent copy of this shooter with its own source of randomness seeded from this one
+        """
+        other = copy.copy(self)
+        # Copies used in another thread must not share generator with this shooter
+        other.rng = random.Random(self.rng.getrandbits(64))
+        other.hits = list(self.hits)
+        return other
+
+    def sync(self, radar: Table):
+        """
+        Restore hits of not destroyed ship from radar, used when shooter is created for a game in progress
+        """
+        if self.hits:
+            return
+        for i in mask_indices(radar.hit):
+            ship = [divmod(i, self.field_width)]
+            for x, y in ship:
+                for point in self.neighbours(x, y):
+                    if radar.cell(*point) == Cell.hit and point not in ship:
+                        ship.append(point)
+            # Water is put around destroyed ship, so ship with undiscovered cells next to it is not destroyed
+            if any(radar.is_empty(*point) for x, y in ship for point in self.neighbours(x, y)):
+                self.hits = ship
+                return
+
+    def neighbours(self, x: int, y: int) -> List[Tuple[int, int]]:
+        """
+        :return: points adjacent to (x, y) by side
+        """
+        return [(x + dx, y + dy) for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1))
+                if 0 <= x + dx < self.field_length and 0 <= y + dy < self.field_width]
+
+    def targets(self) -> List[Tuple[int, int]]:
+        """
+        :return: points where the hit ship may continue: around single hit or at the ends of line of hits
+        """
+        if not self.hits:
+            return []
+        (x0, y0), (x1, y1) = min(self.hits), max(self.hits)
+        if len(self.hits) == 1:
+            points = [(x0 - 1, y0), (x0 + 1, y0), (x0, y0 - 1), (x0, y0 + 1)]
+        elif x0 == x1:
+            points = [(x0, y0 - 1), (x1, y1 + 1)]
+        else:
+            points = [(x0 - 1, y0), (x1 + 1, y1)]
+        self.rng.shuffle(points)
+        return [(x, y) for x, y in points if 0 <= x < self.field_length and 0 <= y < self.field_width]
+
+    def next_shot(self, radar: Table) -> Tuple[int, int]:
+        """
+        :param radar: radar of the shooting player
+        :return: coordinates of the next shot
+        """
+        for x, y in self.targets():
+            if radar.is_empty(x, y):
+                return x, y
+        for _ in range(HUNT_ATTEMPTS):
+            x, y = self.rng.randrange(self.field_length), self.rng.randrange(self.field_width)
+            if radar.is_empty(x, y):
+                return x, y
+        # Almost whole field is discovered, cells are looked through starting from random one
+        count = self.field_length * self.field_width
+        start = self.rng.randrange(count)
+        for k in range(count):
+            x, y = divmod((start + k) % count, self.field_width)
+            if radar.is_empty(x, y):
+                return x, y
+        assert False, 'Whole field is discovered'
+
+    def update(self, x: int, y: int, result: ShotResult, radar: Table):
+        """
+        Process result of the shot made by this shooter
+        :param x: x-coordinate of the shot
+        :param y: y-coordinate of the shot
+        :param result: result of the shot
+        :param radar: radar of the shooting player after the shot
+        """
+        if result == ShotResult.hit:
+            self.hits.append((x, y))
+        elif result == ShotResult.killing:
+            self.hits = []
+
+
+# Modules of other built-in strategies register them on import, after the simple ones to keep them first in SHOOTERS
+from . import density, solver, endgame  # noqa: E402, F401
@@ -0,0 +1,188 @@
+from typing import Dict, Iterator, List, Optional
+from pathlib import Path
+import os
+import shutil
+
+import numpy as np
+
+from .player import ShotResult
+
+# Shot log layout: directory of chunks, every chunk is a directory with one .npy file for every column.
+# Chunk is written into a temporary directory and renamed, so readers see only complete chunks.
+COLUMNS: Dict[str, np.dtype] = {
+    'game': np.dtype('<u4'),  # game identifier
+    'turn': np.dtype('<u1'),  # number of shooting player
+    'x': np.dtype('<u2'),  # x-coordinate of the shot
+    'y': np.dtype('<u2'),  # y-coordinate of the shot
+    'result': np.dtype('<u1'),  # value of ShotResult
+    'shot': np.dtype('<u4'),  # number of the shot in the game
+    'length': np.dtype('<u2'),  # field length
+    'width': np.dtype('<u2'),  # field width
+}
+CHUNK_PREFIX = 'chunk-'
+# Prefix of chunk which is being written, it never matches CHUNK_PREFIX
+TEMP_PREFIX = '.tmp-'
+
+# Count of records in one chunk
+CHUNK_RECORDS = 1 << 20
+
+
+def chunk_paths(path: Path) -> List[Path]:
+    """
+    :return: complete chunks of shot log in order they were written
+    """
+    if not path.is_dir():
+        return []
+    return sorted(child for child in path.iterdir() if child.is_dir() and child.name.startswith(CHUNK_PREFIX))
+
+
+class ShotLogWriter(object):
+    """
+    Appends shot records to shot log, records are buffered in columns and written by chunks
+    """
+    path: Path  # directory of shot log
+    chunk_records: int  # count of records in one chunk
+    columns: Dict[str, np.ndarray]  # buffered records
+    size: int  # count of buffered records
+    chunks: int  # count of chunks in shot log
+
+    def __init__(self, path: Path, chunk_records: int = CHUNK_RECORDS):
+        self.path = path
+        self.chunk_records = chunk_records
+        self.columns = {name: np.empty(chunk_records, dtype=dtype) for name, dtype in COLUMNS.items()}
+        self.size = 0
+        path.mkdir(parents=True, exist_ok=True)
+        # Chunks left by writer which was interrupted while writing them
+        for child in path.iterdir():
+            if child.is_dir() and child.name.startswith(TEMP_PREFIX):
+                shutil.rmtree(child, ignore_errors=True)
+        self.chunks = len(chunk_paths(path))
+
+    def __enter__(self) -> 'ShotLogWriter':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, game: int, turn: int, x: int, y: int, result: ShotResult, shot: int, length: int, width: int):
+        """
+        Append one shot record
+        """
+        self.append({'game': [game], 'turn': [turn], 'x': [x], 'y': [y], 'result': [result.value], 'shot': [shot],
+                     'length': [length], 'width': [width]})
+
+    def append(self, records: Dict[str, np.ndarray]):
+        """
+        Append many shot records
+        :param records: arrays of the same length for every column
+        """
+        count = len(records['game'])
+        start = 0
+        while start < count:
+            taken = min(count - start, self.chunk_records - self.size)
+            for name, column in self.columns.items():
+                column[self.size:self.size + taken] = records[name][start:start + taken]
+            self.size += taken
+            start += taken
+            if self.size == self.chunk_records:
+                self.flush()
+
+    def flush(self):
+        """
+        Write buffered records as a new chunk
+        """
+        if not self.size:
+            return
+        name = f'{CHUNK_PREFIX}{self.chunks:06d}'
+        temp_path = self.path / f'{TEMP_PREFIX}{name}'
+        shutil.rmtree(temp_path, ignore_errors=True)
+        temp_path.mkdir()
+        for column, values in self.columns.items():
+            np.save(temp_path / f'{column}.npy', values[:self.size])
+        os.replace(temp_path, self.path / name)
+        self.chunks += 1
+        self.size = 0
+
+    def close(self):
+        self.flush()
+
+
+class ShotLog(object):
+    """
+    Reads shot log by memory-mapping its columns, queries reduce chunks one by one with numpy
+    """
+    path: Path  # directory of shot log
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def chunks(self, *names: str) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        :param names: column names
+        :return: memory-mapped given columns of every chunk
+        """
+        for chunk in chunk_paths(self.path):
+            yield {name: np.load(chunk / f'{name}.npy', mmap_mode='r') for name in names}
+
+    def __len__(self) -> int:
+        """
+        :return: count of records
+        """
+        return sum(len(chunk['game']) for chunk in self.chunks('game'))
+
+    @property
+    def games(self) -> int:
+        """
+        :return: count of game identifiers in use, identifiers of simulated games are consecutive from 0
+        """
+        return max((int(chunk['game'].max()) + 1 for chunk in self.chunks('game') if len(chunk['game'])), default=0)
+
+    def cell_counts(self, field_length: int, field_width: int, result: Optional[ShotResult] = None) -> np.ndarray:
+        """
+        :param field_length: field length of counted games
+        :param field_width: field width of counted games
+        :param result: result of counted shots, all shots are counted if None
+        :return: count of shots into every cell as array of shape (length, width)
+        """
+        counts = np.zeros(field_length * field_width, dtype=np.int64)
+        names = ('x', 'y', 'length', 'width') + (('result',) if result is not None else ())
+        for chunk in self.chunks(*names):
+            selected = (chunk['length'] == field_length) & (chunk['width'] == field_width)
+            if result is not None:
+                selected &= chunk['result'] == result.value
+            cells = chunk['x'][selected].astype(np.int64) * field_width + chunk['y'][selected]
+            counts += np.bincount(cells, minlength=field_length * field_width)
+        return counts.reshape(field_length, field_width)
+
+    def heatmap(self, field_length: int, field_width: int) -> np.ndarray:
+        """
+        :return: part of all shots on field of given size made into every cell as array of shape (length, width)
+        """
+        counts = self.cell_counts(field_length, field_width)
+        return counts / max(int(counts.sum()), 1)
+
+    def hit_rate(self, field_length: int, field_width: int) -> np.ndarray:
+        """
+        :return: part of shots into every cell which hit a ship as array of shape (length, width),
+                 NaN for cells without shots
+        """
+        shots = self.cell_counts(field_length, field_width)
+        hits = shots - self.cell_counts(field_length, field_width, ShotResult.water)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(shots > 0, hits / shots, np.nan)
+
+    def shots_to_win(self) -> np.ndarray:
+        """
+        Winner of every game is the player who made its last shot
+        :return: count of games won with every count of shots, indexed by count of shots of winner
+        """
+        games = self.games
+        last = np.full(games, -1, dtype=np.int64)  # number of the last shot and its player as shot * 2 + turn
+        shots = np.zeros(2 * games, dtype=np.int64)  # count of shots of every player as game * 2 + turn
+        for chunk in self.chunks('game', 'turn', 'shot'):
+            game = chunk['game'].astype(np.int64)
+            turn = chunk['turn'].astype(np.int64)
+            np.maximum.at(last, game, chunk['shot'].astype(np.int64) * 2 + turn)
+            shots += np.bincount(game * 2 + turn, minlength=2 * games)
+        played = np.flatnonzero(last >= 0)
+        return np.bincount(shots[played * 2 + last[played] % 2])
@@ -0,0 +1,188 @@
+from typing import Optional, Tuple, List, Dict
+from collections import Counter
+from multiprocessing import Pool
+from pathlib import Path
+import random
+import statistics
+import time
+
+import numpy as np
+
+from .battleship import Battleship
+from .shooter import SHOOTERS
+from .shotlog import COLUMNS, ShotLog, ShotLogWriter
+from .transposition import CACHE, TranspositionCache
+
+# Count of games played by one worker task
+CHUNK_SIZE = 64
+
+
+def play_game(game: Battleship, shooters: list, shots: Optional[List[Tuple[int, int, int, int]]] = None) -> int:
+    """
+    Play the game until the end with computer players on both sides
+    :param game: game object
+    :param shooters: computer players for both players of the game
+    :param shots: list to which number of player, coordinates and result value of every shot are appended
+    :return: number of winning player
+    """
+    while game.winner is None:
+        turn = game.turn
+        radar = game.current_player.field.radar
+        x, y = shooters[turn].next_shot(radar)
+        result = game.make_shot(x, y)
+        assert result is not None, f'Shooter made incorrect shot: {(x, y)}'
+        if shots is not None:
+            shots.append((turn, x, y, result.value))
+        shooters[turn].update(x, y, result, radar)
+    return game.winner
+
+
+def chunk_rng(seed: int, chunk: int) -> random.Random:
+    """
+    :return: independent source of randomness for given chunk of games, distinct for every seed and chunk
+    """
+    return random.Random(f'{seed} {chunk}')
+
+
+def simulate_chunk(args: Tuple[int, int, int, int, int, Tuple[str, str], Optional[int]]
+                   ) -> Tuple[List[Tuple[int, int, int]], Optional[Dict[str, np.ndarray]]]:
+    """
+    Play chunk of games
+    :param args: seed, chunk number, count of games, field length, field width, shooter names and
+                 identifier of the first game of the chunk if shots are logged or None
+    :return: list of number of winner, shots of winner and total shots for every game and
+             columns of shot records if shots are logged
+    """
+    seed, chunk, games, field_length, field_width, shooter_names, first_game = args
+    rng = chunk_rng(seed, chunk)
+    results = []
+    records = [] if first_game is not None else None
+    for k in range(games):
+        game = Battleship(field_length, field_width, rng=rng)
+        shooters = [SHOOTERS[name](field_length, field_width, rng) for name in shooter_names]
+        shots = [] if records is not None else None
+        winner = play_game(game, shooters, shots)
+        results.append((winner, game.players[winner].shots, game.players[0].shots + game.players[1].shots))
+        if records is not None:
+            records.extend((first_game + k, turn, x, y, result, shot, field_length, field_width)
+                           for shot, (turn, x, y, result) in enumerate(shots))
+    if records is None:
+        return results, None
+    rows = np.array(records, dtype=np.int64).reshape(-1, len(COLUMNS))
+    return results, {name: rows[:, k].astype(dtype) for k, (name, dtype) in enumerate(COLUMNS.items())}
+
+
+class SimulationReport(object):
+    """
+    Describes results of many played games
+    """
+    games: int  # count of played games
+    seconds: float  # elapsed wall time
+    wins: List[int]  # count of wins of every player
+    winner_shots: Dict[int, int]  # distribution of shots made by winner
+    total_shots: int  # count of shots made in all games
+
+    def __init__(self, results: List[Tuple[int, int, int]], seconds: float):
+        self.games = len(results)
+        self.seconds = seconds
+        self.wins = [0, 0]
+        self.winner_shots = Counter()
+        self.total_shots = 0
+        for winner, shots, total in results:
+            self.wins[winner] += 1
+            self.winner_shots[shots] += 1
+            self.total_shots += total
+
+    @property
+    def games_per_second(self) -> float:
+        return self.games / self.seconds if self.seconds > 0 else float('inf')
+
+    @property
+    def shots_per_second(self) -> float:
+        return self.total_shots / self.seconds if self.seconds > 0 else float('inf')
+
+    def percentile(self, p: float) -> int:
+        """
+        :param p: percentile in range [0; 100]
+        :return: count of shots of winner not exceeded in p percents of games
+        """
+        rank = max(1, round(p / 100 * self.games))
+        seen = 0
+        for shots in sorted(self.winner_shots):
+            seen += self.winner_shots[shots]
+            if seen >= rank:
+                return shots
+        return 0
+
+    def display(self) -> str:
+        """
+        :return: representation of report
+        """
+        samples = list(self.winner_shots.elements())
+        mean = statistics.fmean(samples) if samples else 0.0
+        stdev = statistics.pstdev(samples) if samples else 0.0
+        rows = [f'games:        {self.games}',
+                f'time:         {self.seconds:.3f} s',
+                f'games/sec:    {self.games_per_second:.1f}',
+                f'shots/sec:    {self.shots_per_second:.1f}',
+                f'wins:         {self.wins[0]} / {self.wins[1]}',
+                f'winner shots: mean {mean:.2f}, stdev {stdev:.2f}, '
+                f'min {min(samples, default=0)}, max {max(samples, default=0)}',
+                '              ' + ', '.join(f'p{p} {self.percentile(p)}' for p in (10, 50, 90, 99))]
+        return '\n'.join(rows)
+
+
+def load_cache(data: Optional[bytes]):
+    """
+    Fill transposition cache of this process from contents of cache file if there is one
+    """
+    if data is not None:
+        CACHE.loads(data)
+
+
+def simulate(games: int, field_length: int, field_width: int, shooter_names: Tuple[str, str] = ('random', 'random'),
+             seed: int = 0, workers: Optional[int] = None, cache_path: Optional[Path] = None,
+             log_path: Optional[Path] = None) -> SimulationReport:
+    """
+    Play many games between computer players without user interface
+    Results depend only on seed and not on count of workers
+    :param games: count of games
+    :param field_length: length of game field
+    :param field_width: width of game field
+    :param shooter_names: names of computer players from SHOOTERS
+    :param seed: seed of random generators
+    :param workers: count of worker processes, all cores by default and in-process if 1
+    :param cache_path: file of transposition cache loaded by every process, updated when games are played in-process
+    :param log_path: directory of shot log to which every shot is appended, games get identifiers after logged ones
+    :return: report about played games
+    :raise ValueError: if cache file is not a transposition cache
+    """
+    first_game = ShotLog(log_path).games if log_path is not None else None
+    tasks = [(seed, chunk, min(CHUNK_SIZE, games - start), field_length, field_width, tuple(shooter_names),
+              first_game + start if first_game is not None else None)
+             for chunk, start in enumerate(range(0, games, CHUNK_SIZE))]
+    start_time = time.perf_counter()
+    results = []
+    cache_data = cache_path.read_bytes() if cache_path is not None and cache_path.exists() else None
+    # Cache is checked once here, so a broken file is reported before any worker process starts
+    if workers == 1:
+        load_cache(cache_data)
+    elif cache_data is not None:
+        TranspositionCache().loads(cache_data)
+    writer = ShotLogWriter(log_path) if log_path is not None else None
+    pool = Pool(workers, initializer=load_cache, initargs=(cache_data,)) if workers != 1 else None
+    try:
+        for chunk_results, records in (map(simulate_chunk, tasks) if pool is None
+                                       else pool.imap(simulate_chunk, tasks)):
+            results.extend(chunk_results)
+            if writer is not None:
+                # Chunks come in order, so identifiers of logged games grow
+                writer.append(records)
+        if pool is None and cache_path is not None:
+            CACHE.save(cache_path)
+    finally:
+        if pool is not None:
+            pool.terminate()
+        if writer is not None:
+            writer.close()
+    return SimulationReport(results, time.perf_counter() - start_time)
@@ -0,0 +1,349 @@
+from typing import Dict, List, Optional, Tuple
+from multiprocessing import Pool
+import atexit
+import random
+import time
+
+import numpy as np
+
+from .density import DensityShooter, mask_cells
+from .field import Table
+from .geometry import Placement, get_geometry
+from .metrics import METRICS
+from .strategy import register
+from .transposition import CACHE, TranspositionCache
+
+# Part of time budget spent on exact counting before sampling is started
+EXACT_SHARE = 0.5
+# Count of Metropolis moves per ship between recorded samples
+MOVES_PER_SAMPLE = 2
+# Count of samples which prior probabilities from opening book are worth when they are mixed with sampled layouts
+PRIOR_SAMPLES = 8
+
+# Pools of processes sampling layouts by count of processes, shared by all solvers of this process
+POOLS: Dict[int, Pool] = {}
+
+
+class Timeout(Exception):
+    """
+    Search doesn't fit into its time budget
+    """
+
+
+class Layouts(object):
+    """
+    Layouts of not destroyed ships consistent with radar: ships don't cover cells known to be free,
+    don't touch each other and cover all hit cells of not destroyed ships
+    """
+    field_length: int
+    field_width: int
+    sizes: Tuple[int, ...]  # sizes of not destroyed ships in decreasing order
+    forbidden: int  # bitmask of cells which can't contain not destroyed ship
+    hits: int  # bitmask of hit cells of not destroyed ships
+    candidates: Dict[int, List[Placement]]  # allowed placements of every size
+    covering: Dict[int, Dict[int, List[Placement]]]  # allowed placements of every size covering every hit cell
+
+    def __init__(self, field_length: int, field_width: int, sizes: Tuple[int, ...], forbidden: int, hits: int):
+        self.field_length = field_length
+        self.field_width = field_width
+        self.sizes = tuple(sorted(sizes, reverse=True))
+        self.forbidden = forbidden
+        self.hits = hits
+        geometry = get_geometry(field_length, field_width)
+        hit_cells = mask_cells(hits, field_length * field_width).tolist()
+        self.candidates = {}
+        self.covering = {}
+        for size in set(self.sizes):
+            # Placement consisting only of hit cells would be a destroyed ship
+            self.candidates[size] = [placement for placement in geometry.placements(size)
+                                     if not placement.mask & forbidden and placement.mask & ~hits]
+            self.covering[size] = {i: [placement for placement in geometry.covering(size)[i]
+                                       if not placement.mask & forbidden and placement.mask & ~hits]
+                                   for i in hit_cells}
+
+    def branches(self, sizes: Tuple[int, ...], blocked: int,
+                 uncovered: int) -> List[Tuple[int, Placement, Tuple[int, ...]]]:
+        """
+        Possible placements of the next ship. While some hit cells are not covered, the cell with the fewest
+        placements covering it is chosen and every remaining ship may cover it, otherwise the largest ship is placed.
+        :param sizes: sizes of not placed ships in decreasing order
+        :param blocked: bitmask of cells occupied by placed ships or adjacent to them
+        :param uncovered: bitmask of hit cells not covered by placed ships
+        :return: count of ships which can take the placement, placement and sizes of ships left after it
+        """
+        if not uncovered:
+            rest = sizes[1:]
+            return [(1, placement, rest) for placement in self.candidates[sizes[0]] if not placement.mask & blocked]
+        best = None
+        while uncovered:
+            low = uncovered & -uncovered
+            uncovered ^= low
+            i = low.bit_length() - 1
+            options = []
+            for size in sorted(set(sizes), reverse=True):
+                k = sizes.index(size)
+                rest = sizes[:k] + sizes[k + 1:]
+                count = sizes.count(size)
+                options.extend((count, placement, rest) for placement in self.covering[size][i]
+                               if not placement.mask & blocked)
+            if best is None or len(options) < len(best):
+                best = options
+                if not best:
+                    # Hit cell can't be covered
+                    break
+        return best
+
+    def count(self, deadline: float) -> Tuple[float, Optional[np.ndarray]]:
+        """
+        Count all layouts, results for the same remaining ships and blocked cells are memoized
+        Ships are distinguished, so every layout is counted once for every order of ships with the same size
+        :param deadline: value of time.perf_counter() after which search is abandoned with Timeout
+        :return: count of layouts and count of layouts where some ship occupies every cell
+        """
+        cell_count = self.field_length * self.field_width
+        memo = {}
+        nodes = 0
+
+        def solve(sizes: Tuple[int, ...], blocked: int, uncovered: int) -> Tuple[float, Optional[np.ndarray]]:
+            nonlocal nodes
+            key = (sizes, blocked, uncovered)
+            result = memo.get(key)
+            if result is not None:
+                return result
+            nodes += 1
+            if nodes % 1024 == 0 and time.perf_counter() > deadline:
+                raise Timeout()
+            total, weights = (0.0 if uncovered else 1.0), None
+            if sizes:
+                total = 0.0
+                for multiplier, placement, rest in self.branches(sizes, blocked, uncovered):
+                    count, child_weights = solve(rest, blocked | placement.halo, uncovered & ~placement.mask)
+                    if not count:
+                        continue
+                    if weights is None:
+                        weights = np.zeros(cell_count)
+                    if child_weights is not None:
+                        weights += multiplier * child_weights
+                    weights[list(placement.cells)] += multiplier * count
+                    total += multiplier * count
+            memo[key] = result = (total, weights)
+            return result
+
+        return solve(self.sizes, self.forbidden, self.hits)
+
+    def random_layout(self, rng: random.Random, deadline: float) -> Optional[List[Placement]]:
+        """
+        Find random layout by backtracking
+        :param rng: source of randomness
+        :param deadline: value of time.perf_counter() after which search is abandoned with Timeout
+        :return: placements of ships or None if there is no layout
+        """
+
+        def search(sizes: Tuple[int, ...], blocked: int, uncovered: int) -> Optional[List[Placement]]:
+            if time.perf_counter() > deadline:
+                raise Timeout()
+            if not sizes:
+                return None if uncovered else []
+            branches = self.branches(sizes, blocked, uncovered)
+            rng.shuffle(branches)
+            for _, placement, rest in branches:
+                result = search(rest, blocked | placement.halo, uncovered & ~placement.mask)
+                if result is not None:
+                    result.append(placement)
+                    return result
+            return None
+
+        return search(self.sizes, self.forbidden, self.hits)
+
+    def sample(self, rng: random.Random, deadline: float, limit: Optional[int] = None) -> Tuple[int, np.ndarray]:
+        """
+        Sample layouts by moving single ships to random placements starting from random layout
+        Move is accepted when layout stays consistent, so every consistent layout is equally likely in the long run
+        :param rng: source of randomness
+        :param deadline: value of time.perf_counter() when sampling is stopped
+        :param limit: maximal count of samples, unlimited by default
+        :return: count of samples and count of samples where some ship occupies every cell
+        """
+        weights = np.zeros(self.field_length * self.field_width)
+        try:
+            layout = self.random_layout(rng, deadline)
+        except Timeout:
+            layout = None
+        if not layout:
+            return 0, weights
+        samples = 0
+        moves = MOVES_PER_SAMPLE * len(layout)
+        while time.perf_counter() < deadline and (limit is None or samples < limit):
+            for _ in range(moves):
+                j = rng.randrange(len(layout))
+                current = layout[j]
+                blocked = covered = 0
+                for k, placement in enumerate(layout):
+                    if k != j:
+                        blocked |= placement.halo
+                        covered |= placement.mask
+                need = self.hits & ~covered
+                if need:
+                    # Only this ship can cover the remaining hit cells
+                    options = self.covering[current.size][(need & -need).bit_length() - 1]
+                else:
+                    options = self.candidates[current.size]
+                proposal = options[rng.randrange(len(options))]
+                if not proposal.mask & blocked and proposal.mask & need == need:
+                    layout[j] = proposal
+            weights[[i for placement in layout for i in placement.cells]] += 1
+            samples += 1
+        return samples, weights
+
+
+def sample_layouts(args: Tuple[int, int, Tuple[int, ...], int, int, int, float]) -> Tuple[int, np.ndarray]:
+    """
+    Sample layouts in worker process
+    :param args: field length, field width, ship sizes, forbidden cells, hit cells, seed and time budget in seconds
+    :return: count of samples and count of samples where some ship occupies every cell
+    """
+    field_length, field_width, sizes, forbidden, hits, seed, budget = args
+    deadline = time.perf_counter() + budget
+    return Layouts(field_length, field_width, sizes, forbidden, hits).sample(random.Random(seed), deadline)
+
+
+def get_pool(workers: int) -> Pool:
+    """
+    :return: shared pool with given count of processes, pools are closed by close_pools at exit
+    """
+    pool = POOLS.get(workers)
+    if pool is None:
+        if not POOLS:
+            atexit.register(close_pools)
+        pool = POOLS[workers] = Pool(workers)
+    return pool
+
+
+def close_pools():
+    """
+    Stop processes of all shared pools
+    """
+    while POOLS:
+        _, pool = POOLS.popitem()
+        pool.terminate()
+        pool.join()
+
+
+def posterior(layouts: Layouts, budget: float, rng: random.Random = random, workers: int = 1,
+              prior: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+    """
+    Probability of every cell to be occupied by not destroyed ship
+    :param layouts: consistent layouts
+    :param budget: time for computation in seconds
+    :param rng: source of randomness
+    :param workers: count of processes sampling layouts
+    :param prior: probabilities before the first shot which are mixed with sampled layouts as PRIOR_SAMPLES samples
+                  while no ship is hit, so estimate from few samples is smoothed
+    :return: probabilities or None if no layout is found in time
+    """
+    start = time.perf_counter()
+    try:
+        count, weights = layouts.count(start + budget * EXACT_SHARE)
+        # Without ships left weights are unknown, it happens only in impossible positions
+        return weights / count if count and weights is not None else None
+    except Timeout:
+        pass
+    remaining = start + budget - time.perf_counter()
+    if workers > 1:
+        tasks = [(layouts.field_length, layouts.field_width, layouts.sizes, layouts.forbidden, layouts.hits,
+                  rng.getrandbits(64), remaining) for _ in range(workers)]
+        results = get_pool(workers).map(sample_layouts, tasks)
+    else:
+        results = [layouts.sample(rng, start + budget)]
+    samples = sum(count for count, _ in results)
+    weights = sum(weights for _, weights in results)
+    if prior is not None and samples and not layouts.hits:
+        # Prior knows nothing about the radar, so it is used only while no ship is hit: cells known to be free
+        # are empty and other cells keep their proportions holding all cells of the remaining ships
+        prior = prior.astype(np.float64)
+        prior[mask_cells(layouts.forbidden, len(prior))] = 0.0
+        if prior.sum() > 0:
+            prior *= sum(layouts.sizes) / prior.sum()
+            return (weights + PRIOR_SAMPLES * prior) / (samples + PRIOR_SAMPLES)
+    if not samples:
+        return None
+    return weights / samples
+
+
+@register('solver')
+class SolverShooter(DensityShooter):
+    """
+    Computer player which shoots into the cell most likely occupied by a ship among all layouts of the remaining
+    fleet consistent with radar. Layouts are counted exactly when it fits into time budget, otherwise they are
+    sampled. While no ship is hit, sampled probabilities are smoothed by probabilities before the first shot from
+    opening book. Density of placements is used when no layout is found in time.
+    Chosen moves are remembered in transposition cache, so repeated positions are not solved again.
+    """
+    budget: float  # time for one shot in seconds
+    workers: int  # count of processes sampling layouts
+    cache: Optional[TranspositionCache]  # moves in already solved positions
+
+    def __init__(self, field_length: int, field_width: int, rng: random.Random = random, budget: float = 0.05,
+                 workers: int = 1, cache: Optional[TranspositionCache] = CACHE):
+        super().__init__(field_length, field_width, rng)
+        self.budget = budget
+        self.workers = workers
+        self.cache = cache
+
+    @property
+    def fleet(self) -> Tuple[int, ...]:
+        """
+        :return: sizes of not destroyed ships in decreasing order
+        """
+        return tuple(sorted((size for size, count in self.counts.items() for _ in range(count)), reverse=True))
+
+    def layouts(self) -> Layouts:
+        """
+        :return: layouts of not destroyed ships consistent with processed radar cells
+        """
+        forbidden = int.from_bytes(np.packbits(self.blocked, bitorder='little').tobytes(), 'little')
+        hits = 0
+        for i in self.hits:
+            hits |= 1 << i
+        return Layouts(self.field_length, self.field_width, self.fleet, forbidden, hits)
+
+    def next_shot(self, radar: Table) -> Tuple[int, int]:
+        """
+        :param radar: radar of the shooting player
+        :return: coordinates of the next shot
+        """
+        return self.solve(radar, self.budget)
+
+    def solve(self, radar: Table, budget: float) -> Tuple[int, int]:
+        """
+        :param radar: radar of the shooting player
+        :param budget: time for computing the shot in seconds, density of placements is used when it is over
+        :return: coordinates of the next shot
+        """
+        self.sync(radar)
+        shot = self.opening_shot(radar)
+        if shot is not None:
+            return shot
+        key = (self.field_length, self.field_width, self.fleet, radar.zobrist)
+        entry = self.cache.get(key) if self.cache is not None else None
+        if entry is not None and radar.is_empty(*entry[0]):
+            if METRICS.enabled:
+                METRICS.increment('transposition_hits_total')
+            return entry[0]
+        if not radar.discovered and self.prior is not None:
+            # Position before the first shot is solved in opening book
+            probabilities = self.prior
+        else:
+            probabilities = posterior(self.layouts(), budget, self.rng, self.workers, self.prior)
+        if probabilities is None:
+            return super().next_shot(radar)
+        undiscovered = np.ones(len(self.density), dtype=bool)
+        undiscovered[mask_cells(radar.discovered, len(self.density))] = False
+        score = np.where(undiscovered & ~self.blocked, probabilities, -1.0)
+        if score.max() <= 0:
+            return super().next_shot(radar)
+        best = np.flatnonzero(score >= score.max() * (1 - 1e-9))
+        move = divmod(int(best[self.rng.randrange(len(best))]), self.field_width)
+        if self.cache is not None:
+            self.cache.put(key, move, probabilities)
+        return move
@@ -0,0 +1,56 @@
+from typing import Callable, Dict, Protocol, Tuple
+import random
+
+from .field import Table
+from .player import ShotResult
+
+
+class Strategy(Protocol):
+    """
+    Computer player: chooses shots by its radar and learns their results
+    Strategy is created for every game by its class called with field length, field width and source of randomness.
+    Strategies which also have method fork() returning independent copy can think in background, see Ponderer.
+    Strategies which think for a time budget have attribute budget in seconds, server computes their shots in thread.
+    """
+
+    def next_shot(self, radar: Table) -> Tuple[int, int]:
+        """
+        :param radar: radar of the shooting player
+        :return: coordinates of the next shot, the point must be on field and not discovered
+        """
+
+    def update(self, x: int, y: int, result: ShotResult, radar: Table):
+        """
+        Process result of the shot made by this strategy
+        :param x: x-coordinate of the shot
+        :param y: y-coordinate of the shot
+        :param result: result of the shot
+        :param radar: radar of the shooting player after the shot
+        """
+
+    def sync(self, radar: Table):
+        """
+        Restore state from radar of a game in progress, called when strategy is created for such game
+        :param radar: radar of the shooting player
+        """
+
+
+# Creates strategy for field with given length and width using given source of randomness
+StrategyFactory = Callable[[int, int, random.Random], Strategy]
+
+# Computer players available by name
+SHOOTERS: Dict[str, StrategyFactory] = {}
+
+
+def register(name: str) -> Callable[[StrategyFactory], StrategyFactory]:
+    """
+    Decorator which makes strategy available by given name in SHOOTERS, so it can be chosen in simulations,
+    tournaments, engine and server
+    """
+
+    def decorator(factory: StrategyFactory) -> StrategyFactory:
+        assert name not in SHOOTERS, f'Strategy is already registered: {name}'
+        SHOOTERS[name] = factory
+        return factory
+
+    return decorator
@@ -0,0 +1,203 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from itertools import combinations
+from multiprocessing import Pool
+import math
+import os
+import random
+import statistics
+import time
+
+from .field import Field
+from .player import new_player
+from .ship import Ship
+from .shooter import SHOOTERS
+from .simulation import chunk_rng
+
+# Count of fleets in one worker task
+CHUNK_SIZE = 16
+# Count of fleets every pairing plays before it may be decided, so variance of shots is estimated well enough
+MIN_GAMES = 32
+
+
+def shots_to_win(name: str, field_length: int, field_width: int, fleet: List[Ship], rng: random.Random) -> int:
+    """
+    Let strategy shoot at given fleet until all ships are destroyed
+    :param name: strategy name from SHOOTERS
+    :param fleet: ships of the enemy, they are not changed
+    :param rng: source of randomness of the strategy
+    :return: count of shots
+    """
+    strategy = SHOOTERS[name](field_length, field_width, rng)
+    enemy = new_player(Field(field_length, field_width), [Ship(ship.placement) for ship in fleet])
+    me = new_player(Field(field_length, field_width), [])
+    radar = me.field.radar
+    while not enemy.is_defeated:
+        x, y = strategy.next_shot(radar)
+        assert me.check_point(x, y), f'Strategy {name} made incorrect shot: {(x, y)}'
+        result, ship = enemy.receive_shot(x, y)
+        me.mark_shot(x, y, result, ship)
+        strategy.update(x, y, result, radar)
+    return me.shots
+
+
+def play_chunk(args: Tuple[int, int, int, int, Tuple[str, ...]]) -> List[Tuple[int, ...]]:
+    """
+    Play chunk of fleets with every given strategy
+    Fleet and randomness of every strategy depend only on seed, fleet number and strategy name,
+    so every strategy meets the same fleets whatever other strategies are played
+    :param args: seed, chunk number, field length, field width and strategy names
+    :return: shots of every strategy for every fleet of the chunk
+    """
+    seed, chunk, field_length, field_width, names = args
+    results = []
+    for k in range(chunk * CHUNK_SIZE, (chunk + 1) * CHUNK_SIZE):
+        fleet = Ship.generate_ships(Field(field_length, field_width), chunk_rng(seed, k))
+        results.append(tuple(shots_to_win(name, field_length, field_width, fleet, random.Random(f'{seed} {k} {name}'))
+                             for name in names))
+    return results
+
+
+class Pairing(object):
+    """
+    Sequential probability ratio test of two strategies by differences of their shots on the same fleets
+    Hypotheses are that the first strategy needs delta shots less or delta shots more than the second one on average,
+    the log-likelihood ratio of them is computed for normal differences with variance estimated from the games.
+    """
+    first: str  # name of the first strategy
+    second: str  # name of the second strategy
+    differences: List[int]  # shots of the first strategy minus shots of the second one on every fleet
+    decision: Optional[str]  # name of the better strategy, 'draw' when games are over without decision or None
+
+    def __init__(self, first: str, second: str):
+        self.first = first
+        self.second = second
+        self.differences = []
+        self.decision = None
+
+    @property
+    def mean(self) -> float:
+        return statistics.fmean(self.differences) if self.differences else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return statistics.stdev(self.differences) if len(self.differences) > 1 else 0.0
+
+    def llr(self, delta: float) -> float:
+        """
+        :return: log-likelihood ratio of hypothesis that the second strategy is better to the opposite one
+        """
+        variance = max(self.stdev ** 2, 1.0)
+        return 2 * delta * sum(self.differences) / variance
+
+    def add(self, difference: int, delta: float, alpha: float, beta: float, max_games: int):
+        """
+        Account game on the next fleet and decide when test crosses its bounds or games are over
+        :param difference: shots of the first strategy minus shots of the second one
+        :param delta: difference of mean shots which must be detected
+        :param alpha: probability to decide that the second strategy is better when the first one is
+        :param beta: probability to decide that the first strategy is better when the second one is
+        :param max_games: count of games after which test is stopped without decision
+        """
+        if self.decision is not None:
+            return
+        self.differences.append(difference)
+        if len(self.differences) < MIN_GAMES:
+            return
+        llr = self.llr(delta)
+        if llr >= math.log((1 - beta) / alpha):
+            self.decision = self.second
+        elif llr <= math.log(beta / (1 - alpha)):
+            self.decision = self.first
+        elif len(self.differences) >= max_games:
+            self.decision = 'draw'
+
+
+class TournamentReport(object):
+    """
+    Describes results of tournament
+    """
+    names: List[str]  # strategy names
+    pairings: List[Pairing]  # tests of every two strategies
+    shots: Dict[str, List[int]]  # shots of every strategy on every fleet it played
+    seconds: float  # elapsed wall time
+
+    def __init__(self, names: List[str], pairings: List[Pairing], shots: Dict[str, List[int]], seconds: float):
+        self.names = names
+        self.pairings = pairings
+        self.shots = shots
+        self.seconds = seconds
+
+    @property
+    def fleets(self) -> int:
+        """
+        :return: count of fleets played by at least one strategy
+        """
+        return max(len(shots) for shots in self.shots.values())
+
+    def display(self) -> str:
+        """
+        :return: representation of report
+        """
+        width = max(len(name) for name in self.names)
+        rows = [f'fleets:  {self.fleets}',
+                f'time:    {self.seconds:.3f} s']
+        for name in self.names:
+            shots = self.shots[name]
+            rows.append(f'{name.ljust(width)}  mean shots {statistics.fmean(shots):.2f} in {len(shots)} games')
+        for pairing in self.pairings:
+            verdict = 'draw' if pairing.decision == 'draw' else f'{pairing.decision} is better'
+            rows.append(f'{pairing.first} vs {pairing.second}: {verdict} after {len(pairing.differences)} games, '
+                        f'difference {pairing.mean:+.2f} ± {pairing.stdev:.2f} shots')
+        return '\n'.join(rows)
+
+
+def tournament(names: Sequence[str], field_length: int, field_width: int, seed: int = 0,
+               workers: Optional[int] = None, delta: float = 1.0, alpha: float = 0.05, beta: float = 0.05,
+               max_games: int = 2000) -> TournamentReport:
+    """
+    Compare every two strategies on the same fleets, every pairing is stopped as soon as its test is decided
+    Results depend only on seed and not on count of workers
+    :param names: strategy names from SHOOTERS
+    :param field_length: length of game field
+    :param field_width: width of game field
+    :param seed: seed of random generators
+    :param workers: count of worker processes, all cores by default and in-process if 1
+    :param delta: difference of mean shots to win which must be detected
+    :param alpha: probability to decide that the second strategy of pairing is better when the first one is
+    :param beta: probability to decide that the first strategy of pairing is better when the second one is
+    :param max_games: count of games after which pairing is a draw
+    :return: report about tournament
+    """
+    names = list(dict.fromkeys(names))
+    pairings = [Pairing(first, second) for first, second in combinations(names, 2)]
+    shots: Dict[str, List[int]] = {name: [] for name in names}
+    start_time = time.perf_counter()
+    pool = Pool(workers) if workers != 1 else None
+    # Chunks played at once, more chunks than needed may be played when pairings are decided
+    batch = 1 if pool is None else workers or os.cpu_count() or 1
+    chunk = 0
+    try:
+        while any(pairing.decision is None for pairing in pairings):
+            # Only strategies of undecided pairings play next fleets
+            playing = tuple(name for name in names
+                            if any(pairing.decision is None and name in (pairing.first, pairing.second)
+                                   for pairing in pairings))
+            tasks = [(seed, chunk + k, field_length, field_width, playing) for k in range(batch)]
+            chunk += batch
+            results = map(play_chunk, tasks) if pool is None else pool.imap(play_chunk, tasks)
+            for chunk_results in results:
+                # Chunks are accounted in order, so decisions don't depend on count of chunks played at once
+                for fleet_shots in chunk_results:
+                    by_name = dict(zip(playing, fleet_shots))
+                    for pairing in pairings:
+                        if pairing.decision is None:
+                            pairing.add(by_name[pairing.first] - by_name[pairing.second], delta, alpha, beta,
+                                        max_games)
+                    for name in playing:
+                        if len(shots[name]) < max(len(pairing.differences) for pairing in pairings
+                                                  if name in (pairing.first, pairing.second)):
+                            shots[name].append(by_name[name])
+    finally:
+        if pool is not None:
+            pool.terminate()
+    return TournamentReport(names, pairings, shots, time.perf_counter() - start_time)
@@ -0,0 +1,119 @@
+from typing import Optional, Tuple
+from collections import OrderedDict
+from pathlib import Path
+import os
+import struct
+
+import numpy as np
+
+# Cache file layout (little-endian):
+#   header: magic, format version, count of entries
+#   for every entry: field length, field width, radar hash, count of ships, move,
+#                    followed by ship sizes and float32 probability of every cell
+MAGIC = b'BSHT'
+VERSION = 1
+HEADER = struct.Struct('<4sBI')  # magic, version, count of entries
+ENTRY = struct.Struct('<HHQBHH')  # length, width, radar hash, count of ships, x and y of move
+
+# Key of position: field length, field width, sizes of not destroyed ships and Zobrist hash of radar
+Key = Tuple[int, int, Tuple[int, ...], int]
+
+
+class TranspositionCache(object):
+    """
+    Moves of computer player and probability maps they were chosen by for already seen positions
+    When cache is full, the least recently used position is forgotten
+    """
+    capacity: int  # maximal count of positions
+    entries: 'OrderedDict[Key, Tuple[Tuple[int, int], np.ndarray]]'  # move and probabilities by position
+    hits: int  # count of found positions
+    misses: int  # count of not found positions
+
+    def __init__(self, capacity: int = 10000):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: Key) -> Optional[Tuple[Tuple[int, int], np.ndarray]]:
+        """
+        :param key: position
+        :return: move and probabilities or None if position is not in cache
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Key, move: Tuple[int, int], probabilities: np.ndarray):
+        """
+        :param key: position
+        :param move: chosen move
+        :param probabilities: probability of every cell to be occupied by ship
+        """
+        self.entries[key] = (move, probabilities.astype(np.float32))
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def save(self, path: Path):
+        """
+        Write all positions into a file, previous content of the file is replaced atomically
+        """
+        parts = [HEADER.pack(MAGIC, VERSION, len(self.entries))]
+        for (field_length, field_width, sizes, radar_hash), ((x, y), probabilities) in self.entries.items():
+            parts.append(ENTRY.pack(field_length, field_width, radar_hash, len(sizes), x, y))
+            parts.append(bytes(sizes))
+            parts.append(probabilities.astype('<f4').tobytes())
+        temp_path = path.with_name(path.name + '.tmp')
+        with open(temp_path, 'wb') as file:
+            file.write(b''.join(parts))
+        os.replace(temp_path, path)
+
+    def load(self, path: Path):
+        """
+        Add positions from a file written by save
+        """
+        self.loads(path.read_bytes())
+
+    def loads(self, data: bytes):
+        """
+        Add positions from contents of a file written by save
+        :raise ValueError: if data is not a transposition cache
+        """
+        if len(data) < HEADER.size:
+            raise ValueError('Cache is truncated')
+        magic, version, count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError('Not a transposition cache')
+        if version != VERSION:
+            raise ValueError(f'Unsupported cache version: {version}')
+        offset = HEADER.size
+        for _ in range(count):
+            if offset + ENTRY.size > len(data):
+                raise ValueError('Cache is truncated')
+            field_length, field_width, radar_hash, ships, x, y = ENTRY.unpack_from(data, offset)
+            offset += ENTRY.size
+            cell_count = field_length * field_width
+            if offset + ships + 4 * cell_count > len(data):
+                raise ValueError('Cache is truncated')
+            sizes = tuple(data[offset:offset + ships])
+            offset += ships
+            probabilities = np.frombuffer(data, dtype='<f4', count=cell_count, offset=offset).astype(np.float32)
+            offset += 4 * cell_count
+            self.put((field_length, field_width, sizes, radar_hash), (x, y), probabilities)
+
+
+# Positions seen by all computer players of this process
+CACHE = TranspositionCache()
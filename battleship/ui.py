@@ -0,0 +1,195 @@
+import curses
+import time
+from typing import Optional
+from pathlib import Path
+
+from .battleship import Battleship
+from .field import parse_point
+from .shooter import HuntShooter
+from .density import DensityShooter
+from .ponder import Ponderer
+from .render import INPUT_MESSAGE, SCROLLS, Renderer, ViewportRenderer
+from .metrics import METRICS
+from .savestore import SaveStore
+from . import journal
+
+SAVINGS_DIRECTORY = Path('.') / 'savings'
+
+# Count of the most recent saves offered for loading
+LISTED_SAVES = 9
+
+
+def save_game(store: SaveStore, game: Battleship):
+    """
+    Try to save given game into its slot of save store
+    :param store: save store
+    :param game: current game object
+    """
+    try:
+        store.save(game)
+    except IOError:
+        # Ignore error
+        pass
+
+
+def open_journal(store: SaveStore, game: Battleship):
+    """
+    Try to add given game to save store and start recording its shots into a journal next to its save,
+    so game can be restored after crash
+    :param store: save store
+    :param game: current game object
+    """
+    try:
+        # Entry is refreshed from journal if the game is interrupted before it is saved
+        store.register(game, clean=False)
+        game.journal = journal.Journal(store.journal_path(game.game_id), store.save_path(game.game_id), game)
+    except IOError:
+        # Play without journal
+        game.journal = None
+
+
+def play(screen: curses.window, game: Battleship, store: SaveStore):
+    """
+    Simulates a game of Battleship.
+    When ':q' is entered try to save current session and then exit.
+    On large field ':h', ':j', ':k' and ':l' move viewport left, down, up and right,
+    ':' followed by point like ':ab120' moves viewport to the point.
+    :param screen: window object
+    :param game: current game object
+    :param store: save store
+    """
+    # Enable echoing character input to the screen as it is entered.
+    curses.echo()
+
+    large = game.host_player.field.is_large
+
+    # Create computer player which thinks while user chooses a shot
+    if large:
+        shooter = Ponderer(HuntShooter(game.field_length, game.field_width))
+    else:
+        shooter = Ponderer(DensityShooter(game.field_length, game.field_width))
+    # Loaded game may be in progress, so computer player continues from its radar
+    shooter.sync(game.players[1 - game.host].field.radar)
+
+    open_journal(store, game)
+
+    renderer = ViewportRenderer(screen) if large else Renderer(screen)
+
+    while True:
+        start = time.perf_counter()
+        drawn = renderer.draw(game)
+        if METRICS.enabled:
+            METRICS.observe('render_seconds', time.perf_counter() - start)
+        if not drawn:
+            # Wait for resize
+            screen.getch()
+            continue
+
+        if game.turn == game.host:
+            shooter.ponder(game.players[1 - game.host].field.radar)
+            # Get user input
+            input_y, input_x = renderer.input_position(game)
+            s = screen.getstr(input_y, input_x + len(INPUT_MESSAGE), renderer.input_length).decode(encoding='utf-8')
+            renderer.clear_input(game)
+            if s == ':q':
+                save_game(store, game)
+                if game.journal is not None:
+                    game.journal.close()
+                    game.journal = None
+                break
+            if large and s in SCROLLS:
+                renderer.scroll(*SCROLLS[s])
+                continue
+            if large and s.startswith(':'):
+                renderer.center(*parse_point(s[1:]))
+                continue
+            if len(s) < 2:
+                # Point has at least column letter and row digit like 'a1', the longest is like 'abc1000'
+                continue
+            game.make_shot(*parse_point(s))
+        else:
+            # Make computer shot
+            radar = game.current_player.field.radar
+            x, y = shooter.next_shot(radar)
+            result = game.make_shot(x, y)
+            shooter.update(x, y, result, radar)
+
+
+def load_game(store: SaveStore, game_id: int) -> Optional[Battleship]:
+    """
+    Try to load saved game
+    :param store: save store
+    :param game_id: identifier of the game
+    :return: game object on success or None on failure
+    """
+    try:
+        return store.load(game_id)
+    except (IOError, ValueError):
+        # Ignore error
+        return None
+
+
+def choose_saving(screen, store: SaveStore) -> Optional[int]:
+    """
+    Show the most recent saves and let user choose one of them
+    :param screen: window object
+    :param store: save store
+    :return: identifier of chosen game or None if user returned to menu
+    """
+    entries = store.list()[:LISTED_SAVES]
+    if not entries:
+        return None
+    screen.clear()
+    rows = [f'{k + 1}. {entry.display()}' for k, entry in enumerate(entries)]
+    screen.addstr(0, 0, 'Saved games:\n\n' + '\n'.join(rows)
+                  + '\n\nPress number of game to load or any other key to return.')
+    c = screen.getch()
+    if ord('1') <= c < ord('1') + len(entries):
+        return entries[c - ord('1')].game_id
+    return None
+
+
+def start_game(screen, field_length: int, field_width: int):
+    # Clear screen
+    screen.clear()
+
+    store = SaveStore(SAVINGS_DIRECTORY)
+
+    message_str = '\n'
+
+    while True:
+        greeting = '#######################################\n' \
+                   + '#        WELCOME TO BATTLESHIP        #\n' \
+                   + '#######################################\n\n'
+
+        instructions_str = '\nPress p to play a new game.\nPress l to load previous game.\nPress q to quit.'
+
+        # Display instructions and message on screen
+        screen.clear()
+        screen.addstr(0, 0, greeting + message_str + instructions_str)
+
+        # Get user input
+        c = screen.getch()
+        if c == ord('q'):
+            # Quit the game
+            return
+        elif c == ord('l'):
+            # Load saving
+            game_id = choose_saving(screen, store)
+            if game_id is None:
+                message_str = '\n' if store.entries else 'No saved games.\n'
+                continue
+            game = load_game(store, game_id)
+            if game is not None:
+                # Run loaded game
+                play(screen, game, store)
+                message_str = "\n"
+            else:
+                # Failed to load game
+                message_str = 'Failed to load saving.\n'
+        elif c == ord('p'):
+            # Play a new game
+            game = Battleship(field_length, field_width)
+            play(screen, game, store)
+            # Clear message string
+            message_str = "\n"
@@ -0,0 +1,72 @@
+"""
+Compare fleet generation with the former greedy placement on every supported field size
+Usage: python benchmarks/placement.py [repeats]
+"""
+from typing import Set, Tuple
+from pathlib import Path
+import random
+import sys
+import timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from battleship.field import MIN_LENGTH, MAX_LENGTH, Field  # noqa: E402
+from battleship.ship import Ship  # noqa: E402
+
+
+def occupied_cells(size: int, x: int, y: int, rotation: int) -> Set[Tuple[int, int]]:
+    dx, dy = ((1, 0), (0, 1), (-1, 0), (0, -1))[rotation]
+    return set((x + dx * k, y + dy * k) for k in range(size))
+
+
+def occupied_and_nearby_cells(size: int, x: int, y: int, rotation: int) -> Set[Tuple[int, int]]:
+    return set((px + dx, py + dy)
+               for (px, py) in occupied_cells(size, x, y, rotation)
+               for dx in range(-1, 2)
+               for dy in range(-1, 2))
+
+
+def generate_ships_greedy(field: Field):
+    """
+    Former implementation: greedy placement with sets of cells rebuilt for every placed ship
+    :return: list of ships as (size, x, y, rotation) or None if placement got stuck
+    """
+    positions = [(x, y, rotation) for x in range(field.length) for y in range(field.width) for rotation in range(4)]
+    random.shuffle(positions)
+    ships = []
+    i = 0
+    for size in reversed(Ship.get_sizes(field)):
+        while i < len(positions):
+            new_ship = (size, *positions[i])
+            i += 1
+            cells = occupied_cells(*new_ship)
+            if all(field.on_field(x, y) for x, y in cells) and \
+                    all(occupied_and_nearby_cells(*ship).isdisjoint(cells) for ship in ships):
+                ships.append(new_ship)
+                break
+        else:
+            return None
+    return ships
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f'{"field":>7} {"greedy, us":>11} {"failures":>9} {"backtracking, us":>17} {"speedup":>8}')
+    for n in range(MIN_LENGTH, MAX_LENGTH + 1):
+        field = Field(n, n)
+        # Warm up cached placements
+        Ship.generate_ships(field)
+        failures = 0
+
+        def greedy():
+            nonlocal failures
+            failures += generate_ships_greedy(field) is None
+
+        greedy_time = timeit.timeit(greedy, number=repeats) / repeats * 1e6
+        backtracking_time = timeit.timeit(lambda: Ship.generate_ships(field), number=repeats) / repeats * 1e6
+        print(f'{n:>3}x{n:<3} {greedy_time:>11.1f} {failures:>9} {backtracking_time:>17.1f} '
+              f'{greedy_time / backtracking_time:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
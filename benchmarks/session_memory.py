@@ -0,0 +1,72 @@
+"""
+Memory used by many hosted games in full and in compact representation
+Usage: python benchmarks/session_memory.py [--sizes 10,26] [--games 1000]
+"""
+from typing import Callable, Dict, List
+from pathlib import Path
+import argparse
+import gc
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from battleship.battleship import Battleship  # noqa: E402
+from battleship.session import CompactSession  # noqa: E402
+
+
+def half_played(size: int, rng: random.Random) -> Battleship:
+    """
+    :return: game where both players made shots into half of cells of enemy field
+    """
+    game = Battleship(size, size, rng=rng)
+    points = [[(x, y) for x in range(size) for y in range(size)] for _ in range(2)]
+    for player_points in points:
+        rng.shuffle(player_points)
+        del player_points[:len(player_points) // 2]
+    while game.winner is None and points[game.turn]:
+        game.make_shot(*points[game.turn].pop())
+    return game
+
+
+def bytes_per_game(create: Callable[[], object], games: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    kept = [create() for _ in range(games)]
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current / games
+
+
+def run(sizes: List[int], games: int) -> List[Dict[str, float]]:
+    results = []
+    for size in sizes:
+        # Shared placements are built before measuring
+        half_played(size, random.Random(0))
+        full = bytes_per_game(lambda: half_played(size, random.Random(size)), games)
+
+        def compact() -> CompactSession:
+            session = CompactSession(half_played(size, random.Random(size)))
+            session.compact()
+            return session
+
+        packed = bytes_per_game(compact, games)
+        results.append({'field': f'{size}x{size}', 'full_bytes': full, 'compact_bytes': packed})
+        print(f'{size:>2}x{size:<2} full {full:>8.0f} B/game, compact {packed:>6.0f} B/game, '
+              f'{full / packed:.1f}x smaller', flush=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='5,10,26', help='comma separated field sizes')
+    parser.add_argument('--games', type=int, default=1000, help='count of games kept in memory at once')
+    args = parser.parse_args()
+    run([int(size) for size in args.sizes.split(',')], args.games)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Startup time of the game in fresh interpreters: importing the package, answering the engine and showing help
+Usage: python benchmarks/startup.py [--repeat 10] [--limit 0.3]
+"""
+from typing import Dict, List
+from pathlib import Path
+import argparse
+import subprocess
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Commands run in fresh interpreter and their standard input
+COMMANDS: Dict[str, List] = {
+    'python': ([sys.executable, '-c', 'pass'], b''),
+    'import battleship': ([sys.executable, '-c', 'import battleship'], b''),
+    'import game': ([sys.executable, '-c', 'import battleship.battleship'], b''),
+    'engine': ([sys.executable, 'battleship', 'engine'], b'new 10 10 1\nshoot a1\nquit\n'),
+    'help': ([sys.executable, 'battleship', '--help'], b''),
+}
+
+# Modules which must not be loaded by the commands
+FORBIDDEN = {
+    'import battleship': ['curses', 'typer', 'numpy', 'asyncio', 'pickle'],
+    'import game': ['curses', 'typer', 'numpy', 'asyncio', 'pickle'],
+    'engine': ['curses', 'typer', 'numpy', 'asyncio'],
+    'help': ['curses', 'numpy', 'asyncio'],
+}
+
+
+def measure(command: List[str], stdin: bytes, repeat: int) -> float:
+    """
+    :return: the smallest wall time of the command in seconds
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, input=stdin, stdout=subprocess.DEVNULL, cwd=ROOT, check=True)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def loaded(name: str) -> List[str]:
+    """
+    :return: forbidden modules which are loaded by the command
+    """
+    command, stdin = COMMANDS[name]
+    if command[1] == '-c':
+        code = command[2]
+    else:
+        code = f'import sys, runpy; sys.argv = {command[1:]!r}; runpy.run_path("battleship", run_name="__main__")'
+    probe = f'import sys\ntry:\n    {code}\nexcept SystemExit:\n    pass\n' \
+            f'print(" ".join(m for m in {FORBIDDEN[name]!r} if m in sys.modules), file=sys.stderr)'
+    result = subprocess.run([sys.executable, '-c', probe], input=stdin, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, cwd=ROOT, check=True)
+    return result.stderr.decode().split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=10, help='count of measurements')
+    parser.add_argument('--limit', type=float, default=0.3, help='the longest allowed startup in seconds')
+    args = parser.parse_args()
+
+    failed = False
+    baseline = measure(*COMMANDS['python'], args.repeat)
+    for name, (command, stdin) in COMMANDS.items():
+        seconds = measure(command, stdin, args.repeat)
+        extra = loaded(name) if name in FORBIDDEN else []
+        print(f'{name:<18} {seconds * 1000:7.1f} ms  (+{(seconds - baseline) * 1000:6.1f} ms over python)'
+              + (f'  loads {", ".join(extra)}' if extra else ''), flush=True)
+        failed |= bool(extra) or seconds > args.limit
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""
+Benchmarks of the game engine hot paths on every supported field size without terminal
+Usage: python benchmarks/suite.py [--sizes 5,10,26] [--repeat 5] [--output results.json] [--compare baseline.json]
+"""
+from typing import Callable, Dict, List
+from pathlib import Path
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from battleship.battleship import Battleship  # noqa: E402
+from battleship.field import MIN_LENGTH, MAX_LENGTH, Field  # noqa: E402
+from battleship.ship import Ship  # noqa: E402
+from battleship import savefile  # noqa: E402
+
+
+def measure(function: Callable[[], object], repeat: int, min_time: float = 0.05) -> Dict[str, float]:
+    """
+    :param function: benchmarked function
+    :param repeat: count of measurements
+    :param min_time: minimal duration of one measurement in seconds
+    :return: mean and minimal time of one call in microseconds
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    times = [t / number * 1e6 for t in timer.repeat(repeat, number)]
+    return {'mean_us': sum(times) / len(times), 'min_us': min(times), 'calls': number * repeat}
+
+
+def play_random_game(game: Battleship, rng: random.Random) -> int:
+    """
+    Finish game with shots into random undiscovered points
+    :return: count of made shots
+    """
+    points = [[(x, y) for x in range(game.field_length) for y in range(game.field_width)] for _ in range(2)]
+    for player_points in points:
+        rng.shuffle(player_points)
+    shots = 0
+    while game.winner is None:
+        x, y = points[game.turn].pop()
+        if game.make_shot(x, y) is not None:
+            shots += 1
+    return shots
+
+
+def bench_make_shot(size: int, repeat: int) -> Dict[str, float]:
+    rng = random.Random(size)
+    games = [Battleship(size, size, rng=rng) for _ in range(repeat)]
+    start = time.perf_counter()
+    shots = sum(play_random_game(game, rng) for game in games)
+    elapsed = time.perf_counter() - start
+    return {'mean_us': elapsed / shots * 1e6, 'shots_per_sec': shots / elapsed, 'calls': shots}
+
+
+def bench_memory(size: int) -> Dict[str, float]:
+    # Shared placements are built before measuring
+    Battleship(size, size)
+    tracemalloc.start()
+    game = Battleship(size, size)
+    current, peak = tracemalloc.get_traced_memory()
+    play_random_game(game, random.Random(size))
+    _, peak_played = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'game_bytes': current, 'peak_bytes': peak, 'peak_played_bytes': peak_played}
+
+
+def run(sizes: List[int], repeat: int) -> List[dict]:
+    results = []
+
+    def add(name: str, size: int, values: Dict[str, float]):
+        results.append({'benchmark': name, 'field': f'{size}x{size}', **values})
+        print(f'{name:<22} {size:>2}x{size:<2} ' + ', '.join(f'{k} {v:.1f}' for k, v in values.items()), flush=True)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / 'save'
+        for size in sizes:
+            field = Field(size, size)
+            add('generate_ships', size, measure(lambda: Ship.generate_ships(field), repeat))
+            add('battleship_init', size, measure(lambda: Battleship(size, size), repeat))
+            add('make_shot', size, bench_make_shot(size, repeat))
+            game = Battleship(size, size)
+            play_random_game(game, random.Random(0))
+            add('table_rows', size, measure(lambda: game.host_player.field.map.rows, repeat))
+            add('field_display', size, measure(lambda: game.display_host_field(200), repeat))
+            add('save_game', size, measure(lambda: savefile.save(game, path), repeat))
+            add('load_game', size, measure(lambda: savefile.load(path), repeat))
+            add('memory', size, bench_memory(size))
+    return results
+
+
+def compare(results: List[dict], baseline: List[dict], threshold: float) -> List[str]:
+    """
+    :return: descriptions of benchmarks which became slower than in baseline by more than threshold
+    """
+    old = {(r['benchmark'], r['field']): r for r in baseline}
+    regressions = []
+    for result in results:
+        previous = old.get((result['benchmark'], result['field']))
+        if previous is None:
+            continue
+        for key in ('min_us', 'mean_us', 'peak_bytes'):
+            if key in result and key in previous:
+                if result[key] > previous[key] * (1 + threshold):
+                    regressions.append(f'{result["benchmark"]} {result["field"]} {key}: '
+                                       f'{previous[key]:.1f} -> {result[key]:.1f}')
+                break
+    return regressions
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).parent).stdout.strip()
+    except OSError:
+        return ''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default=f'{MIN_LENGTH}-{MAX_LENGTH}',
+                        help='comma separated field sizes or range like 5-26')
+    parser.add_argument('--repeat', type=int, default=5, help='count of measurements')
+    parser.add_argument('--output', type=Path, help='file where results are written in JSON')
+    parser.add_argument('--compare', type=Path, help='JSON results of previous run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.1, help='relative slowdown treated as regression')
+    args = parser.parse_args()
+
+    sizes = []
+    for part in args.sizes.split(','):
+        low, _, high = part.partition('-')
+        sizes.extend(range(int(low), int(high or low) + 1))
+
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.time(),
+        'results': run(sizes, args.repeat),
+    }
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.compare is not None:
+        regressions = compare(report['results'], json.loads(args.compare.read_text())['results'], args.threshold)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+import random
+
+from battleship.battleship import Battleship
+
+
+def new_game(seed: int = 0, field_length: int = 10, field_width: int = 10, salvo: int = 0) -> Battleship:
+    """
+    :return: game with fleets generated from given seed
+    """
+    return Battleship(field_length, field_width, rng=random.Random(seed), salvo=salvo)
+
+
+def play(game: Battleship, shots: int, rng: random.Random):
+    """
+    Make given count of valid random shots or less if game is over
+    """
+    for _ in range(shots):
+        if game.winner is not None:
+            return
+        player = game.current_player
+        points = [(x, y) for x in range(game.field_length) for y in range(game.field_width)
+                  if player.check_point(x, y)]
+        assert game.make_shot(*rng.choice(points)) is not None
+
+
+def shots_made(game: Battleship) -> int:
+    return game.players[0].shots + game.players[1].shots
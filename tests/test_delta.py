@@ -0,0 +1,65 @@
+import random
+
+import pytest
+
+from battleship.delta import encode_radar, snapshot
+from battleship.field import SparseTable, mask_indices
+
+from .games import new_game
+
+
+def play_watched(game, rng):
+    """
+    Play random shots to the end of game, checking that every delta holds exactly the cells changed by the shot
+    :return: deltas of all shots
+    """
+    deltas = []
+    game.subscribe(deltas.append)
+    while game.winner is None:
+        shooter = game.turn
+        radar = game.current_player.field.radar
+        before = radar.discovered
+        points = [(x, y) for x in range(game.field_length) for y in range(game.field_width)
+                  if radar.is_empty(x, y)]
+        x, y = rng.choice(points)
+        game.make_shot(x, y)
+        delta = deltas[-1]
+        changed = [divmod(i, game.field_width) for i in sorted(mask_indices(radar.discovered ^ before))]
+        assert [(cx, cy) for cx, cy, _ in delta.cells] == changed
+        assert all(radar.cell(cx, cy) == cell for cx, cy, cell in delta.cells)
+        assert (delta.shooter, delta.turn, delta.winner) == (shooter, game.turn, game.winner)
+    return deltas
+
+
+@pytest.mark.parametrize('salvo', [0, 3])
+@pytest.mark.parametrize('seed', range(3))
+def test_deltas_rebuild_radars_from_snapshot(seed, salvo):
+    game = new_game(seed, salvo=salvo)
+    words = snapshot(game).split()
+    radars = [list(words[6]), list(words[7])]
+    for k, delta in enumerate(play_watched(game, random.Random(seed))):
+        assert delta.seq == int(words[1]) + k + 1
+        for x, y, cell in delta.cells:
+            radars[delta.shooter][x * game.field_width + y] = cell.value
+    assert [''.join(radar) for radar in radars] == [encode_radar(player.field.radar) for player in game.players]
+
+
+def test_delta_of_large_field_does_not_build_masks(monkeypatch):
+    game = new_game(0, 40, 40)
+    assert game.players[0].field.is_large
+    deltas = []
+    game.subscribe(deltas.append)
+
+    def cells_of(self, symbol):
+        raise AssertionError('Bitmask of the whole table is built')
+
+    monkeypatch.setattr(SparseTable, 'cells_of', cells_of)
+    monkeypatch.setattr(SparseTable, 'discovered', property(cells_of))
+    # Player shoots again after hit, so ships of the enemy are destroyed one after another
+    for ship in game.players[1].ships[:5]:
+        for x, y in ship.placement.points:
+            game.make_shot(x, y)
+        halo = deltas[-1].cells
+        assert len(halo) > ship.placement.size
+        assert all(game.players[0].field.radar.cell(x, y) == cell for x, y, cell in halo)
+    assert len(deltas) == game.players[0].shots
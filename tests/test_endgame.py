@@ -0,0 +1,66 @@
+import random
+import time
+
+from battleship import endgame
+from battleship.endgame import EndgameShooter
+from battleship.field import Field
+from battleship.player import new_player
+from battleship.ship import Ship
+
+
+def endgame_position(seed: int = 0):
+    """
+    :return: shooter and its radar when at most two ships of the enemy are left, and the enemy
+    """
+    rng = random.Random(seed)
+    shooter = EndgameShooter(10, 10, rng, budget=0.01, cache=None)
+    enemy = new_player(Field(10, 10), Ship.generate_ships(Field(10, 10), rng))
+    me = new_player(Field(10, 10), [])
+    radar = me.field.radar
+    while len(shooter.fleet) > shooter.max_ships:
+        x, y = shooter.next_shot(radar)
+        result, ship = enemy.receive_shot(x, y)
+        me.mark_shot(x, y, result, ship)
+        shooter.update(x, y, result, radar)
+    return shooter, radar
+
+
+def test_policy_shot_is_valid():
+    shooter, radar = endgame_position()
+    x, y = shooter.next_shot(radar)
+    assert radar.is_empty(x, y)
+    assert shooter.memo
+
+
+def test_solver_gets_time_left_after_policy(monkeypatch):
+    shooter, radar = endgame_position(1)
+    budgets = []
+
+    def endgame_shot(deadline):
+        time.sleep(max(0.0, deadline - time.perf_counter()))
+        return None
+
+    def solve(radar, budget):
+        budgets.append(budget)
+        return 0, 0
+
+    monkeypatch.setattr(shooter, 'endgame_shot', endgame_shot)
+    monkeypatch.setattr(shooter, 'solve', solve)
+    shooter.next_shot(radar)
+    assert budgets[0] <= shooter.budget - min(shooter.endgame_budget, shooter.budget)
+
+
+def test_solver_move_when_policy_has_no_cell(monkeypatch):
+    shooter, radar = endgame_position(2)
+    monkeypatch.setattr(shooter, 'expected', lambda layouts, hits, deadline: (float('inf'), None))
+    x, y = shooter.next_shot(radar)
+    assert radar.is_empty(x, y)
+
+
+def test_memo_is_bounded(monkeypatch):
+    monkeypatch.setattr(endgame, 'MEMO_SIZE', 4)
+    shooter, radar = endgame_position(3)
+    # Bitmask of hits is never negative, so these positions can't be stored by search
+    shooter.memo.update({(frozenset(), -1 - i): (1.0, i) for i in range(10)})
+    shooter.next_shot(radar)
+    assert all(hits >= 0 for _, hits in shooter.memo)
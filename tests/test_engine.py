@@ -0,0 +1,26 @@
+import pytest
+
+from battleship.engine import Engine
+
+
+def execute(engine, line):
+    out = []
+    engine.execute(line, out)
+    return out
+
+
+@pytest.mark.parametrize('line', ['new ² 10', 'new 10 10 ³', 'new 10 10 1 none ١', 'new 10', 'new x 10'])
+def test_new_game_with_invalid_numbers_is_refused(line):
+    engine = Engine()
+    assert execute(engine, line) == ['error usage: new <length> <width> [seed] [opponent] [salvo]']
+    assert engine.game is None
+
+
+def test_seeded_game():
+    engine = Engine()
+    assert execute(engine, 'new 10 10 7 none 3') == ['game 10 10']
+    assert engine.game.salvo == 3
+    first = [line for point in ('a1', 'b2', 'c3') for line in execute(engine, f'shoot {point}')]
+    engine = Engine()
+    execute(engine, 'new 10 10 7 none 3')
+    assert [line for point in ('a1', 'b2', 'c3') for line in execute(engine, f'shoot {point}')] == first
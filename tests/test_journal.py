@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from battleship import journal, savefile
+
+from .games import new_game, play, shots_made
+
+
+def open_journal(tmp_path, game):
+    game.journal = journal.Journal(tmp_path / 'game.journal', tmp_path / 'game.save', game)
+    return game.journal
+
+
+def restore(tmp_path):
+    return journal.restore(tmp_path / 'game.journal', tmp_path / 'game.save')
+
+
+def test_restore_replays_records_after_snapshot(tmp_path):
+    game = new_game()
+    open_journal(tmp_path, game)
+    play(game, journal.SNAPSHOT_INTERVAL + 5, random.Random(1))
+    assert (tmp_path / 'game.save').exists()
+    assert savefile.dumps(restore(tmp_path)) == savefile.dumps(game)
+
+
+@pytest.mark.parametrize('shots', [5, journal.SNAPSHOT_INTERVAL + 5])
+def test_journal_opened_mid_game(tmp_path, shots):
+    game = new_game()
+    rng = random.Random(2)
+    play(game, 30, rng)
+    open_journal(tmp_path, game)
+    play(game, shots, rng)
+    restored = restore(tmp_path)
+    assert shots_made(restored) == 30 + shots
+    assert savefile.dumps(restored) == savefile.dumps(game)
+
+
+def test_journal_continued_after_restore(tmp_path):
+    game = new_game()
+    rng = random.Random(3)
+    play(game, 30, rng)
+    open_journal(tmp_path, game)
+    play(game, 10, rng)
+    game.journal.close()
+    game = restore(tmp_path)
+    open_journal(tmp_path, game).close()
+    # Continued journal keeps its initial state and records
+    assert shots_made(journal.read(tmp_path / 'game.journal')[0]) == 30
+    open_journal(tmp_path, game)
+    play(game, 5, rng)
+    game.journal.close()
+    restored = restore(tmp_path)
+    assert shots_made(restored) == 45
+    assert savefile.dumps(restored) == savefile.dumps(game)
+
+
+def test_journal_of_another_game_is_replaced(tmp_path):
+    open_journal(tmp_path, new_game(1)).close()
+    game = new_game(2)
+    open_journal(tmp_path, game)
+    play(game, 3, random.Random(4))
+    assert savefile.dumps(restore(tmp_path)) == savefile.dumps(game)
+
+
+def test_corrupted_journal_raises_value_error(tmp_path):
+    open_journal(tmp_path, new_game()).close()
+    path = tmp_path / 'game.journal'
+    data = bytearray(path.read_bytes())
+    data[journal.HEADER.size] ^= 0xff
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        journal.read(path)
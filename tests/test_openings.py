@@ -0,0 +1,48 @@
+import random
+
+import numpy as np
+import pytest
+
+from battleship import density
+from battleship.field import Field
+from battleship.openings import get_openings
+from battleship.solver import SolverShooter
+
+BOOK = get_openings()
+needs_book = pytest.mark.skipif(BOOK is None, reason='opening book is not built')
+
+
+@needs_book
+def test_randomness_does_not_depend_on_book(monkeypatch):
+    rng = random.Random(1)
+    SolverShooter(10, 10, rng)
+    with_book = rng.random()
+    monkeypatch.setattr(density, 'get_openings', lambda: None)
+    rng = random.Random(1)
+    shooter = SolverShooter(10, 10, rng)
+    assert shooter.opening is None and shooter.prior is None
+    assert rng.random() == with_book
+
+
+@needs_book
+@pytest.mark.parametrize('seed', range(4))
+def test_prior_is_mirrored_with_opening(seed):
+    shooter = density.DensityShooter(10, 7, random.Random(seed))
+    probabilities = BOOK.probabilities(10, 7).reshape(10, 7)
+    first = int(BOOK.shots(10, 7)[0])
+    x, y = shooter.opening[0]
+    assert shooter.prior.reshape(10, 7)[x, y] == probabilities[divmod(first, 7)]
+    assert np.isclose(shooter.prior.sum(), probabilities.sum())
+
+
+@needs_book
+def test_first_posterior_is_read_from_book(monkeypatch):
+    shooter = SolverShooter(10, 10, random.Random(2), cache=None)
+    shooter.opening = None
+
+    def posterior(*args):
+        raise AssertionError('Empty radar is solved again')
+
+    monkeypatch.setattr('battleship.solver.posterior', posterior)
+    x, y = shooter.next_shot(Field(10, 10).radar)
+    assert shooter.prior.reshape(10, 10)[x, y] == shooter.prior.max()
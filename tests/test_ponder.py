@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from battleship.density import DensityShooter
+from battleship.ponder import Ponderer
+from battleship.shooter import HuntShooter
+from battleship.player import ShotResult
+
+from .games import new_game
+
+
+@pytest.mark.parametrize('factory', [HuntShooter, DensityShooter])
+def test_fork_has_own_source_of_randomness(factory):
+    shooter = factory(10, 10, random.Random(1))
+    other = shooter.fork()
+    assert other.rng is not shooter.rng
+    assert other.fork().rng is not other.rng
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_shot_after_speculated_result_is_reused(seed):
+    game = new_game(seed)
+    shooter = Ponderer(HuntShooter(10, 10, random.Random(seed)))
+    rng = random.Random(seed)
+    results = []
+    previous = None
+    while game.winner is None:
+        if game.turn == 0:
+            shooter.ponder(game.players[1].field.radar)
+            radar = game.players[0].field.radar
+            points = [(x, y) for x in range(10) for y in range(10) if radar.is_empty(x, y)]
+            game.make_shot(*rng.choice(points))
+            previous = None
+            continue
+        radar = game.players[1].field.radar
+        reused = shooter.reused
+        x, y = shooter.next_shot(radar)
+        if previous == 'speculated':
+            # Shot after every result of pondered shot is computed in advance
+            assert shooter.reused == reused + 1
+        result = game.make_shot(x, y)
+        shooter.update(x, y, result, radar)
+        results.append(result)
+        previous = 'speculated' if shooter.reused > reused and previous is None else 'computed'
+    assert ShotResult.killing in results
+    shooter.wait()
@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from battleship import savefile
+from battleship.player import ShotResult
+
+from .games import new_game
+
+
+def random_points(game, count, rng):
+    """
+    :return: given count of random points, some of them are discovered or outside of the field
+    """
+    return [(rng.randrange(-1, game.field_length + 1), rng.randrange(-1, game.field_width + 1)) for _ in range(count)]
+
+
+@pytest.mark.parametrize('salvo', [0, 1, 3, 5])
+@pytest.mark.parametrize('seed', range(4))
+def test_batch_matches_shots_one_by_one(seed, salvo):
+    batch, single = new_game(seed, salvo=salvo), new_game(seed, salvo=salvo)
+    # Events make batch to be played shot by shot like single shots
+    single.subscribe(lambda delta: None)
+    rng = random.Random(seed)
+    while batch.winner is None:
+        points = random_points(batch, 8, rng)
+        assert batch.make_shots(points) == single.make_shots(points)
+        assert batch.turn == single.turn and batch.shots_left == single.shots_left
+        assert savefile.dumps(batch) == savefile.dumps(single)
+    assert single.winner == batch.winner
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_salvo_turn_lasts_given_count_of_shots(seed):
+    game = new_game(seed, salvo=3)
+    rng = random.Random(seed)
+    while game.winner is None:
+        player = game.turn
+        radar = game.current_player.field.radar
+        # Every undiscovered cell is offered, mixed with points which are skipped
+        points = [(x, y) for x in range(10) for y in range(10) if radar.is_empty(x, y)]
+        points += random_points(game, 20, rng)
+        rng.shuffle(points)
+        made = [result for result in game.make_shots(points) if result is not None]
+        if game.winner is None:
+            assert len(made) == 3 and game.turn == 1 - player and game.shots_left == 3
+        else:
+            assert made[-1] == ShotResult.killing and len(made) <= 3
+
+
+def test_classic_turn_ends_with_miss():
+    game = new_game(1)
+    rng = random.Random(1)
+    while game.winner is None:
+        player = game.turn
+        made = [result for result in game.make_shots(random_points(game, 20, rng)) if result is not None]
+        assert ShotResult.water not in made[:-1]
+        if made and made[-1] == ShotResult.water:
+            assert game.turn == 1 - player
+        elif game.winner is None:
+            assert game.turn == player
@@ -0,0 +1,99 @@
+import random
+
+import pytest
+
+from battleship import savefile
+from battleship.savefile import HEADER, PLAYER, SHIP
+
+from .games import new_game, play
+
+
+def corrupted(data: bytes, offset: int, value: bytes) -> bytes:
+    return data[:offset] + value + data[offset + len(value):]
+
+
+@pytest.mark.parametrize('field_length, field_width, salvo', [(10, 10, 0), (26, 7, 0), (10, 10, 3), (40, 30, 0)])
+def test_round_trip(field_length, field_width, salvo):
+    game = new_game(1, field_length, field_width, salvo)
+    play(game, 25, random.Random(1))
+    game.game_id = 123
+    loaded = savefile.loads(savefile.dumps(game))
+    assert savefile.dumps(loaded) == savefile.dumps(game)
+    assert (loaded.turn, loaded.host, loaded.game_id, loaded.salvo, loaded.shots_left) == \
+           (game.turn, game.host, game.game_id, game.salvo, game.shots_left)
+    for player, expected in zip(loaded.players, game.players):
+        assert (player.shots, player.hits, player.ships_count) == (expected.shots, expected.hits, expected.ships_count)
+        assert player.field.radar.discovered == expected.field.radar.discovered
+
+
+def test_save_and_load_file(tmp_path):
+    game = new_game(2)
+    play(game, 10, random.Random(2))
+    savefile.save(game, tmp_path / 'game.save')
+    assert savefile.dumps(savefile.load(tmp_path / 'game.save')) == savefile.dumps(game)
+
+
+def test_truncated_save():
+    data = savefile.dumps(new_game(3))
+    for size in range(len(data)):
+        with pytest.raises(ValueError):
+            savefile.loads(data[:size])
+
+
+@pytest.mark.parametrize('offset', [9, 10])  # turn, host
+def test_invalid_player_number(offset):
+    data = savefile.dumps(new_game(4))
+    with pytest.raises(ValueError):
+        savefile.loads(corrupted(data, offset, bytes([2])))
+
+
+def test_invalid_field_size():
+    data = savefile.dumps(new_game(4))
+    with pytest.raises(ValueError):
+        savefile.loads(corrupted(data, 5, (0).to_bytes(2, 'little')))
+
+
+def ship_records(data: bytes):
+    offset = HEADER.size + PLAYER.size
+    return [(offset + k * SHIP.size, SHIP.unpack_from(data, offset + k * SHIP.size))
+            for k in range(PLAYER.unpack_from(data, HEADER.size)[-1])]
+
+
+def test_overlapping_ships():
+    data = savefile.dumps(new_game(5))
+    (_, (size, x, y, rotation)), (offset, (other_size, _, _, _)) = ship_records(data)[:2]
+    assert other_size <= size
+    with pytest.raises(ValueError):
+        savefile.loads(corrupted(data, offset, SHIP.pack(other_size, x, y, rotation)))
+
+
+def test_fleet_differs_from_field_fleet():
+    data = savefile.dumps(new_game(6))
+    offset, (size, x, y, rotation) = ship_records(data)[0]
+    with pytest.raises(ValueError):
+        savefile.loads(corrupted(data, offset, SHIP.pack(size - 1, x, y, rotation)))
+
+
+def test_ship_not_on_field():
+    data = savefile.dumps(new_game(7))
+    offset, (size, x, y, rotation) = ship_records(data)[0]
+    with pytest.raises(ValueError):
+        savefile.loads(corrupted(data, offset, SHIP.pack(size, 200, y, rotation)))
+
+
+def test_random_corruption_raises_value_error_only():
+    rng = random.Random(8)
+    game = new_game(8)
+    play(game, 30, rng)
+    data = bytearray(savefile.dumps(game))
+    for _ in range(3000):
+        damaged = bytearray(data)
+        for _ in range(rng.randint(1, 3)):
+            damaged[rng.randrange(len(damaged))] = rng.randrange(256)
+        try:
+            loaded = savefile.loads(bytes(damaged))
+        except ValueError:
+            continue
+        # Loaded game is usable
+        loaded.host_player.field.radar.discovered
+        savefile.dumps(loaded)
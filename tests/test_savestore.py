@@ -0,0 +1,96 @@
+import json
+import random
+
+from battleship import journal, savefile, savestore
+from battleship.savestore import INDEX_NAME, SaveStore
+from battleship.ui import open_journal
+
+from .games import new_game, play, shots_made
+
+
+def test_save_list_load_remove(tmp_path):
+    store = SaveStore(tmp_path)
+    games = [new_game(seed) for seed in range(3)]
+    for i, game in enumerate(games):
+        play(game, 10 * i, random.Random(i))
+        store.save(game, saved=100.0 + i)
+    store = SaveStore(tmp_path)
+    assert [entry.game_id for entry in store.list()] == [game.game_id for game in reversed(games)]
+    assert store.entries[games[2].game_id].shots == [player.shots for player in games[2].players]
+    assert savefile.dumps(store.load(games[1].game_id)) == savefile.dumps(games[1])
+    store.remove(games[1].game_id)
+    assert games[1].game_id not in SaveStore(tmp_path).entries
+    assert not store.save_path(games[1].game_id).exists()
+
+
+def test_missing_index_is_rebuilt(tmp_path):
+    store = SaveStore(tmp_path)
+    game = new_game()
+    play(game, 7, random.Random(1))
+    store.save(game)
+    (tmp_path / INDEX_NAME).write_text('not json')
+    entry = SaveStore(tmp_path).entries[game.game_id]
+    assert entry.shots == [player.shots for player in game.players]
+
+
+def test_game_interrupted_by_crash_is_refreshed(tmp_path):
+    store = SaveStore(tmp_path)
+    game = new_game()
+    open_journal(store, game)
+    play(game, 40, random.Random(2))
+    # No save: the index still has the state of the game when it was started
+    assert SaveStore(tmp_path).entries[game.game_id].shots == [player.shots for player in game.players]
+    store = SaveStore(tmp_path)
+    assert store.entries[game.game_id].clean
+    assert savefile.dumps(store.load(game.game_id)) == savefile.dumps(game)
+
+
+def test_clean_entries_are_not_replayed(tmp_path, monkeypatch):
+    store = SaveStore(tmp_path)
+    game = new_game()
+    open_journal(store, game)
+    play(game, 5, random.Random(3))
+    store.save(game)
+    game.journal.close()
+
+    def restore(*args):
+        raise AssertionError('Clean entry is replayed')
+
+    monkeypatch.setattr(journal, 'restore', restore)
+    assert SaveStore(tmp_path).entries[game.game_id].shots == [player.shots for player in game.players]
+
+
+def test_migrated_game_keeps_its_moves(tmp_path):
+    rng = random.Random(4)
+    game = new_game(5)
+    play(game, 10, rng)
+    legacy_path = tmp_path / '10_10'
+    game.journal = journal.Journal(legacy_path.with_name('10_10.journal'), legacy_path, game)
+    play(game, 5, rng)
+    game.journal.close()
+    store = SaveStore(tmp_path)
+    assert not legacy_path.exists()
+    assert store.journal_path(game.game_id).exists()
+    migrated = store.load(game.game_id)
+    assert savefile.dumps(migrated) == savefile.dumps(game)
+    # Crash of the resumed game
+    open_journal(store, migrated)
+    play(migrated, 20, rng)
+    assert savefile.dumps(SaveStore(tmp_path).load(game.game_id)) == savefile.dumps(migrated)
+
+
+def test_migrated_games_without_identifier_get_own_slots(tmp_path):
+    games = []
+    for length in (10, 11):
+        game = new_game(length, field_length=length)
+        game.game_id = 0
+        play(game, 3, random.Random(length))
+        savefile.save(game, tmp_path / f'{length}_10')
+        games.append(game)
+    store = SaveStore(tmp_path)
+    assert len(store.entries) == 2
+    assert sorted(entry.field_length for entry in store.list()) == [10, 11]
+    for entry in store.list():
+        assert shots_made(store.load(entry.game_id)) == 3
+    data = json.loads((tmp_path / INDEX_NAME).read_text())
+    assert data['version'] == savestore.INDEX_VERSION
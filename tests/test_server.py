@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from battleship.server import Server
+
+
+def run(scenario):
+    """
+    Run given coroutine function with server listening on free port and function opening connections to it
+    """
+    async def main():
+        server = Server()
+        listener = await asyncio.start_server(server.handle, '127.0.0.1', 0)
+        port = listener.sockets[0].getsockname()[1]
+        connections = []
+
+        async def connect():
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            connections.append(writer)
+
+            async def ask(line):
+                if line is not None:
+                    writer.write(line.encode() + b'\n')
+                    await writer.drain()
+                return (await asyncio.wait_for(reader.readline(), 5)).decode().strip()
+
+            return ask
+
+        try:
+            await scenario(server, connect)
+        finally:
+            for writer in connections:
+                writer.close()
+            listener.close()
+            server.thinker.shutdown(wait=False)
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize('line', ['NEW ² 10 AI', 'NEW 10 ١٠ PVP', 'NEW 10 AI', 'NEW x 10 AI', 'NEW 10 10 BOT'])
+def test_new_game_with_invalid_numbers_is_refused(line):
+    async def scenario(server, connect):
+        ask = await connect()
+        assert (await ask(line)).startswith('ERR usage')
+        # Connection is still served
+        assert await ask('NEW 10 10 PVP') == 'GAME 1 0 10 10'
+
+    run(scenario)
+
+
+@pytest.mark.parametrize('command', ['JOIN', 'WATCH'])
+@pytest.mark.parametrize('game', ['²', '١', 'x', ''])
+def test_join_and_watch_of_invalid_game_are_refused(command, game):
+    async def scenario(server, connect):
+        ask = await connect()
+        assert (await ask(f'{command} {game}')).startswith('ERR no such game')
+        assert await ask('NEW 10 10 PVP') == 'GAME 1 0 10 10'
+
+    run(scenario)
+
+
+def test_field_size_is_checked():
+    async def scenario(server, connect):
+        ask = await connect()
+        assert (await ask('NEW 4 10 AI')).startswith('ERR field must be')
+        assert (await ask('NEW 10 10 AI nobody')).startswith('ERR shooter must be')
+        assert await ask('FIRE') == 'ERR unknown command FIRE'
+
+    run(scenario)
+
+
+def test_pvp_game():
+    async def scenario(server, connect):
+        first, second = await connect(), await connect()
+        assert await first('NEW 10 10 PVP') == 'GAME 1 0 10 10'
+        assert await first('SHOT a1') == 'ERR waiting for opponent'
+        assert await second('JOIN 1') == 'GAME 1 1 10 10'
+        assert await first(None) == 'JOINED'
+        assert await first(None) == 'TURN'
+        assert await second('SHOT a1') == 'ERR not your turn'
+        game = server.sessions[1].game
+        # Shoot into water, so the turn passes to the second player
+        x, y = next((x, y) for x in range(10) for y in range(10) if game.players[1].field.map.is_empty(x, y))
+        point = f'{"abcdefghij"[x]}{y + 1}'
+        assert await first(f'SHOT {point}') == f'SHOT {point} water WAIT'
+        assert await second(None) == f'ENEMY {point} water TURN'
+        assert await second('STATE') == 'STATE 1 0 0 1 0 -'
+        assert (await first(f'SHOT {point}')) == 'ERR not your turn'
+        assert (await second('SHOT z99')).startswith('ERR point is not on field')
+        assert await second('QUIT') == ''
+        assert await first(None) == 'LEFT'
+
+    run(scenario)
+
+
+def test_game_against_computer():
+    async def scenario(server, connect):
+        ask = await connect()
+        assert await ask('NEW 10 10 AI hunt') == 'GAME 1 0 10 10'
+        assert await ask(None) == 'TURN'
+        game = server.sessions[1].game
+        x, y = next((x, y) for x in range(10) for y in range(10) if game.players[1].field.map.is_empty(x, y))
+        point = f'{"abcdefghij"[x]}{y + 1}'
+        assert await ask(f'SHOT {point}') == f'SHOT {point} water WAIT'
+        # Computer shoots until it misses
+        while True:
+            line = await ask(None)
+            assert line.startswith('ENEMY ')
+            if line.endswith('TURN') or line.endswith('LOSE'):
+                break
+        assert game.turn == 0 or game.winner == 1
+
+    run(scenario)
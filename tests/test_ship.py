@@ -0,0 +1,29 @@
+import random
+
+import pytest
+
+from battleship import ship
+from battleship.field import Field
+from battleship.ship import Ship
+
+
+@pytest.mark.parametrize('field_length, field_width', [(5, 5), (10, 10), (26, 9), (60, 40)])
+def test_generated_ships_form_fleet_of_field(field_length, field_width):
+    field = Field(field_length, field_width)
+    ships = Ship.generate_ships(field, random.Random(1))
+    assert sorted(s.size for s in ships) == sorted(Ship.get_sizes(field))
+    for i, first in enumerate(ships):
+        for second in ships[i + 1:]:
+            assert not first.occupied_and_nearby_cells & second.occupied_cells
+
+
+def test_fleet_which_does_not_fit(monkeypatch):
+    monkeypatch.setattr(Ship, 'get_sizes', staticmethod(lambda field: [4] * 10))
+    with pytest.raises(ValueError, match='5x5'):
+        Ship.generate_ships(Field(5, 5), random.Random(2))
+
+
+def test_fleet_which_does_not_fit_large_field(monkeypatch):
+    monkeypatch.setattr(ship, 'MAX_REJECTIONS', 100)
+    with pytest.raises(ValueError, match='30x30'):
+        Ship.sample_ships(Field(30, 30), [30] * 20, random.Random(3))
@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from battleship.server import Session
+from battleship.shooter import SHOOTERS, HuntShooter
+
+from .games import new_game, play
+
+
+def play_until_hit(game, shooter):
+    """
+    Make shots of computer player 1 until it hits ship which is not destroyed, human player 0 shoots randomly
+    """
+    rng = random.Random(3)
+    while not shooter.hits:
+        radar = game.current_player.field.radar
+        if game.turn == 1:
+            x, y = shooter.next_shot(radar)
+            shooter.update(x, y, game.make_shot(x, y), radar)
+        else:
+            points = [(x, y) for x in range(game.field_length) for y in range(game.field_width)
+                      if radar.is_empty(x, y)]
+            game.make_shot(*rng.choice(points))
+        assert game.winner is None
+
+
+@pytest.mark.parametrize('size', [10, 40])
+@pytest.mark.parametrize('seed', range(5))
+def test_hunt_shooter_restores_hits_from_radar(seed, size):
+    game = new_game(seed, size, size)
+    shooter = HuntShooter(size, size, random.Random(seed))
+    play_until_hit(game, shooter)
+    # Shoot next to the hit once more, so the ship may have several hits
+    radar = game.players[1].field.radar
+    x, y = shooter.next_shot(radar)
+    shooter.update(x, y, game.make_shot(x, y), radar)
+    restored = HuntShooter(size, size, random.Random(seed))
+    restored.sync(radar)
+    assert sorted(restored.hits) == sorted(shooter.hits)
+
+
+def test_compacted_session_keeps_target_of_computer():
+    game = new_game(1)
+    session = Session(1, game, 'hunt')
+    play_until_hit(game, session.shooter)
+    hits = sorted(session.shooter.hits)
+    session.compact()
+    assert session.state.is_compact
+    assert sorted(session.shooter.hits) == hits
+
+
+@pytest.mark.parametrize('name', list(SHOOTERS))
+def test_synced_shooter_shoots_undiscovered_cell(name):
+    game = new_game(2)
+    play(game, 60, random.Random(2))
+    radar = game.players[1].field.radar
+    shooter = SHOOTERS[name](10, 10, random.Random(2))
+    shooter.sync(radar)
+    x, y = shooter.next_shot(radar)
+    assert radar.is_empty(x, y)